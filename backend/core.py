@@ -32,9 +32,8 @@ except ModuleNotFoundError:
             self.running = False
 
 from dotenv import load_dotenv
-from services.lastfm import LastFMService
 from services.downloader import DownloaderService
-from services.analytics import AnalyticsService
+from services.provider_registry import providers
 
 load_dotenv()
 
@@ -50,7 +49,7 @@ logging.basicConfig(
 logger = logging.getLogger("spotiflow")
 
 # Shared Instances
-lastfm_service = LastFMService()
-analytics_service = AnalyticsService(lastfm_service)
+lastfm_service = providers.lastfm_service()
+analytics_service = providers.analytics_service()
 downloader_service = DownloaderService()
 scheduler = BackgroundScheduler()
@@ -1,4 +1,4 @@
-from .core import init_db, DB_NAME, get_connection
+from .core import init_db, DB_NAME, get_connection, get_pool_stats
 
 from .repositories.scrobbles import (
     add_scrobble,
@@ -9,7 +9,15 @@ from .repositories.scrobbles import (
     get_scrobbles_in_range,
     get_all_scrobbles,
     get_top_artists_from_db,
-    get_top_tracks_from_db
+    get_top_tracks_from_db,
+    rebuild_scrobble_rollups,
+    get_daily_scrobble_counts,
+    get_hourly_scrobble_counts,
+    get_active_scrobble_days,
+    get_sync_checkpoint,
+    start_sync_checkpoint,
+    mark_sync_pages_completed,
+    clear_sync_checkpoint
 )
 
 from .repositories.downloads import (
@@ -18,10 +26,12 @@ from .repositories.downloads import (
     get_downloads_batch,
     get_download_info,
     find_download_by_track,
+    find_downloads_by_tracks,
     get_download_status,
     get_downloads,
     get_all_pending_downloads,
     get_all_failed_downloads,
+    get_completed_download_tracks,
     get_total_downloads_count,
     get_all_artists,
     get_all_artists_with_counts,
@@ -64,6 +74,47 @@ from .repositories.playlists import (
     add_songs_to_playlist_batch
 )
 
+from .repositories.cache import (
+    get_cache_entry,
+    set_cache_entry,
+    delete_cache_entries,
+    purge_expired_cache_entries,
+    get_cache_table_stats
+)
+
+from .repositories.images import (
+    get_image_lookups,
+    save_image_lookup,
+    purge_expired_image_lookups,
+    get_cover_for_url,
+    save_cover,
+    touch_cover,
+    get_cover_store_stats,
+    list_least_recent_covers,
+    delete_covers
+)
+
+from .repositories.recommendations import (
+    update_recommendation_candidates,
+    list_recommendation_candidates,
+    save_recommendation_index_state,
+    get_recommendation_index_state
+)
+
+from .repositories.library_index import library_index
+
+from .repositories.library import (
+    get_library_file_index,
+    upsert_library_files,
+    link_library_files,
+    mark_library_files_missing,
+    record_library_scan,
+    get_last_library_scan,
+    list_orphan_library_files,
+    list_missing_library_downloads,
+    get_library_summary
+)
+
 from .repositories.discover import (
     dismiss_track,
     get_dismissed_tracks
@@ -81,7 +132,13 @@ from .repositories.jobs import (
     find_active_job,
     list_jobs,
     get_job_events,
-    get_job_summary
+    get_job_summary,
+    list_queued_priority_classes,
+    claim_next_job,
+    renew_job_lease,
+    requeue_running_jobs,
+    list_queued_jobs,
+    create_download_jobs_bulk
 )
 
 from .repositories.intelligence import (
@@ -111,13 +168,18 @@ from .repositories.playback import (
     create_playback_session,
     get_playback_session,
     get_active_playback_session,
+    get_queue_window,
+    load_session_queue,
     update_playback_session,
     finish_playback_session,
     replace_queue_segment,
     insert_queue_items,
+    append_queue_items,
     remove_queue_item,
     reorder_queue_items,
     clear_upcoming_queue_items,
+    advance_queue,
+    QueueVersionConflict,
     list_active_playback_sessions,
     create_radio_session,
     get_radio_session,
@@ -131,8 +193,13 @@ from .repositories.playback import (
     get_stream_source,
     get_stream_source_by_cache_key,
     find_recent_stream_source,
+    find_recent_stream_sources_for_tracks,
     mark_stream_source_failure,
     mark_stream_source_verified,
     list_recent_stream_sources,
     get_stream_failure_counts,
+    get_stream_failure_counts_for_tracks,
+    save_source_candidates,
+    get_source_candidates,
+    delete_source_candidate,
 )
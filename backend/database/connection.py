@@ -1,5 +1,7 @@
 import os
 import sqlite3
+import threading
+import weakref
 from contextlib import contextmanager
 
 
@@ -8,6 +10,12 @@ DB_NAME = os.path.join(DATA_DIR, "downloads.db")
 
 print(f"Database path: {os.path.abspath(DB_NAME)}")
 
+# Pragmas applied once per pooled connection. Sizes can be tuned per deployment
+# (e.g. a small NAS) through the environment.
+BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+MMAP_SIZE_BYTES = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+
 
 def get_db_path():
     try:
@@ -18,11 +26,137 @@ def get_db_path():
         return DB_NAME
 
 
+class ConnectionPool:
+    """Thread-local SQLite connections, opened once per thread and database path.
+
+    SQLite connections are cheap to keep but comparatively expensive to open and
+    configure, so each thread keeps one connection per database file and reuses it
+    for every repository call. Nested ``get_connection()`` blocks on the same
+    thread share the connection; any transaction left open when the outermost
+    block exits is rolled back, matching the old close-on-exit behaviour.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {
+            "opened": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "rollbacks": 0,
+        }
+        self._open_connections = {}
+
+    def _holder(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _ThreadConnections()
+            self._local.holder = holder
+            # Thread-locals are dropped when a worker thread exits; close its
+            # handles then so short-lived pool threads do not leak file descriptors.
+            weakref.finalize(holder, self._close_all, holder.connections)
+        return holder
+
+    def _close_all(self, connections):
+        for path in list(connections):
+            self._close(connections.pop(path))
+
+    def _open(self, db_path):
+        # Connections never leave their thread; check_same_thread is disabled only
+        # so the thread-exit finalizer may close them from wherever it runs.
+        conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        with self._lock:
+            self._stats["opened"] += 1
+            self._open_connections[id(conn)] = (threading.get_ident(), db_path)
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        finally:
+            with self._lock:
+                self._stats["closed"] += 1
+                self._open_connections.pop(id(conn), None)
+
+    def _release_idle(self, holder, keep_path=None):
+        # A thread normally talks to a single database file. When the path
+        # changes (tests, or a relocated data dir) drop the old handles instead
+        # of keeping one open per path forever.
+        for path in [path for path in holder.connections if path != keep_path]:
+            if holder.depth.get(path):
+                continue
+            self._close(holder.connections.pop(path))
+            holder.depth.pop(path, None)
+
+    @contextmanager
+    def connection(self):
+        db_path = get_db_path()
+        holder = self._holder()
+        conn = holder.connections.get(db_path)
+        reused = conn is not None
+        if not reused:
+            self._release_idle(holder, keep_path=db_path)
+            conn = self._open(db_path)
+            holder.connections[db_path] = conn
+
+        holder.depth[db_path] = holder.depth.get(db_path, 0) + 1
+        with self._lock:
+            self._stats["checkouts"] += 1
+            if reused:
+                self._stats["reused"] += 1
+        try:
+            yield conn
+        finally:
+            holder.depth[db_path] -= 1
+            if holder.depth[db_path] == 0 and conn.in_transaction:
+                conn.rollback()
+                with self._lock:
+                    self._stats["rollbacks"] += 1
+
+    def close_thread_connections(self):
+        self._release_idle(self._holder())
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = len(self._open_connections)
+            stats["threads"] = len({thread_id for thread_id, _ in self._open_connections.values()})
+        stats["pragmas"] = {
+            "journal_mode": "wal",
+            "synchronous": "normal",
+            "busy_timeout_ms": BUSY_TIMEOUT_MS,
+            "mmap_size": MMAP_SIZE_BYTES,
+            "cache_size_kib": CACHE_SIZE_KIB,
+        }
+        return stats
+
+
+class _ThreadConnections:
+    def __init__(self):
+        self.connections = {}
+        self.depth = {}
+
+
+_pool = ConnectionPool()
+
+
 @contextmanager
 def get_connection():
-    conn = sqlite3.connect(get_db_path())
-    conn.row_factory = sqlite3.Row
-    try:
+    with _pool.connection() as conn:
         yield conn
-    finally:
-        conn.close()
+
+
+def get_pool_stats():
+    return _pool.stats()
+
+
+def close_thread_connections():
+    _pool.close_thread_connections()
@@ -1,2 +1,2 @@
-from .connection import DB_NAME, get_connection, get_db_path
+from .connection import DB_NAME, close_thread_connections, get_connection, get_db_path, get_pool_stats
 from .init import init_db
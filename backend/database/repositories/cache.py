@@ -0,0 +1,74 @@
+import time
+
+from ..core import get_connection
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def get_cache_entry(namespace, key, now=None):
+    """Return the raw (serialized value, expires_at) for a live entry, or None."""
+    now = time.time() if now is None else now
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            'SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, now),
+        )
+        row = c.fetchone()
+        return (row[0], row[1]) if row else None
+
+
+def set_cache_entry(namespace, key, value, expires_at):
+    now = time.time()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            '''
+            INSERT INTO cache_entries (namespace, key, value, size_bytes, expires_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(namespace, key) DO UPDATE SET
+                value = excluded.value,
+                size_bytes = excluded.size_bytes,
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+            ''',
+            (namespace, key, value, len(value), expires_at, now),
+        )
+        conn.commit()
+
+
+def delete_cache_entries(namespace, key=None, prefix=None):
+    """Delete one key, every key with ``prefix``, or the whole namespace."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        if key is not None:
+            c.execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+        elif prefix is not None:
+            c.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key LIKE ? ESCAPE '\\'",
+                (namespace, _escape_like(prefix) + '%'),
+            )
+        else:
+            c.execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+        conn.commit()
+        return c.rowcount
+
+
+def purge_expired_cache_entries(now=None):
+    now = time.time() if now is None else now
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+        conn.commit()
+        return c.rowcount
+
+
+def get_cache_table_stats():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            'SELECT namespace, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cache_entries GROUP BY namespace'
+        )
+        return {row[0]: {"entries": row[1], "bytes": row[2]} for row in c.fetchall()}
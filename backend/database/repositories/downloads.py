@@ -2,6 +2,7 @@ import sqlite3
 from datetime import datetime, timezone
 
 from ..core import get_connection
+from .library_index import library_index
 
 def add_download(query, artist, title, album, image_url=None, status="completed", source_url=None, match_confidence=None, alternate_candidate_count=0, last_error=None):
     now = datetime.now(timezone.utc).isoformat()
@@ -31,9 +32,10 @@ def add_download(query, artist, title, album, image_url=None, status="completed"
                     last_error=COALESCE(excluded.last_error, downloads.last_error)
             ''', (query, artist, title, album, image_url, status, now, source_url, match_confidence, alternate_candidate_count, last_error))
             conn.commit()
-            return True
         except sqlite3.IntegrityError:
             return False
+    library_index.record(query, artist, title, album, status)
+    return True
 
 def is_downloaded(query):
     with get_connection() as conn:
@@ -100,6 +102,39 @@ def find_download_by_track(artist, title, album=None):
         result = c.fetchone()
         return dict(result) if result else None
 
+def find_downloads_by_tracks(tracks):
+    """
+    Batch form of ``find_download_by_track``: {(artist, title, album): completed row}
+    for the (artist, title, album) tracks given, matched case-insensitively. As there,
+    a row from the wanted album is preferred, then the most recent one; an empty
+    album is keyed as "".
+    """
+    wanted = list(dict.fromkeys((artist, title, album or "") for artist, title, album in tracks if artist and title))
+    found = {}
+    with get_connection() as conn:
+        c = conn.cursor()
+        for offset in range(0, len(wanted), 300):
+            chunk = wanted[offset:offset + 300]
+            values = ",".join(["(?, ?, ?)"] * len(chunk))
+            c.execute(
+                f'''
+                WITH wanted(artist, title, album) AS (VALUES {values})
+                SELECT w.artist AS wanted_artist, w.title AS wanted_title, w.album AS wanted_album, d.*
+                FROM wanted w
+                JOIN downloads d ON lower(d.artist) = lower(w.artist) AND lower(d.title) = lower(w.title)
+                WHERE d.status = "completed"
+                ORDER BY
+                    CASE WHEN w.album <> '' AND lower(ifnull(d.album, '')) = lower(w.album) THEN 0 ELSE 1 END,
+                    d.created_at DESC
+                ''',
+                [value for track in chunk for value in track],
+            )
+            for row in c.fetchall():
+                item = dict(row)
+                key = (item.pop("wanted_artist"), item.pop("wanted_title"), item.pop("wanted_album"))
+                found.setdefault(key, item)
+    return found
+
 def get_download_status(query):
     with get_connection() as conn:
         c = conn.cursor()
@@ -159,6 +194,13 @@ def get_all_failed_downloads():
         rows = c.fetchall()
         return [dict(row) for row in rows]
 
+def get_completed_download_tracks():
+    """(query, artist, title, album) for every completed download."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT query, artist, title, album FROM downloads WHERE status = "completed"')
+        return [tuple(row) for row in c.fetchall()]
+
 def get_total_downloads_count(status=None, search_query=None, artist=None, album=None):
     with get_connection() as conn:
         c = conn.cursor()
@@ -198,7 +240,7 @@ def get_all_artists():
         c = conn.cursor()
         # Try fetching from scrobbles table first for play counts for better relevance
         try:
-            c.execute('SELECT artist, COUNT(*) as count FROM scrobbles GROUP BY artist ORDER BY count DESC')
+            c.execute('SELECT artist, SUM(playcount) as count FROM artist_playcounts WHERE bucket_start = -1 GROUP BY artist ORDER BY count DESC')
             rows = c.fetchall()
             if rows:
                 return [row[0] for row in rows if row[0]]
@@ -220,7 +262,7 @@ def get_all_artists_with_counts():
         
         # 1. From Scrobbles
         try:
-            c.execute('SELECT artist, COUNT(*) as count FROM scrobbles GROUP BY artist')
+            c.execute('SELECT artist, SUM(playcount) as count FROM artist_playcounts WHERE bucket_start = -1 GROUP BY artist')
             rows = c.fetchall()
             for row in rows:
                 if row[0]:
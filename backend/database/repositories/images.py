@@ -0,0 +1,144 @@
+import time
+
+from ..core import get_connection
+
+
+def get_image_lookups(lookup_keys, now=None):
+    """
+    Return {lookup_key: image_url} for unexpired lookups. A value of None is a
+    cached miss; keys that are absent have never been resolved (or expired).
+    """
+    keys = list(dict.fromkeys(lookup_keys))
+    if not keys:
+        return {}
+    now = time.time() if now is None else now
+    found = {}
+    with get_connection() as conn:
+        c = conn.cursor()
+        for offset in range(0, len(keys), 500):
+            chunk = keys[offset:offset + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            c.execute(
+                f"SELECT lookup_key, image_url FROM image_lookups WHERE lookup_key IN ({placeholders}) AND expires_at > ?",
+                chunk + [now],
+            )
+            for row in c.fetchall():
+                found[row[0]] = row[1] or None
+    return found
+
+
+def save_image_lookup(lookup_key, artist, title, image_url, source, ttl):
+    now = time.time()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            INSERT INTO image_lookups (lookup_key, artist, title, image_url, source, expires_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(lookup_key) DO UPDATE SET
+                image_url = excluded.image_url,
+                source = excluded.source,
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+            """,
+            (lookup_key, artist, title, image_url, source, now + ttl, now),
+        )
+        conn.commit()
+
+
+def purge_expired_image_lookups(now=None):
+    now = time.time() if now is None else now
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("DELETE FROM image_lookups WHERE expires_at <= ?", (now,))
+        conn.commit()
+        return c.rowcount
+
+
+def get_cover_for_url(url_key):
+    """The stored blob for a cover URL as a dict (sha256, size_bytes, content_type, last_used_at)."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT b.sha256, b.size_bytes, b.content_type, b.last_used_at
+            FROM cover_urls u
+            JOIN cover_blobs b ON b.sha256 = u.sha256
+            WHERE u.url_key = ?
+            """,
+            (url_key,),
+        )
+        row = c.fetchone()
+    return dict(row) if row else None
+
+
+def save_cover(url_key, url, sha256, size_bytes, content_type):
+    """Record a cover blob and point ``url_key`` at it; returns True if the blob is new."""
+    now = time.time()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM cover_blobs WHERE sha256 = ?", (sha256,))
+        is_new = c.fetchone() is None
+        c.execute(
+            """
+            INSERT INTO cover_blobs (sha256, size_bytes, content_type, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(sha256) DO UPDATE SET last_used_at = excluded.last_used_at
+            """,
+            (sha256, size_bytes, content_type, now, now),
+        )
+        c.execute(
+            """
+            INSERT INTO cover_urls (url_key, url, sha256, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(url_key) DO UPDATE SET sha256 = excluded.sha256
+            """,
+            (url_key, url, sha256, now),
+        )
+        conn.commit()
+    return is_new
+
+
+def touch_cover(sha256, now=None):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            "UPDATE cover_blobs SET last_used_at = ? WHERE sha256 = ?",
+            (time.time() if now is None else now, sha256),
+        )
+        conn.commit()
+
+
+def get_cover_store_stats():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cover_blobs")
+        blobs, total_bytes = c.fetchone()
+        c.execute("SELECT COUNT(*) FROM cover_urls")
+        urls = c.fetchone()[0]
+    return {"blobs": blobs, "urls": urls, "bytes": total_bytes}
+
+
+def list_least_recent_covers(limit=100):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT sha256, size_bytes FROM cover_blobs ORDER BY last_used_at ASC LIMIT ?",
+            (limit,),
+        )
+        return [dict(row) for row in c.fetchall()]
+
+
+def delete_covers(sha256_list):
+    shas = list(sha256_list)
+    if not shas:
+        return 0
+    with get_connection() as conn:
+        c = conn.cursor()
+        for offset in range(0, len(shas), 500):
+            chunk = shas[offset:offset + 500]
+            placeholders = ",".join(["?"] * len(chunk))
+            c.execute(f"DELETE FROM cover_urls WHERE sha256 IN ({placeholders})", chunk)
+            c.execute(f"DELETE FROM cover_blobs WHERE sha256 IN ({placeholders})", chunk)
+        conn.commit()
+    return len(shas)
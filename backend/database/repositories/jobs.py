@@ -1,14 +1,26 @@
 import json
+import time
 from datetime import datetime, timezone
 
 from ..core import get_connection
+from .library_index import library_index
 
 
 def _now():
     return datetime.now(timezone.utc).isoformat()
 
 
-def create_job(job_type, area, status="queued", query=None, artist=None, title=None, album=None, payload=None):
+def create_job(
+    job_type,
+    area,
+    status="queued",
+    query=None,
+    artist=None,
+    title=None,
+    album=None,
+    payload=None,
+    priority_class="interactive",
+):
     now = _now()
     with get_connection() as conn:
         c = conn.cursor()
@@ -16,9 +28,9 @@ def create_job(job_type, area, status="queued", query=None, artist=None, title=N
             """
             INSERT INTO jobs (
                 job_type, area, status, query, artist, title, album, payload,
-                created_at, updated_at
+                priority_class, created_at, updated_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 job_type,
@@ -29,6 +41,7 @@ def create_job(job_type, area, status="queued", query=None, artist=None, title=N
                 title,
                 album,
                 json.dumps(payload) if payload is not None else None,
+                priority_class,
                 now,
                 now,
             ),
@@ -39,6 +52,147 @@ def create_job(job_type, area, status="queued", query=None, artist=None, title=N
     return job_id
 
 
+def create_download_jobs_bulk(items, priority_class="bulk", area="library"):
+    """
+    Queue many download jobs in one transaction.
+
+    ``items`` are dicts with ``query``, ``artist``, ``title``, ``album`` and ``payload``.
+    Items are deduplicated by query and by (artist, title, album). Items whose track
+    is already downloaded for the same album (any album when none is given), or whose
+    query already has a queued or running job, are skipped using set-based lookups against a temp table. Everything
+    else gets a pending ``downloads`` row, a job and a ``job.queued`` event. Returns
+    ``(created, skipped)`` where ``created`` is a list of the items with their new
+    ``job_id`` and ``skipped`` counts items per reason.
+    """
+    unique = {}
+    seen_tracks = set()
+    for item in items:
+        if not item.get("query") or item["query"] in unique:
+            continue
+        if item.get("artist") and item.get("title"):
+            track = (item["artist"].lower(), item["title"].lower(), (item.get("album") or "").lower())
+            if track in seen_tracks:
+                continue
+            seen_tracks.add(track)
+        unique[item["query"]] = item
+    if not unique:
+        return [], {}
+
+    now = _now()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS bulk_download_items (
+                seq INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                artist TEXT,
+                title TEXT,
+                album TEXT,
+                artist_key TEXT,
+                title_key TEXT,
+                album_key TEXT,
+                image_url TEXT,
+                payload TEXT,
+                skip_reason TEXT
+            )
+            """
+        )
+        c.execute("DELETE FROM bulk_download_items")
+        c.executemany(
+            """
+            INSERT INTO bulk_download_items (seq, query, artist, title, album, artist_key, title_key, album_key, image_url, payload)
+            VALUES (?, ?, ?, ?, ?, lower(?), lower(?), lower(?), ?, ?)
+            """,
+            [
+                (
+                    seq,
+                    item["query"],
+                    item.get("artist"),
+                    item.get("title"),
+                    item.get("album"),
+                    item.get("artist"),
+                    item.get("title"),
+                    item.get("album") or "",
+                    (item.get("payload") or {}).get("image_url"),
+                    json.dumps(item.get("payload") or {}),
+                )
+                for seq, item in enumerate(unique.values())
+            ],
+        )
+        c.execute(
+            """
+            UPDATE bulk_download_items SET skip_reason = 'downloaded'
+            WHERE seq IN (
+                SELECT b.seq FROM bulk_download_items b
+                JOIN downloads d ON lower(d.artist) = b.artist_key AND lower(d.title) = b.title_key
+                WHERE b.artist IS NOT NULL AND b.title IS NOT NULL AND d.status = 'completed'
+                  AND (b.album_key = '' OR lower(ifnull(d.album, '')) = b.album_key)
+            )
+            """
+        )
+        c.execute(
+            """
+            UPDATE bulk_download_items SET skip_reason = 'active'
+            WHERE skip_reason IS NULL AND seq IN (
+                SELECT b.seq FROM bulk_download_items b
+                JOIN jobs j ON j.query = b.query
+                WHERE j.job_type = 'download' AND j.status IN ('queued', 'running')
+            )
+            """
+        )
+        c.execute(
+            """
+            INSERT INTO downloads (query, artist, title, album, image_url, status, created_at)
+            SELECT query, COALESCE(artist, 'Unknown Artist'), COALESCE(title, query),
+                   COALESCE(album, 'Unknown Album'), image_url, 'pending', ?
+            FROM bulk_download_items WHERE skip_reason IS NULL
+            ON CONFLICT(query) DO UPDATE SET
+                artist=excluded.artist,
+                title=excluded.title,
+                album=excluded.album,
+                image_url=COALESCE(excluded.image_url, downloads.image_url),
+                status=excluded.status,
+                created_at=excluded.created_at
+            """,
+            (now,),
+        )
+        c.execute(
+            """
+            INSERT INTO jobs (
+                job_type, area, status, query, artist, title, album, payload,
+                priority_class, created_at, updated_at
+            )
+            SELECT 'download', ?, 'queued', query, artist, title, album, payload, ?, ?, ?
+            FROM bulk_download_items
+            WHERE skip_reason IS NULL
+            ORDER BY seq
+            RETURNING id, query
+            """,
+            (area, priority_class, now, now),
+        )
+        job_ids = {row[1]: row[0] for row in c.fetchall()}
+        c.executemany(
+            """
+            INSERT INTO job_events (job_id, event_type, message, payload, created_at)
+            VALUES (?, 'job.queued', 'download job queued', ?, ?)
+            """,
+            [(job_id, json.dumps(unique[query].get("payload") or {}), now) for query, job_id in job_ids.items()],
+        )
+        c.execute(
+            "SELECT skip_reason, COUNT(*) FROM bulk_download_items WHERE skip_reason IS NOT NULL GROUP BY skip_reason"
+        )
+        skipped = {row[0]: row[1] for row in c.fetchall()}
+        c.execute("DELETE FROM bulk_download_items")
+        conn.commit()
+    # The upsert can flip a completed row back to pending under the same query.
+    library_index.invalidate()
+
+    created = [dict(item, job_id=job_ids[query]) for query, item in unique.items() if query in job_ids]
+    created.sort(key=lambda item: item["job_id"])
+    return created, skipped
+
+
 def add_job_event(job_id, event_type, message=None, payload=None):
     with get_connection() as conn:
         c = conn.cursor()
@@ -71,6 +225,9 @@ def update_job(job_id, **fields):
         "started_at",
         "finished_at",
         "payload",
+        "priority_class",
+        "lease_owner",
+        "lease_expires_at",
     }
     assignments = []
     params = []
@@ -98,12 +255,20 @@ def mark_job_running(job_id):
 
 
 def mark_job_succeeded(job_id, payload=None):
-    update_job(job_id, status="succeeded", finished_at=_now(), payload=payload)
+    update_job(job_id, status="succeeded", finished_at=_now(), payload=payload, lease_owner=None, lease_expires_at=None)
     add_job_event(job_id, "job.succeeded", "Job succeeded", payload)
 
 
 def mark_job_failed(job_id, error_message, payload=None):
-    update_job(job_id, status="failed", finished_at=_now(), error_message=error_message, payload=payload)
+    update_job(
+        job_id,
+        status="failed",
+        finished_at=_now(),
+        error_message=error_message,
+        payload=payload,
+        lease_owner=None,
+        lease_expires_at=None,
+    )
     add_job_event(job_id, "job.failed", error_message, payload)
 
 
@@ -115,6 +280,96 @@ def increment_job_retry(job_id):
     return retry_count
 
 
+def list_queued_priority_classes(job_type):
+    """Priority classes that currently have at least one queued job of ``job_type``."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT DISTINCT priority_class FROM jobs WHERE job_type = ? AND status = 'queued'",
+            (job_type,),
+        )
+        rows = c.fetchall()
+    return {row[0] or "interactive" for row in rows}
+
+
+def claim_next_job(job_type, owner, lease_seconds, priority_class=None):
+    """
+    Atomically move the oldest queued job (optionally of one priority class) to
+    ``running`` under a lease held by ``owner``. Returns the claimed job or None.
+    """
+    now = _now()
+    params = [owner, time.time() + lease_seconds, now, now, job_type]
+    class_filter = ""
+    if priority_class:
+        class_filter = "AND priority_class = ?"
+        params.append(priority_class)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            f"""
+            UPDATE jobs
+            SET status = 'running', lease_owner = ?, lease_expires_at = ?, started_at = ?, updated_at = ?
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE job_type = ? AND status = 'queued' {class_filter}
+                ORDER BY id
+                LIMIT 1
+            )
+            AND status = 'queued'
+            RETURNING *
+            """,
+            params,
+        )
+        row = c.fetchone()
+        conn.commit()
+    if not row:
+        return None
+    job = _decode_job(row)
+    add_job_event(job["id"], "job.running", f"Claimed by {owner}")
+    return job
+
+
+def renew_job_lease(job_id, owner, lease_seconds):
+    """Extend a running job's lease; False if ``owner`` no longer holds it."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+            WHERE id = ? AND status = 'running' AND lease_owner = ?
+            """,
+            (time.time() + lease_seconds, _now(), job_id, owner),
+        )
+        renewed = c.rowcount > 0
+        conn.commit()
+    return renewed
+
+
+def requeue_running_jobs(job_type, expired_only=True):
+    """
+    Put running jobs back in the queue. With ``expired_only`` only jobs whose lease
+    has lapsed are requeued; otherwise every running job is (startup recovery, when
+    no worker from a previous process can still be holding one).
+    """
+    sql = """
+        UPDATE jobs
+        SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+        WHERE job_type = ? AND status = 'running'
+    """
+    params = [_now(), job_type]
+    if expired_only:
+        sql += " AND (lease_expires_at IS NULL OR lease_expires_at < ?)"
+        params.append(time.time())
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql + " RETURNING id", params)
+        job_ids = [row[0] for row in c.fetchall()]
+        conn.commit()
+    for job_id in job_ids:
+        add_job_event(job_id, "job.requeued", "Lease expired" if expired_only else "Recovered after restart")
+    return job_ids
+
+
 def get_job(job_id):
     with get_connection() as conn:
         c = conn.cursor()
@@ -171,6 +426,17 @@ def list_jobs(limit=50, status=None, job_type=None):
     return [_decode_job(row) for row in rows]
 
 
+def list_queued_jobs(job_type, limit=500):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT * FROM jobs WHERE job_type = ? AND status = 'queued' ORDER BY id LIMIT ?",
+            (job_type, limit),
+        )
+        rows = c.fetchall()
+    return [_decode_job(row) for row in rows]
+
+
 def get_job_events(job_id, limit=20):
     with get_connection() as conn:
         c = conn.cursor()
@@ -0,0 +1,190 @@
+from datetime import datetime, timezone
+
+from ..core import get_connection
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def get_library_file_index():
+    """{path: (size_bytes, mtime, download_query)} for every file currently on disk."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT path, size_bytes, mtime, download_query FROM library_files WHERE status = 'present'")
+        return {row[0]: (row[1], row[2], row[3]) for row in c.fetchall()}
+
+
+def upsert_library_files(files):
+    """Insert or refresh scanned files (dicts with the library_files columns)."""
+    if not files:
+        return 0
+    now = _now()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            """
+            INSERT INTO library_files (
+                path, size_bytes, mtime, duration_seconds, bitrate, content_hash,
+                download_query, status, first_seen_at, scanned_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'present', ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size_bytes = excluded.size_bytes,
+                mtime = excluded.mtime,
+                duration_seconds = excluded.duration_seconds,
+                bitrate = excluded.bitrate,
+                content_hash = excluded.content_hash,
+                download_query = excluded.download_query,
+                status = 'present',
+                scanned_at = excluded.scanned_at
+            """,
+            [
+                (
+                    item["path"],
+                    item["size_bytes"],
+                    item["mtime"],
+                    item.get("duration_seconds"),
+                    item.get("bitrate"),
+                    item.get("content_hash"),
+                    item.get("download_query"),
+                    now,
+                    now,
+                )
+                for item in files
+            ],
+        )
+        conn.commit()
+    return len(files)
+
+
+def link_library_files(links):
+    """Update ``download_query`` for unchanged files; ``links`` is a list of (path, query)."""
+    if not links:
+        return 0
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            "UPDATE library_files SET download_query = ? WHERE path = ?",
+            [(query, path) for path, query in links],
+        )
+        conn.commit()
+    return len(links)
+
+
+def mark_library_files_missing(paths):
+    paths = list(paths)
+    if not paths:
+        return 0
+    now = _now()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            "UPDATE library_files SET status = 'missing', scanned_at = ? WHERE path = ?",
+            [(now, path) for path in paths],
+        )
+        conn.commit()
+    return len(paths)
+
+
+def record_library_scan(started_at, stats, duration_ms):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            INSERT INTO library_scans (
+                started_at, finished_at, files_seen, added, changed, removed, relinked, errors, duration_ms
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                started_at,
+                _now(),
+                stats.get("files_seen", 0),
+                stats.get("added", 0),
+                stats.get("changed", 0),
+                stats.get("removed", 0),
+                stats.get("relinked", 0),
+                stats.get("errors", 0),
+                duration_ms,
+            ),
+        )
+        conn.commit()
+
+
+def get_last_library_scan():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM library_scans ORDER BY id DESC LIMIT 1")
+        row = c.fetchone()
+    return dict(row) if row else None
+
+
+def list_orphan_library_files(limit=100):
+    """Files on disk that no completed download accounts for."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT * FROM library_files
+            WHERE status = 'present' AND download_query IS NULL
+            ORDER BY path
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [dict(row) for row in c.fetchall()]
+
+
+def list_missing_library_downloads(limit=100):
+    """Completed downloads whose file is not (or no longer) on disk."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT d.* FROM downloads d
+            WHERE d.status = 'completed'
+            AND NOT EXISTS (
+                SELECT 1 FROM library_files f
+                WHERE f.download_query = d.query AND f.status = 'present'
+            )
+            ORDER BY d.created_at DESC
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [dict(row) for row in c.fetchall()]
+
+
+def get_library_summary():
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            SELECT
+                SUM(CASE WHEN status = 'present' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'present' THEN size_bytes ELSE 0 END),
+                SUM(CASE WHEN status = 'missing' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status = 'present' AND download_query IS NULL THEN 1 ELSE 0 END)
+            FROM library_files
+            """
+        )
+        files, total_bytes, removed, orphans = c.fetchone()
+        c.execute(
+            """
+            SELECT COUNT(*) FROM downloads d
+            WHERE d.status = 'completed'
+            AND NOT EXISTS (
+                SELECT 1 FROM library_files f
+                WHERE f.download_query = d.query AND f.status = 'present'
+            )
+            """
+        )
+        missing_downloads = c.fetchone()[0]
+    return {
+        "files": files or 0,
+        "bytes": total_bytes or 0,
+        "removed_files": removed or 0,
+        "orphan_files": orphans or 0,
+        "missing_downloads": missing_downloads,
+    }
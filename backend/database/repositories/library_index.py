@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import Counter
+
+from ..core import get_connection, get_db_path
+
+# Completed downloads are checked on every recommendation, gaps and releases request,
+# so membership is kept in memory per database file. add_download updates it in place;
+# bulk writes invalidate it, and LIBRARY_INDEX_TTL_SECONDS covers writes from another
+# process.
+LIBRARY_INDEX_TTL_SECONDS = 300
+
+
+def track_key(artist, title):
+    return ((artist or "").lower(), (title or "").lower())
+
+
+class LibraryIndex:
+    """Membership of completed downloads: track keys, artists, and per-artist/album counts."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._db_path = None
+        self._loaded_at = 0.0
+        self._rows = None
+        self._tracks = Counter()
+        self._artists = Counter()
+        self._albums = Counter()
+
+    def _ensure_loaded(self):
+        db_path = get_db_path()
+        with self._lock:
+            if (
+                self._rows is not None
+                and self._db_path == db_path
+                and time.monotonic() - self._loaded_at < LIBRARY_INDEX_TTL_SECONDS
+            ):
+                return
+            with get_connection() as conn:
+                c = conn.cursor()
+                c.execute("SELECT query, artist, title, album FROM downloads WHERE status = 'completed'")
+                rows = c.fetchall()
+            self._rows = {}
+            self._tracks = Counter()
+            self._artists = Counter()
+            self._albums = Counter()
+            for query, artist, title, album in rows:
+                self._add(query, artist, title, album)
+            self._db_path = db_path
+            self._loaded_at = time.monotonic()
+
+    def _add(self, query, artist, title, album):
+        entry = (track_key(artist, title), artist, album)
+        self._rows[query] = entry
+        self._count(entry, 1)
+
+    def _count(self, entry, delta):
+        key, artist, album = entry
+        for counter, counter_key, present in (
+            (self._tracks, key, True),
+            (self._artists, key[0], bool(artist)),
+            (self._albums, (artist, album), bool(album)),
+        ):
+            if not present:
+                continue
+            counter[counter_key] += delta
+            if counter[counter_key] <= 0:
+                del counter[counter_key]
+
+    def record(self, query, artist, title, album, status):
+        """Apply one downloads-row write. A no-op until the index has been loaded."""
+        with self._lock:
+            if self._rows is None or self._db_path != get_db_path():
+                return
+            previous = self._rows.pop(query, None)
+            if previous:
+                self._count(previous, -1)
+            if status == "completed":
+                self._add(query, artist, title, album)
+
+    def invalidate(self):
+        with self._lock:
+            self._rows = None
+
+    def contains(self, artist, title):
+        self._ensure_loaded()
+        return track_key(artist, title) in self._tracks
+
+    def contains_many(self, tracks):
+        """``[contains(artist, title) ...]`` for an iterable of (artist, title) pairs."""
+        self._ensure_loaded()
+        tracks_index = self._tracks
+        return [track_key(artist, title) in tracks_index for artist, title in tracks]
+
+    def has_artist(self, artist):
+        self._ensure_loaded()
+        return (artist or "").lower() in self._artists
+
+    def artist_track_count(self, artist):
+        self._ensure_loaded()
+        return self._artists.get((artist or "").lower(), 0)
+
+    def album_counts(self):
+        """{(artist, album): completed tracks}, as stored on the download rows."""
+        self._ensure_loaded()
+        with self._lock:
+            return dict(self._albums)
+
+    def get_stats(self):
+        self._ensure_loaded()
+        with self._lock:
+            return {"tracks": len(self._rows), "artists": len(self._artists), "albums": len(self._albums)}
+
+
+library_index = LibraryIndex()
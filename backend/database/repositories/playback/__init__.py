@@ -5,18 +5,31 @@ from .playback_sessions import (
     finish_playback_session,
     get_active_playback_session,
     get_playback_session,
+    get_queue_window,
     get_radio_session,
     list_active_playback_sessions,
     list_active_radio_sessions,
+    load_session_queue,
     replace_queue_segment,
     update_playback_session,
     update_radio_session,
 )
 from .playback_stats import get_streaming_dashboard_stats
-from .queue_ops import clear_upcoming_queue_items, insert_queue_items, remove_queue_item, reorder_queue_items
+from .queue_items import QueueVersionConflict
+from .queue_ops import (
+    advance_queue,
+    append_queue_items,
+    clear_upcoming_queue_items,
+    insert_queue_items,
+    remove_queue_item,
+    reorder_queue_items,
+)
+from .source_candidates import delete_source_candidate, get_source_candidates, save_source_candidates
 from .stream_sources import (
     find_recent_stream_source,
+    find_recent_stream_sources_for_tracks,
     get_stream_failure_counts,
+    get_stream_failure_counts_for_tracks,
     get_stream_source,
     get_stream_source_by_cache_key,
     list_recent_stream_sources,
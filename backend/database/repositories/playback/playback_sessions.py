@@ -1,7 +1,43 @@
 from ...connection import get_connection
+from .queue_items import count_queue, load_queue, load_queue_window, replace_queue
 from .shared import UNSET, json_dump, now_iso, parse_row
 
 
+def hydrate_session(cursor, row, with_queue=True):
+    """
+    Session row as a dict with its ``queue_length``, plus ``queue_payload`` assembled
+    from playback_queue_items when ``with_queue`` is set.
+
+    Paths that only move the play head or look a few items ahead read the session
+    without its queue and use ``get_queue_window``; ``load_session_queue`` fills the
+    queue in when the session is rendered.
+    """
+    session = parse_row(row)
+    if session:
+        if with_queue:
+            session["queue_payload"] = load_queue(cursor, session["id"])
+            session["queue_length"] = len(session["queue_payload"])
+        else:
+            # The legacy JSON column is superseded by the rows; don't pass it off as the queue.
+            session.pop("queue_payload", None)
+            session["queue_length"] = count_queue(cursor, session["id"])
+    return session
+
+
+def load_session_queue(session):
+    """The session's full queue, loaded once and kept on the dict for later readers."""
+    if "queue_payload" not in session:
+        with get_connection() as conn:
+            session["queue_payload"] = load_queue(conn.cursor(), session["id"])
+        session["queue_length"] = len(session["queue_payload"])
+    return session["queue_payload"]
+
+
+def get_queue_window(session_id, start, count):
+    with get_connection() as conn:
+        return load_queue_window(conn.cursor(), session_id, start, count)
+
+
 def create_playback_session(
     *,
     username,
@@ -23,10 +59,10 @@ def create_playback_session(
         cursor.execute(
             """
             INSERT INTO playback_sessions (
-                username, mode, status, seed_type, seed_payload, current_index, queue_payload,
+                username, mode, status, seed_type, seed_payload, current_index,
                 suspended_queue_payload, suspended_mode, started_at, updated_at, finished_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 username,
@@ -35,7 +71,6 @@ def create_playback_session(
                 seed_type,
                 json_dump(seed_payload),
                 current_index,
-                json_dump(queue_payload or []),
                 json_dump(suspended_queue_payload),
                 suspended_mode,
                 started_at,
@@ -44,20 +79,21 @@ def create_playback_session(
             ),
         )
         session_id = cursor.lastrowid
+        replace_queue(cursor, session_id, queue_payload or [])
         cursor.execute("SELECT * FROM playback_sessions WHERE id = ?", (session_id,))
-        row = cursor.fetchone()
+        session = hydrate_session(cursor, cursor.fetchone())
         conn.commit()
-    return parse_row(row)
+    return session
 
 
-def get_playback_session(session_id):
+def get_playback_session(session_id, with_queue=True):
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM playback_sessions WHERE id = ?", (session_id,))
-        return parse_row(cursor.fetchone())
+        return hydrate_session(cursor, cursor.fetchone(), with_queue=with_queue)
 
 
-def get_active_playback_session(username):
+def get_active_playback_session(username, with_queue=True):
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
@@ -69,7 +105,7 @@ def get_active_playback_session(username):
             """,
             (username,),
         )
-        return parse_row(cursor.fetchone())
+        return hydrate_session(cursor, cursor.fetchone(), with_queue=with_queue)
 
 
 def update_playback_session(
@@ -84,6 +120,7 @@ def update_playback_session(
     suspended_queue_payload=UNSET,
     suspended_mode=UNSET,
     finished_at=UNSET,
+    with_queue=True,
 ):
     updates = []
     params = []
@@ -102,9 +139,8 @@ def update_playback_session(
     if current_index is not UNSET:
         updates.append("current_index = ?")
         params.append(current_index)
-    if queue_payload is not UNSET:
-        updates.append("queue_payload = ?")
-        params.append(json_dump(queue_payload))
+    if current_index is not UNSET or queue_payload is not UNSET:
+        updates.append("queue_version = queue_version + 1")
     if suspended_queue_payload is not UNSET:
         updates.append("suspended_queue_payload = ?")
         params.append(json_dump(suspended_queue_payload))
@@ -120,14 +156,19 @@ def update_playback_session(
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(f"UPDATE playback_sessions SET {', '.join(updates)} WHERE id = ?", params)
+        if queue_payload is not UNSET and cursor.rowcount:
+            # Wholesale replacement; targeted edits live in queue_ops.
+            replace_queue(cursor, session_id, queue_payload or [])
         cursor.execute("SELECT * FROM playback_sessions WHERE id = ?", (session_id,))
-        row = cursor.fetchone()
+        session = hydrate_session(cursor, cursor.fetchone(), with_queue=with_queue)
         conn.commit()
-    return parse_row(row)
+    return session
 
 
-def finish_playback_session(session_id, finished_at=None):
-    return update_playback_session(session_id, status="finished", finished_at=finished_at or now_iso())
+def finish_playback_session(session_id, finished_at=None, with_queue=True):
+    return update_playback_session(
+        session_id, status="finished", finished_at=finished_at or now_iso(), with_queue=with_queue
+    )
 
 
 def replace_queue_segment(
@@ -154,7 +195,7 @@ def list_active_playback_sessions(limit=50):
             "SELECT * FROM playback_sessions WHERE status IN ('active', 'paused') ORDER BY updated_at DESC LIMIT ?",
             (limit,),
         )
-        return [parse_row(row) for row in cursor.fetchall()]
+        return [hydrate_session(cursor, row, with_queue=False) for row in cursor.fetchall()]
 
 
 def create_radio_session(username, seed_type, seed_payload, queue_payload, status="active"):
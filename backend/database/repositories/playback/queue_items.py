@@ -0,0 +1,98 @@
+import json
+
+from .shared import json_dump, now_iso
+
+# Below this gap a fractional insert would lose precision; the session is renumbered first.
+MIN_POSITION_GAP = 1e-6
+
+
+class QueueVersionConflict(Exception):
+    """The session's queue changed since the caller last read it."""
+
+    def __init__(self, session_id, expected_version, actual_version):
+        super().__init__(
+            f"Queue for session {session_id} is at version {actual_version}, expected {expected_version}"
+        )
+        self.session_id = session_id
+        self.expected_version = expected_version
+        self.actual_version = actual_version
+
+
+def load_queue(cursor, session_id):
+    cursor.execute(
+        "SELECT payload FROM playback_queue_items WHERE session_id = ? ORDER BY position, id",
+        (session_id,),
+    )
+    return [json.loads(row[0]) for row in cursor.fetchall()]
+
+
+def load_queue_window(cursor, session_id, start, count):
+    """Items ``start`` .. ``start + count - 1`` in queue order, without reading the rest."""
+    cursor.execute(
+        "SELECT payload FROM playback_queue_items WHERE session_id = ? ORDER BY position, id LIMIT ? OFFSET ?",
+        (session_id, count, max(start, 0)),
+    )
+    return [json.loads(row[0]) for row in cursor.fetchall()]
+
+
+def count_queue(cursor, session_id):
+    cursor.execute("SELECT COUNT(*) FROM playback_queue_items WHERE session_id = ?", (session_id,))
+    return cursor.fetchone()[0]
+
+
+def write_items(cursor, session_id, items, positions):
+    now = now_iso()
+    cursor.executemany(
+        """
+        INSERT INTO playback_queue_items (session_id, position, track_key, payload, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(session_id, position, item.get("track_key"), json_dump(item), now) for item, position in zip(items, positions)],
+    )
+
+
+def replace_queue(cursor, session_id, items):
+    cursor.execute("DELETE FROM playback_queue_items WHERE session_id = ?", (session_id,))
+    write_items(cursor, session_id, items, [float(i + 1) for i in range(len(items))])
+
+
+def position_at(cursor, session_id, index):
+    """Position of the item at ``index`` in queue order, or None past the end."""
+    if index < 0:
+        return None
+    cursor.execute(
+        "SELECT position FROM playback_queue_items WHERE session_id = ? ORDER BY position, id LIMIT 1 OFFSET ?",
+        (session_id, index),
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def renumber(cursor, session_id):
+    cursor.execute(
+        """
+        WITH ranked AS (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY position, id) AS rn
+            FROM playback_queue_items
+            WHERE session_id = ?
+        )
+        UPDATE playback_queue_items
+        SET position = (SELECT rn FROM ranked WHERE ranked.id = playback_queue_items.id)
+        WHERE session_id = ?
+        """,
+        (session_id, session_id),
+    )
+
+
+def positions_between(before, after, count):
+    """``count`` evenly spaced positions strictly between two neighbours (either may be None)."""
+    if before is None and after is None:
+        return [float(i + 1) for i in range(count)]
+    if after is None:
+        return [before + i + 1 for i in range(count)]
+    if before is None:
+        return [after - count + i for i in range(count)]
+    step = (after - before) / (count + 1)
+    if step < MIN_POSITION_GAP:
+        return None
+    return [before + step * (i + 1) for i in range(count)]
@@ -1,44 +1,145 @@
-from .playback_sessions import get_playback_session, update_playback_session
+from ...connection import get_connection
+from .playback_sessions import hydrate_session
+from .queue_items import QueueVersionConflict, position_at, positions_between, renumber, write_items
+from .shared import now_iso
 
+# Attempts for an internal edit (no caller-supplied version) that raced another writer.
+MAX_EDIT_ATTEMPTS = 3
 
-def insert_queue_items(session_id, index, items):
-    session = get_playback_session(session_id)
-    if not session:
+
+def _edit_queue(session_id, expected_version, edit):
+    """
+    Run ``edit(cursor, session)`` against the session's queue rows and bump its
+    ``queue_version`` in the same transaction.
+
+    The bump is conditional on the version read beforehand, so concurrent edits never
+    silently overwrite each other: with ``expected_version`` the caller gets a
+    ``QueueVersionConflict``; without one the edit is retried on a fresh read.
+    ``edit`` may return a dict of extra session columns to set (e.g. current_index).
+    The updated session is returned without its queue (see ``load_session_queue``).
+    """
+    for _ in range(MAX_EDIT_ATTEMPTS):
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, current_index, queue_version FROM playback_sessions WHERE id = ?", (session_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            session = dict(row)
+            version = session["queue_version"] or 0
+            if expected_version is not None and expected_version != version:
+                raise QueueVersionConflict(session_id, expected_version, version)
+
+            updates = edit(cursor, session) or {}
+            assignments = "".join(f", {column} = ?" for column in updates)
+            cursor.execute(
+                f"""
+                UPDATE playback_sessions
+                SET queue_version = queue_version + 1, updated_at = ?{assignments}
+                WHERE id = ? AND COALESCE(queue_version, 0) = ?
+                """,
+                [now_iso(), *updates.values(), session_id, version],
+            )
+            if cursor.rowcount:
+                cursor.execute("SELECT * FROM playback_sessions WHERE id = ?", (session_id,))
+                updated = hydrate_session(cursor, cursor.fetchone(), with_queue=False)
+                conn.commit()
+                return updated
+            conn.rollback()
+            if expected_version is not None:
+                cursor.execute("SELECT queue_version FROM playback_sessions WHERE id = ?", (session_id,))
+                raise QueueVersionConflict(session_id, expected_version, cursor.fetchone()[0])
+    raise QueueVersionConflict(session_id, version, None)
+
+
+def _current_position(cursor, session):
+    return position_at(cursor, session["id"], session.get("current_index") or 0)
+
+
+def insert_queue_items(session_id, index, items, expected_version=None):
+    """Insert ``items`` so the first lands at ``index``; only the new rows are written."""
+
+    def edit(cursor, session):
+        if not items:
+            return None
+        before = position_at(cursor, session_id, index - 1) if index > 0 else None
+        after = position_at(cursor, session_id, index)
+        positions = positions_between(before, after, len(items))
+        if positions is None:
+            renumber(cursor, session_id)
+            before = position_at(cursor, session_id, index - 1) if index > 0 else None
+            after = position_at(cursor, session_id, index)
+            positions = positions_between(before, after, len(items))
+        write_items(cursor, session_id, items, positions)
         return None
-    queue = list(session.get("queue_payload") or [])
-    queue[index:index] = items
-    return update_playback_session(session_id, queue_payload=queue)
 
+    return _edit_queue(session_id, expected_version, edit)
 
-def remove_queue_item(session_id, track_key):
-    session = get_playback_session(session_id)
-    if not session:
+
+def append_queue_items(session_id, items, expected_version=None):
+    def edit(cursor, session):
+        cursor.execute("SELECT MAX(position) FROM playback_queue_items WHERE session_id = ?", (session_id,))
+        last = cursor.fetchone()[0]
+        write_items(cursor, session_id, items, positions_between(last, None, len(items)))
         return None
-    queue = list(session.get("queue_payload") or [])
-    filtered = [item for item in queue if item.get("track_key") != track_key]
-    if len(filtered) == len(queue):
-        return session
-    current_index = min(session.get("current_index", 0), max(len(filtered) - 1, 0))
-    return update_playback_session(session_id, queue_payload=filtered, current_index=current_index)
+
+    return _edit_queue(session_id, expected_version, edit)
 
 
-def reorder_queue_items(session_id, ordered_track_keys):
-    session = get_playback_session(session_id)
-    if not session:
+def remove_queue_item(session_id, track_key, expected_version=None):
+    def edit(cursor, session):
+        cursor.execute(
+            "DELETE FROM playback_queue_items WHERE session_id = ? AND track_key = ?",
+            (session_id, track_key),
+        )
+        if not cursor.rowcount:
+            return None
+        cursor.execute("SELECT COUNT(*) FROM playback_queue_items WHERE session_id = ?", (session_id,))
+        remaining = cursor.fetchone()[0]
+        current_index = min(session.get("current_index") or 0, max(remaining - 1, 0))
+        return {"current_index": current_index}
+
+    return _edit_queue(session_id, expected_version, edit)
+
+
+def reorder_queue_items(session_id, ordered_track_keys, expected_version=None):
+    """Reorder the items after the current one; only those rows are rewritten."""
+
+    def edit(cursor, session):
+        current = _current_position(cursor, session)
+        if current is None:
+            return None
+        cursor.execute(
+            "SELECT id, track_key FROM playback_queue_items WHERE session_id = ? AND position > ? ORDER BY position, id",
+            (session_id, current),
+        )
+        ids_by_key = {}
+        for row in cursor.fetchall():
+            ids_by_key.setdefault(row[1], []).append(row[0])
+        moves = []
+        for offset, key in enumerate(ordered_track_keys, start=1):
+            ids = ids_by_key.get(key)
+            if ids:
+                moves.append((current + offset, ids.pop(0)))
+        cursor.executemany("UPDATE playback_queue_items SET position = ? WHERE id = ?", moves)
         return None
-    queue = list(session.get("queue_payload") or [])
-    current_index = session.get("current_index", 0)
-    current_item = queue[: current_index + 1]
-    upcoming = queue[current_index + 1 :]
-    upcoming_by_key = {item.get("track_key"): item for item in upcoming}
-    reordered = [upcoming_by_key[key] for key in ordered_track_keys]
-    return update_playback_session(session_id, queue_payload=current_item + reordered)
-
-
-def clear_upcoming_queue_items(session_id):
-    session = get_playback_session(session_id)
-    if not session:
+
+    return _edit_queue(session_id, expected_version, edit)
+
+
+def clear_upcoming_queue_items(session_id, expected_version=None):
+    def edit(cursor, session):
+        current = _current_position(cursor, session)
+        if current is not None:
+            cursor.execute(
+                "DELETE FROM playback_queue_items WHERE session_id = ? AND position > ?",
+                (session_id, current),
+            )
         return None
-    queue = list(session.get("queue_payload") or [])
-    current_index = session.get("current_index", 0)
-    return update_playback_session(session_id, queue_payload=queue[: current_index + 1])
+
+    return _edit_queue(session_id, expected_version, edit)
+
+
+def advance_queue(session_id, current_index, expected_version=None):
+    """Move the play head; no queue rows are touched."""
+    return _edit_queue(session_id, expected_version, lambda cursor, session: {"current_index": current_index})
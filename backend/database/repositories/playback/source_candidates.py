@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+from ...connection import get_connection
+from .shared import now_iso
+
+
+def save_source_candidates(cache_key, candidates):
+    """
+    Replace the scored search results remembered for ``cache_key``. Each candidate is a
+    dict with ``source_url`` and ``score`` plus optional ``source_name``, ``title`` and
+    ``duration_seconds``.
+    """
+    resolved_at = now_iso()
+    rows = [
+        (
+            cache_key,
+            candidate["source_url"],
+            candidate.get("source_name"),
+            candidate.get("title"),
+            candidate.get("duration_seconds"),
+            candidate.get("score") or 0,
+            resolved_at,
+        )
+        for candidate in candidates
+        if candidate.get("source_url")
+    ]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM source_candidates WHERE cache_key = ?", (cache_key,))
+        cursor.executemany(
+            """
+            INSERT OR REPLACE INTO source_candidates (
+                cache_key, source_url, source_name, title, duration_seconds, score, resolved_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+    return len(rows)
+
+
+def get_source_candidates(cache_key, min_score=None, max_age_days=None):
+    sql = "SELECT * FROM source_candidates WHERE cache_key = ?"
+    params = [cache_key]
+    if min_score is not None:
+        sql += " AND score >= ?"
+        params.append(min_score)
+    if max_age_days is not None:
+        sql += " AND resolved_at >= ?"
+        params.append((datetime.now(timezone.utc) - timedelta(days=max_age_days)).isoformat())
+    sql += " ORDER BY score DESC, resolved_at DESC"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def delete_source_candidate(cache_key, source_url):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM source_candidates WHERE cache_key = ? AND source_url = ?",
+            (cache_key, source_url),
+        )
+        conn.commit()
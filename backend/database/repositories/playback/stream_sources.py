@@ -108,6 +108,60 @@ def find_recent_stream_source(artist, title, album=None, healthy_only=False):
         return parse_row(cursor.fetchone())
 
 
+def find_recent_stream_sources_for_tracks(tracks):
+    """
+    Batch form of ``find_recent_stream_source``: {(artist, title, album): most recent row}
+    for the given tracks. As there, an empty album matches a source for any album.
+    """
+    wanted = list(dict.fromkeys((artist, title, album or "") for artist, title, album in tracks if artist and title))
+    found = {}
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for offset in range(0, len(wanted), 300):
+            chunk = wanted[offset:offset + 300]
+            values = ",".join(["(?, ?, ?)"] * len(chunk))
+            cursor.execute(
+                f"""
+                WITH wanted(artist, title, album) AS (VALUES {values})
+                SELECT w.artist AS wanted_artist, w.title AS wanted_title, w.album AS wanted_album, s.*
+                FROM wanted w
+                JOIN stream_sources s ON lower(s.artist) = lower(w.artist) AND lower(s.title) = lower(w.title)
+                WHERE w.album = '' OR lower(ifnull(s.album, '')) = lower(w.album)
+                ORDER BY s.updated_at DESC
+                """,
+                [value for track in chunk for value in track],
+            )
+            for row in cursor.fetchall():
+                item = parse_row(row)
+                key = (item.pop("wanted_artist"), item.pop("wanted_title"), item.pop("wanted_album"))
+                found.setdefault(key, item)
+    return found
+
+
+def get_stream_failure_counts_for_tracks(tracks):
+    """Batch form of ``get_stream_failure_counts``: {(artist, title): total failures}."""
+    wanted = list(dict.fromkeys((artist, title) for artist, title in tracks if artist and title))
+    counts = {}
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for offset in range(0, len(wanted), 400):
+            chunk = wanted[offset:offset + 400]
+            values = ",".join(["(?, ?)"] * len(chunk))
+            cursor.execute(
+                f"""
+                WITH wanted(artist, title) AS (VALUES {values})
+                SELECT w.artist, w.title, COALESCE(SUM(s.failure_count), 0)
+                FROM wanted w
+                JOIN stream_sources s ON lower(s.artist) = lower(w.artist) AND lower(s.title) = lower(w.title)
+                GROUP BY w.artist, w.title
+                """,
+                [value for track in chunk for value in track],
+            )
+            for artist, title, failures in cursor.fetchall():
+                counts[(artist, title)] = failures
+    return counts
+
+
 def mark_stream_source_failure(stream_source_id, error_message, health_status="degraded"):
     with get_connection() as conn:
         cursor = conn.cursor()
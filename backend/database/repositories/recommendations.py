@@ -0,0 +1,95 @@
+import json
+from datetime import datetime, timezone
+
+from ..core import get_connection
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def update_recommendation_candidates(username, candidates, replace_types=(), drop_seeds=()):
+    """
+    Apply one index refresh in a single transaction: delete every row of
+    ``replace_types``, delete similar-artist rows derived from ``drop_seeds``, then
+    insert ``candidates`` (dicts with at least artist, title, source_type).
+    """
+    now = _now()
+    replace_types = list(replace_types)
+    drop_seeds = list(drop_seeds)
+    with get_connection() as conn:
+        c = conn.cursor()
+        if replace_types:
+            placeholders = ",".join(["?"] * len(replace_types))
+            c.execute(
+                f"DELETE FROM recommendation_candidates WHERE username = ? AND source_type IN ({placeholders})",
+                [username, *replace_types],
+            )
+        if drop_seeds:
+            placeholders = ",".join(["?"] * len(drop_seeds))
+            c.execute(
+                f"""
+                DELETE FROM recommendation_candidates
+                WHERE username = ? AND source_type = 'similar_artist' AND source_artist IN ({placeholders})
+                """,
+                [username, *drop_seeds],
+            )
+        c.executemany(
+            """
+            INSERT INTO recommendation_candidates (username, source_type, source_artist, artist, title, payload, built_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    username,
+                    item["source_type"],
+                    item.get("source_artist"),
+                    item["artist"],
+                    item["title"],
+                    json.dumps(item),
+                    now,
+                )
+                for item in candidates
+            ],
+        )
+        c.execute("SELECT COUNT(*) FROM recommendation_candidates WHERE username = ?", (username,))
+        total = c.fetchone()[0]
+        conn.commit()
+    return total
+
+
+def list_recommendation_candidates(username):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT payload FROM recommendation_candidates WHERE username = ? ORDER BY id", (username,))
+        return [json.loads(row[0]) for row in c.fetchall()]
+
+
+def save_recommendation_index_state(username, seed_artists, candidate_count, duration_ms):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            """
+            INSERT INTO recommendation_index_state (username, seed_artists, candidate_count, duration_ms, built_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(username) DO UPDATE SET
+                seed_artists = excluded.seed_artists,
+                candidate_count = excluded.candidate_count,
+                duration_ms = excluded.duration_ms,
+                built_at = excluded.built_at
+            """,
+            (username, json.dumps(seed_artists), candidate_count, duration_ms, _now()),
+        )
+        conn.commit()
+
+
+def get_recommendation_index_state(username):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute("SELECT * FROM recommendation_index_state WHERE username = ?", (username,))
+        row = c.fetchone()
+    if not row:
+        return None
+    state = dict(row)
+    state["seed_artists"] = json.loads(state["seed_artists"] or "[]")
+    return state
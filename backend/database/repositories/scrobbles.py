@@ -1,21 +1,149 @@
+import json
 import sqlite3
+from collections import Counter, defaultdict
 from datetime import datetime, timezone
 
 from ..core import get_connection
 
+_UPSERT_SCROBBLE_SQL = '''
+    INSERT INTO scrobbles (user, artist, title, album, image_url, timestamp, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user, timestamp) DO UPDATE SET
+        artist=excluded.artist,
+        title=excluded.title,
+        album=excluded.album,
+        image_url=excluded.image_url
+'''
+
+
+def _rollup_day_hour(timestamp):
+    local = datetime.fromtimestamp(timestamp)
+    return local.strftime('%Y-%m-%d'), local.hour
+
+
+def _artist_key(artist):
+    return (artist or "").strip().lower()
+
+
+LIFETIME_BUCKET = -1
+PLAYCOUNT_BUCKET_SECONDS = 86400
+
+
+def _playcount_bucket(timestamp):
+    return (timestamp // PLAYCOUNT_BUCKET_SECONDS) * PLAYCOUNT_BUCKET_SECONDS
+
+
+def _first_full_bucket(start_ts):
+    return -(-start_ts // PLAYCOUNT_BUCKET_SECONDS) * PLAYCOUNT_BUCKET_SECONDS
+
+
+def _existing_scrobbles(c, rows):
+    """Return {(user, timestamp): row} for scrobbles that the upsert will overwrite."""
+    by_user = defaultdict(list)
+    for row in rows:
+        by_user[row[0]].append(row[5])
+
+    existing = {}
+    for user, timestamps in by_user.items():
+        for offset in range(0, len(timestamps), 500):
+            chunk = timestamps[offset:offset + 500]
+            placeholders = ','.join(['?'] * len(chunk))
+            c.execute(
+                f'SELECT user, artist, title, album, image_url, timestamp FROM scrobbles WHERE user = ? AND timestamp IN ({placeholders})',
+                [user] + chunk,
+            )
+            for found in c.fetchall():
+                existing[(found[0], found[5])] = tuple(found)
+    return existing
+
+
+def _apply_rollup_deltas(c, added, removed):
+    """Adjust the rollup and play-count tables for scrobbles added to / removed from the table."""
+    daily = Counter()
+    hourly = Counter()
+    artist_plays = Counter()
+    track_plays = Counter()
+    track_images = {}
+    for rows, sign in ((added, 1), (removed, -1)):
+        for user, artist, title, _album, image_url, timestamp in rows:
+            day, hour = _rollup_day_hour(timestamp)
+            daily[(user, '', day)] += sign
+            artist_key = _artist_key(artist)
+            if artist_key:
+                daily[(user, artist_key, day)] += sign
+            hourly[(user, day, hour)] += sign
+
+            artist = artist or ''
+            title = title or ''
+            for bucket in (LIFETIME_BUCKET, _playcount_bucket(timestamp)):
+                artist_plays[(user, bucket, artist)] += sign
+                track_plays[(user, bucket, artist, title)] += sign
+                if sign > 0 and image_url:
+                    track_images[(user, bucket, artist, title)] = image_url
+
+    c.executemany('''
+        INSERT INTO scrobble_daily_counts (user, artist_key, day, scrobble_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user, artist_key, day) DO UPDATE SET
+            scrobble_count = scrobble_count + excluded.scrobble_count
+    ''', [key + (count,) for key, count in daily.items() if count])
+    c.executemany('''
+        INSERT INTO scrobble_hourly_counts (user, day, hour, scrobble_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user, day, hour) DO UPDATE SET
+            scrobble_count = scrobble_count + excluded.scrobble_count
+    ''', [key + (count,) for key, count in hourly.items() if count])
+    c.executemany('''
+        INSERT INTO artist_playcounts (user, bucket_start, artist, playcount)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user, bucket_start, artist) DO UPDATE SET
+            playcount = playcount + excluded.playcount
+    ''', [key + (count,) for key, count in artist_plays.items() if count])
+    c.executemany('''
+        INSERT INTO track_playcounts (user, bucket_start, artist, title, image_url, playcount)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(user, bucket_start, artist, title) DO UPDATE SET
+            playcount = playcount + excluded.playcount,
+            image_url = COALESCE(excluded.image_url, image_url)
+    ''', [
+        key + (track_images.get(key), count)
+        for key, count in track_plays.items()
+        if count or key in track_images
+    ])
+    if removed:
+        c.execute('DELETE FROM scrobble_daily_counts WHERE scrobble_count <= 0')
+        c.execute('DELETE FROM scrobble_hourly_counts WHERE scrobble_count <= 0')
+        c.execute('DELETE FROM artist_playcounts WHERE playcount <= 0')
+        c.execute('DELETE FROM track_playcounts WHERE playcount <= 0')
+
+
+def _write_scrobbles(c, scrobbles):
+    """
+    Upsert scrobble tuples (user, artist, title, album, image_url, timestamp) and keep
+    the rollup tables in step, all on the caller's transaction. Returns the upsert rowcount.
+    """
+    # Last write wins for duplicate (user, timestamp) pairs, as with the plain upsert.
+    deduped = {}
+    for s in scrobbles:
+        row = tuple(s)
+        deduped[(row[0], row[5])] = row
+    rows = list(deduped.values())
+
+    existing = _existing_scrobbles(c, rows)
+    now = datetime.now(timezone.utc).isoformat()
+    c.executemany(_UPSERT_SCROBBLE_SQL, [row + (now,) for row in rows])
+    written = c.rowcount
+
+    removed = list(existing.values())
+    _apply_rollup_deltas(c, rows, removed)
+    return written
+
+
 def add_scrobble(user, artist, title, album, image_url, timestamp):
     with get_connection() as conn:
         c = conn.cursor()
         try:
-            c.execute('''
-                INSERT INTO scrobbles (user, artist, title, album, image_url, timestamp, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(user, timestamp) DO UPDATE SET
-                    artist=excluded.artist,
-                    title=excluded.title,
-                    album=excluded.album,
-                    image_url=excluded.image_url
-            ''', (user, artist, title, album, image_url, timestamp, datetime.now(timezone.utc).isoformat()))
+            _write_scrobbles(c, [(user, artist, title, album, image_url, timestamp)])
             conn.commit()
             return True
         except Exception as e:
@@ -26,6 +154,7 @@ def add_scrobbles_batch(scrobbles):
     """
     Batch insert scrobbles. 
     scrobbles is a list of dicts/tuples: (user, artist, title, album, image_url, timestamp)
+    The daily/hourly rollups are updated in the same transaction.
     """
     if not scrobbles:
         return 0
@@ -33,30 +162,124 @@ def add_scrobbles_batch(scrobbles):
     with get_connection() as conn:
         c = conn.cursor()
         try:
-            # Prepare data with created_at
-            now = datetime.now(timezone.utc).isoformat()
-            data = []
-            for s in scrobbles:
-                # s is expected to be a tuple/list matching the order
-                # (user, artist, title, album, image_url, timestamp)
-                # We add 'now' to it.
-                data.append(tuple(s) + (now,))
-
-            c.executemany('''
-                INSERT INTO scrobbles (user, artist, title, album, image_url, timestamp, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(user, timestamp) DO UPDATE SET
-                    artist=excluded.artist,
-                    title=excluded.title,
-                    album=excluded.album,
-                    image_url=excluded.image_url
-            ''', data)
+            written = _write_scrobbles(c, scrobbles)
             conn.commit()
-            return c.rowcount
+            return written
         except Exception as e:
             print(f"Error adding scrobbles batch: {e}")
             return 0
 
+def backfill_scrobble_rollups(c, user=None):
+    """Rebuild the rollup and play-count tables from the raw scrobbles table on cursor ``c``."""
+    tables = ('scrobble_daily_counts', 'scrobble_hourly_counts', 'artist_playcounts', 'track_playcounts')
+    if user:
+        for table in tables:
+            c.execute(f'DELETE FROM {table} WHERE user = ?', (user,))
+        c.execute('SELECT user, artist, title, album, image_url, timestamp FROM scrobbles WHERE user = ? ORDER BY timestamp', (user,))
+    else:
+        for table in tables:
+            c.execute(f'DELETE FROM {table}')
+        c.execute('SELECT user, artist, title, album, image_url, timestamp FROM scrobbles ORDER BY timestamp')
+    while True:
+        rows = c.fetchmany(5000)
+        if not rows:
+            break
+        # The delta helper reuses the cursor, so hand it a separate one.
+        _apply_rollup_deltas(c.connection.cursor(), [tuple(row) for row in rows], [])
+
+def rebuild_scrobble_rollups(user=None):
+    with get_connection() as conn:
+        c = conn.cursor()
+        backfill_scrobble_rollups(c, user)
+        conn.commit()
+
+def get_daily_scrobble_counts(user, start_day=None, end_day=None, artist=None):
+    """Return {'YYYY-MM-DD': count} from the daily rollup, optionally for one artist."""
+    sql = 'SELECT day, scrobble_count FROM scrobble_daily_counts WHERE user = ? AND artist_key = ?'
+    params = [user, _artist_key(artist)]
+    if start_day:
+        sql += ' AND day >= ?'
+        params.append(start_day)
+    if end_day:
+        sql += ' AND day <= ?'
+        params.append(end_day)
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        return {row[0]: row[1] for row in c.fetchall()}
+
+def get_hourly_scrobble_counts(user, start_day=None, end_day=None):
+    """Return {hour: count} summed over the given local-day range."""
+    sql = 'SELECT hour, SUM(scrobble_count) FROM scrobble_hourly_counts WHERE user = ?'
+    params = [user]
+    if start_day:
+        sql += ' AND day >= ?'
+        params.append(start_day)
+    if end_day:
+        sql += ' AND day <= ?'
+        params.append(end_day)
+    sql += ' GROUP BY hour'
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(sql, params)
+        return {row[0]: row[1] for row in c.fetchall()}
+
+def get_active_scrobble_days(user, limit=3660):
+    """Most recent local days with at least one scrobble, newest first."""
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute(
+            "SELECT day FROM scrobble_daily_counts WHERE user = ? AND artist_key = '' ORDER BY day DESC LIMIT ?",
+            (user, limit),
+        )
+        return [row[0] for row in c.fetchall()]
+
+def get_sync_checkpoint(user):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT * FROM scrobble_sync_checkpoints WHERE user = ?', (user,))
+        row = c.fetchone()
+        if not row:
+            return None
+        item = dict(row)
+        item["completed_pages"] = set(json.loads(item["completed_pages"] or "[]"))
+        return item
+
+def start_sync_checkpoint(user, from_ts, to_ts, total_pages=None):
+    now = datetime.now(timezone.utc).isoformat()
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('''
+            INSERT INTO scrobble_sync_checkpoints (user, from_ts, to_ts, total_pages, completed_pages, started_at, updated_at)
+            VALUES (?, ?, ?, ?, '[]', ?, ?)
+            ON CONFLICT(user) DO UPDATE SET
+                total_pages = COALESCE(excluded.total_pages, total_pages),
+                updated_at = excluded.updated_at
+        ''', (user, from_ts, to_ts, total_pages, now, now))
+        conn.commit()
+
+def mark_sync_pages_completed(user, pages):
+    if not pages:
+        return
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('SELECT completed_pages FROM scrobble_sync_checkpoints WHERE user = ?', (user,))
+        row = c.fetchone()
+        if not row:
+            return
+        completed = set(json.loads(row[0] or "[]")) | set(pages)
+        c.execute(
+            'UPDATE scrobble_sync_checkpoints SET completed_pages = ?, updated_at = ? WHERE user = ?',
+            (json.dumps(sorted(completed)), datetime.now(timezone.utc).isoformat(), user),
+        )
+        conn.commit()
+
+def clear_sync_checkpoint(user):
+    with get_connection() as conn:
+        c = conn.cursor()
+        c.execute('DELETE FROM scrobble_sync_checkpoints WHERE user = ?', (user,))
+        conn.commit()
+
 def get_scrobbles_from_db(user, limit=50, offset=0):
     with get_connection() as conn:
         c = conn.cursor()
@@ -107,28 +330,64 @@ def get_all_scrobbles(user):
 def get_top_artists_from_db(user, limit=50, start_ts=0):
     with get_connection() as conn:
         c = conn.cursor()
-        c.execute('''
-            SELECT artist, COUNT(*) as playcount 
-            FROM scrobbles 
-            WHERE user = ? AND timestamp >= ?
-            GROUP BY artist 
-            ORDER BY playcount DESC 
-            LIMIT ?
-        ''', (user, start_ts, limit))
+        if not start_ts or start_ts <= 0:
+            c.execute('''
+                SELECT artist, playcount
+                FROM artist_playcounts
+                WHERE user = ? AND bucket_start = ?
+                ORDER BY playcount DESC
+                LIMIT ?
+            ''', (user, LIFETIME_BUCKET, limit))
+        else:
+            # Whole days come from the daily buckets; the partial first day is
+            # counted from the raw scrobbles so the window stays exact.
+            first_full = _first_full_bucket(start_ts)
+            c.execute('''
+                SELECT artist, SUM(playcount) AS playcount FROM (
+                    SELECT artist, playcount
+                    FROM artist_playcounts
+                    WHERE user = ? AND bucket_start >= ?
+                    UNION ALL
+                    SELECT COALESCE(artist, ''), COUNT(*)
+                    FROM scrobbles
+                    WHERE user = ? AND timestamp >= ? AND timestamp < ?
+                    GROUP BY artist
+                )
+                GROUP BY artist
+                ORDER BY playcount DESC
+                LIMIT ?
+            ''', (user, first_full, user, start_ts, first_full, limit))
         rows = c.fetchall()
         return [{"name": row[0], "playcount": row[1]} for row in rows]
 
 def get_top_tracks_from_db(user, limit=50, start_ts=0):
     with get_connection() as conn:
         c = conn.cursor()
-        c.execute('''
-            SELECT artist, title, image_url, COUNT(*) as playcount 
-            FROM scrobbles 
-            WHERE user = ? AND timestamp >= ?
-            GROUP BY artist, title
-            ORDER BY playcount DESC 
-            LIMIT ?
-        ''', (user, start_ts, limit))
+        if not start_ts or start_ts <= 0:
+            c.execute('''
+                SELECT artist, title, image_url, playcount
+                FROM track_playcounts
+                WHERE user = ? AND bucket_start = ?
+                ORDER BY playcount DESC
+                LIMIT ?
+            ''', (user, LIFETIME_BUCKET, limit))
+        else:
+            first_full = _first_full_bucket(start_ts)
+            c.execute('''
+                SELECT artist, title, MAX(image_url), SUM(playcount) AS playcount FROM (
+                    SELECT artist, title, image_url, playcount
+                    FROM track_playcounts
+                    WHERE user = ? AND bucket_start >= ?
+                    UNION ALL
+                    SELECT COALESCE(artist, ''), COALESCE(title, ''), MAX(image_url), COUNT(*)
+                    FROM scrobbles
+                    WHERE user = ? AND timestamp >= ? AND timestamp < ?
+                    GROUP BY artist, title
+                )
+                GROUP BY artist, title
+                ORDER BY playcount DESC
+                LIMIT ?
+            ''', (user, first_full, user, start_ts, first_full, limit))
         rows = c.fetchall()
         return [{"artist": row[0], "title": row[1], "image": row[2], "playcount": row[3]} for row in rows]
 
@@ -136,12 +395,12 @@ def get_artist_top_tracks_from_db(user, artist, limit=10):
     with get_connection() as conn:
         c = conn.cursor()
         c.execute('''
-            SELECT title, image_url, COUNT(*) as playcount 
-            FROM scrobbles 
-            WHERE user = ? AND artist LIKE ?
+            SELECT title, MAX(image_url), SUM(playcount) as playcount
+            FROM track_playcounts
+            WHERE user = ? AND bucket_start = ? AND artist LIKE ?
             GROUP BY title
             ORDER BY playcount DESC 
             LIMIT ?
-        ''', (user, artist, limit))
+        ''', (user, LIFETIME_BUCKET, artist, limit))
         rows = c.fetchall()
         return [{"title": row[0], "image": row[1], "playcount": row[2]} for row in rows]
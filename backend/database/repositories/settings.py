@@ -1,21 +1,54 @@
-from ..core import get_connection
+import threading
+import time
 
-def get_setting(key, default=None):
+from ..core import get_connection, get_db_path
+
+# Settings are read on hot paths (resolver thresholds, worker counts) but change rarely,
+# so the whole table is held in memory per database file and reloaded after a write
+# or once SETTINGS_CACHE_TTL_SECONDS has passed (covers writes from another process).
+SETTINGS_CACHE_TTL_SECONDS = 30
+
+_cache = {"db_path": None, "loaded_at": 0.0, "values": None, "version": 0}
+_cache_lock = threading.Lock()
+
+
+def _load_settings():
+    db_path = get_db_path()
+    now = time.monotonic()
+    with _cache_lock:
+        if (
+            _cache["values"] is not None
+            and _cache["db_path"] == db_path
+            and now - _cache["loaded_at"] < SETTINGS_CACHE_TTL_SECONDS
+        ):
+            return _cache["values"]
+        version = _cache["version"]
     with get_connection() as conn:
         c = conn.cursor()
-        c.execute('SELECT value FROM settings WHERE key = ?', (key,))
-        result = c.fetchone()
-        return result[0] if result else default
+        c.execute('SELECT key, value FROM settings')
+        values = {row[0]: row[1] for row in c.fetchall()}
+    with _cache_lock:
+        # Don't keep a snapshot that a concurrent write has already made stale.
+        if _cache["version"] == version:
+            _cache.update(db_path=db_path, loaded_at=now, values=values)
+    return values
+
+
+def invalidate_settings_cache():
+    with _cache_lock:
+        _cache["values"] = None
+        _cache["version"] += 1
+
+
+def get_setting(key, default=None):
+    return _load_settings().get(key, default)
 
 def set_setting(key, value):
     with get_connection() as conn:
         c = conn.cursor()
         c.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, value))
         conn.commit()
+    invalidate_settings_cache()
 
 def get_all_settings():
-    with get_connection() as conn:
-        c = conn.cursor()
-        c.execute('SELECT key, value FROM settings')
-        rows = c.fetchall()
-        return {row[0]: row[1] for row in rows}
+    return dict(_load_settings())
@@ -1,9 +1,13 @@
+from .cache import create_cache_schema
 from .concerts import create_concerts_schema
 from .downloads import create_downloads_schema
+from .images import create_images_schema
 from .intelligence import create_intelligence_schema
 from .jobs import create_jobs_schema
+from .library import create_library_schema
 from .playback import create_playback_schema
 from .playlists import create_playlists_schema
+from .recommendations import create_recommendations_schema
 from .releases import create_releases_schema
 from .scrobbles import create_scrobbles_schema
 from .settings import create_settings_schema
@@ -19,4 +23,8 @@ SCHEMA_BUILDERS = [
     create_intelligence_schema,
     create_releases_schema,
     create_playback_schema,
+    create_cache_schema,
+    create_images_schema,
+    create_library_schema,
+    create_recommendations_schema,
 ]
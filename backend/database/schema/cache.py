@@ -0,0 +1,15 @@
+def create_cache_schema(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            expires_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at)")
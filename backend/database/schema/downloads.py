@@ -32,3 +32,5 @@ def create_downloads_schema(cursor):
         cursor.execute("ALTER TABLE downloads ADD COLUMN image_url TEXT")
 
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_created_at ON downloads(created_at)")
+    # Track lookups compare case-insensitively; index the same expressions the queries use.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_track_lower ON downloads(lower(artist), lower(title), status)")
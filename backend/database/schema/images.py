@@ -0,0 +1,41 @@
+def create_images_schema(cursor):
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS image_lookups (
+            lookup_key TEXT PRIMARY KEY,
+            artist TEXT,
+            title TEXT,
+            image_url TEXT,
+            source TEXT,
+            expires_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_image_lookups_expires ON image_lookups(expires_at)")
+
+    # Content-addressed cover art store: blobs live on disk under their SHA-256,
+    # and any number of source URLs can point at the same blob.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cover_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            content_type TEXT,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cover_blobs_last_used ON cover_blobs(last_used_at)")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cover_urls (
+            url_key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cover_urls_sha256 ON cover_urls(sha256)")
@@ -26,6 +26,19 @@ def create_jobs_schema(cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_type ON jobs(status, job_type, created_at DESC)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_query ON jobs(query)")
 
+    cursor.execute("PRAGMA table_info(jobs)")
+    columns = [info[1] for info in cursor.fetchall()]
+    if "priority_class" not in columns:
+        print("Migrating database: adding priority and lease columns to jobs")
+        cursor.execute("ALTER TABLE jobs ADD COLUMN priority_class TEXT DEFAULT 'interactive'")
+    if "lease_owner" not in columns:
+        cursor.execute("ALTER TABLE jobs ADD COLUMN lease_owner TEXT")
+    if "lease_expires_at" not in columns:
+        cursor.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(job_type, status, priority_class, id)"
+    )
+
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS job_events (
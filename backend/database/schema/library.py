@@ -0,0 +1,39 @@
+def create_library_schema(cursor):
+    # One row per audio file under the downloads directory, keyed by its path relative
+    # to that directory. size/mtime let the indexer skip files that have not changed.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS library_files (
+            path TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            duration_seconds REAL,
+            bitrate INTEGER,
+            content_hash TEXT,
+            download_query TEXT,
+            status TEXT NOT NULL DEFAULT 'present',
+            first_seen_at TEXT NOT NULL,
+            scanned_at TEXT NOT NULL
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_files_status ON library_files(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_files_query ON library_files(download_query)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_library_files_hash ON library_files(content_hash)")
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS library_scans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            files_seen INTEGER DEFAULT 0,
+            added INTEGER DEFAULT 0,
+            changed INTEGER DEFAULT 0,
+            removed INTEGER DEFAULT 0,
+            relinked INTEGER DEFAULT 0,
+            errors INTEGER DEFAULT 0,
+            duration_ms INTEGER
+        )
+        """
+    )
@@ -27,6 +27,25 @@ def create_playback_schema(cursor):
     )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_stream_sources_track_lookup ON stream_sources(artist, title, updated_at DESC)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_stream_sources_health ON stream_sources(health_status, updated_at DESC)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_stream_sources_track_lower ON stream_sources(lower(artist), lower(title), updated_at DESC)"
+    )
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_candidates (
+            cache_key TEXT NOT NULL,
+            source_url TEXT NOT NULL,
+            source_name TEXT,
+            title TEXT,
+            duration_seconds REAL,
+            score REAL NOT NULL DEFAULT 0,
+            resolved_at TEXT NOT NULL,
+            PRIMARY KEY (cache_key, source_url)
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_source_candidates_rank ON source_candidates(cache_key, score DESC)")
 
     cursor.execute(
         """
@@ -68,6 +87,40 @@ def create_playback_schema(cursor):
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_playback_sessions_username_status ON playback_sessions(username, status, updated_at DESC)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_playback_sessions_mode_status ON playback_sessions(mode, status, updated_at DESC)")
 
+    cursor.execute("PRAGMA table_info(playback_sessions)")
+    session_columns = [info[1] for info in cursor.fetchall()]
+    if "queue_version" not in session_columns:
+        cursor.execute("ALTER TABLE playback_sessions ADD COLUMN queue_version INTEGER DEFAULT 0")
+
+    # One row per queued track. Positions are fractional so an insert or move only
+    # writes the rows involved; order is (position, id).
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS playback_queue_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            position REAL NOT NULL,
+            track_key TEXT,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY(session_id) REFERENCES playback_sessions(id)
+        )
+        """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_playback_queue_items_position ON playback_queue_items(session_id, position)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_playback_queue_items_track ON playback_queue_items(session_id, track_key)")
+
+    # Move queues still stored as a JSON blob on the session into rows.
+    cursor.execute(
+        """
+        INSERT INTO playback_queue_items (session_id, position, track_key, payload, created_at)
+        SELECT s.id, CAST(j.key AS REAL) + 1, json_extract(j.value, '$.track_key'), j.value, s.updated_at
+        FROM playback_sessions s, json_each(s.queue_payload) j
+        WHERE s.queue_payload IS NOT NULL AND json_valid(s.queue_payload)
+        """
+    )
+    cursor.execute("UPDATE playback_sessions SET queue_payload = NULL WHERE queue_payload IS NOT NULL")
+
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS playback_events (
@@ -0,0 +1,33 @@
+def create_recommendations_schema(cursor):
+    # Precomputed candidate pool per user. ``source_artist`` is the top artist a
+    # similar-artist row was derived from, so seeds can be added or dropped without
+    # rebuilding everything; other source types are replaced wholesale.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recommendation_candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL,
+            source_type TEXT NOT NULL,
+            source_artist TEXT,
+            artist TEXT NOT NULL,
+            title TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            built_at TEXT NOT NULL
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_recommendation_candidates_source ON recommendation_candidates(username, source_type, source_artist)"
+    )
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS recommendation_index_state (
+            username TEXT PRIMARY KEY,
+            seed_artists TEXT,
+            candidate_count INTEGER DEFAULT 0,
+            duration_ms INTEGER,
+            built_at TEXT NOT NULL
+        )
+        """
+    )
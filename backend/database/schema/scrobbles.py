@@ -1,4 +1,13 @@
 def create_scrobbles_schema(cursor):
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM sqlite_master
+        WHERE type = 'table'
+          AND name IN ('scrobble_daily_counts', 'scrobble_hourly_counts', 'artist_playcounts', 'track_playcounts')
+        """
+    )
+    rollups_existed = cursor.fetchone()[0] == 4
+
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS scrobbles (
@@ -16,6 +25,88 @@ def create_scrobbles_schema(cursor):
     )
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrobbles_user_ts ON scrobbles(user, timestamp DESC)")
 
+    # Rollups keyed by the server's local calendar day/hour. Daily rows with an
+    # empty artist_key hold the per-day total; other rows are per-artist counts.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrobble_daily_counts (
+            user TEXT NOT NULL,
+            artist_key TEXT NOT NULL DEFAULT '',
+            day TEXT NOT NULL,
+            scrobble_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, artist_key, day)
+        )
+        """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrobble_hourly_counts (
+            user TEXT NOT NULL,
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            scrobble_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, day, hour)
+        )
+        """
+    )
+
+    # Play-count aggregates for top-N queries. bucket_start is -1 for the
+    # lifetime total, otherwise the UTC day (epoch seconds) the plays fall in.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS artist_playcounts (
+            user TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            artist TEXT NOT NULL,
+            playcount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, bucket_start, artist)
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_artist_playcounts_rank ON artist_playcounts(user, bucket_start, playcount DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_artist_playcounts_bucket ON artist_playcounts(bucket_start, artist)"
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS track_playcounts (
+            user TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            artist TEXT NOT NULL,
+            title TEXT NOT NULL,
+            image_url TEXT,
+            playcount INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, bucket_start, artist, title)
+        )
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_track_playcounts_rank ON track_playcounts(user, bucket_start, playcount DESC)"
+    )
+
+    # Progress of an in-flight history sync, so an interrupted backfill resumes
+    # the same pinned window and skips pages that were already stored.
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrobble_sync_checkpoints (
+            user TEXT PRIMARY KEY,
+            from_ts INTEGER NOT NULL,
+            to_ts INTEGER NOT NULL,
+            total_pages INTEGER,
+            completed_pages TEXT NOT NULL DEFAULT '[]',
+            started_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+
+    if not rollups_existed:
+        from ..repositories.scrobbles import backfill_scrobble_rollups
+
+        backfill_scrobble_rollups(cursor)
+
     cursor.execute(
         """
         CREATE TABLE IF NOT EXISTS dismissed_recommendations (
@@ -2,32 +2,30 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from database import DB_NAME, get_job_summary, init_db, get_setting
+from database import DB_NAME, get_pool_stats, init_db, get_setting, library_index
 from core import scheduler, logger, downloader_service
-from tasks import check_new_scrobbles, refresh_daily_stats, verify_stream_sources, warm_recommendation_streamability
+from tasks import (
+    check_new_scrobbles,
+    refresh_daily_stats,
+    refresh_recommendation_index,
+    scan_library,
+    verify_stream_sources,
+    warm_recommendation_streamability,
+)
 from routers import scrobbles, stats, downloads, settings, websockets, concerts, recommendations, dashboard, playback
 from services.concerts import ConcertService
-from services.websocket_manager import manager
+from services.status_broadcaster import status_broadcaster
+from services.cache_manager import get_cache_stats
+from services.single_flight import get_single_flight_stats
+from services.image_provider import get_image_lookup_stats
+from services.cover_store import cover_store
+from services.stream_prefetcher import stream_prefetcher
+from services.recommendation_index_service import recommendation_index_service
+from services.provider_registry import providers
 from datetime import datetime
 import os
 import asyncio
 
-async def broadcast_status():
-    """Poller that broadcasts active downloads to all connected clients."""
-    while True:
-        try:
-            active_downloads = downloader_service.get_active_downloads()
-            if active_downloads or manager.active_connections:
-                 await manager.broadcast({
-                     "type": "job.summary",
-                     "summary": get_job_summary(),
-                     "active_downloads": active_downloads,
-                 })
-        except Exception as e:
-            logger.error(f"Error in broadcast loop: {e}")
-        
-        await asyncio.sleep(0.5)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -55,6 +53,22 @@ async def lifespan(app: FastAPI):
 
     if not scheduler.get_job('warm_recommendation_streamability'):
         scheduler.add_job(warm_recommendation_streamability, 'interval', hours=6, id='warm_recommendation_streamability')
+
+    # Rebuild the precomputed recommendation pool (incremental refreshes follow each scrobble sync)
+    recommendation_hours = int(get_setting("RECOMMENDATION_INDEX_REFRESH_HOURS") or 6)
+    if not scheduler.get_job('recommendation_index_refresh'):
+        scheduler.add_job(
+            refresh_recommendation_index,
+            'interval',
+            hours=recommendation_hours,
+            next_run_time=datetime.now(),
+            id='recommendation_index_refresh',
+        )
+
+    # Reconcile the downloads table with the files on disk (incremental, first pass at startup)
+    library_interval = int(get_setting("LIBRARY_SCAN_INTERVAL_MINUTES") or 60)
+    if not scheduler.get_job('library_scan'):
+        scheduler.add_job(scan_library, 'interval', minutes=library_interval, next_run_time=datetime.now(), id='library_scan')
     
     # 3. Schedule Daily Concert Sync
     # Runs unconditionally for global artist discovery
@@ -71,8 +85,12 @@ async def lifespan(app: FastAPI):
     scheduler.start()
     logger.info("Scheduler started.")
 
-    # Start WebSocket broadcaster
-    broadcast_task = asyncio.create_task(broadcast_status())
+    # Resume the durable download queue (recovers jobs interrupted by a restart)
+    downloader_service.start()
+
+    # Start WebSocket broadcaster (event driven, coalesced per second)
+    status_broadcaster.max_messages_per_second = int(get_setting("WS_MAX_MESSAGES_PER_SECOND") or 4)
+    broadcast_task = asyncio.create_task(status_broadcaster.run(downloader_service.get_active_downloads))
 
     yield
     # Shutdown
@@ -82,6 +100,7 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
     scheduler.shutdown()
+    await providers.aclose()
 
 app = FastAPI(title="Spotify Downloader API", lifespan=lifespan)
 
@@ -106,10 +125,12 @@ app.include_router(playback.router)
 app.include_router(dashboard.router)
 from routers import playlists
 app.include_router(playlists.router)
-from routers import insights, releases, gaps
+from routers import insights, releases, gaps, covers, library
 app.include_router(insights.router)
 app.include_router(releases.router)
 app.include_router(gaps.router)
+app.include_router(covers.router)
+app.include_router(library.router)
 
 # Mount downloads directory to serve audio files
 # Ensure directory exists first
@@ -122,6 +143,37 @@ app.mount("/audio", StaticFiles(directory="downloads"), name="audio")
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/database")
+async def database_health():
+    return {"status": "healthy", "pool": get_pool_stats()}
+
+@app.get("/health/cache")
+def cache_health():
+    return {
+        "status": "healthy",
+        "namespaces": get_cache_stats(include_disk=True),
+        "single_flight": get_single_flight_stats(),
+        "image_lookups": get_image_lookup_stats(),
+        "covers": cover_store.get_stats(),
+        "stream_prefetch": stream_prefetcher.get_stats(),
+        "library_index": library_index.get_stats(),
+    }
+
+@app.get("/health/downloads")
+def downloads_health():
+    return {
+        "status": "healthy",
+        "stages": downloader_service.get_pipeline_stats(),
+        "sources": downloader_service.get_source_stats(),
+    }
+
+@app.get("/health/recommendations")
+def recommendations_health():
+    return {
+        "status": "healthy",
+        "scoring": recommendation_index_service.get_stats(),
+    }
+
 @app.get("/")
 async def root():
     return {"message": "Spotify Downloader API is running"}
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+
+from services.cover_store import cover_store, is_cover_host
+
+
+router = APIRouter(tags=["covers"])
+
+
+@router.get("/covers")
+def get_cover(url: str):
+    """Serve cover art from the known artwork hosts through the shared on-disk cover store."""
+    if not is_cover_host(url):
+        raise HTTPException(status_code=400, detail="Unsupported cover host")
+    cover = cover_store.get(url)
+    if not cover:
+        raise HTTPException(status_code=404, detail="Cover not available")
+    data, content_type = cover
+    return Response(
+        content=data,
+        media_type=content_type,
+        headers={"Cache-Control": "public, max-age=604800"},
+    )
@@ -75,10 +75,10 @@ def get_dashboard_summary():
         "sync": {
             "last_run_at": None,
             "next_run_at": scrobble_job.next_run_time.isoformat() if scrobble_job and scrobble_job.next_run_time else None,
-            "is_running": bool(downloader_service.get_active_downloads()),
+            "is_running": bool(downloader_service.get_active_download_count()),
         },
         "downloads": {
-            "active": len(downloader_service.get_active_downloads()),
+            "active": downloader_service.get_active_download_count(),
             "pending": get_total_downloads_count(status="pending"),
             "failed": get_total_downloads_count(status="failed"),
             "completed_recent": min(get_total_downloads_count(status="completed"), 20),
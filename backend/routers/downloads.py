@@ -83,33 +83,13 @@ def download_song(request: DownloadRequest):
 
 @router.post("/download/all")
 def download_all_pending():
-    pending_tracks = get_all_pending_downloads()
-    count = 0
-    for track in pending_tracks:
-        downloader_service.queue_download(
-            track['query'], 
-            track['artist'], 
-            track['title'], 
-            track['album'], 
-            track['image_url']
-        )
-        count += 1
-    return {"status": "queued", "count": count}
+    result = downloader_service.queue_downloads(get_all_pending_downloads(), priority_class="bulk")
+    return {"status": "queued", "count": result["queued"], "skipped": result["skipped"]}
 
 @router.post("/download/retry-failed")
 def retry_failed_downloads():
-    failed_tracks = get_all_failed_downloads()
-    count = 0
-    for track in failed_tracks:
-        downloader_service.queue_download(
-            track['query'], 
-            track['artist'], 
-            track['title'], 
-            track['album'], 
-            track['image_url']
-        )
-        count += 1
-    return {"status": "queued", "count": count}
+    result = downloader_service.queue_downloads(get_all_failed_downloads(), priority_class="bulk")
+    return {"status": "queued", "count": result["queued"], "skipped": result["skipped"]}
 
 @router.get("/jobs")
 def get_jobs():
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, BackgroundTasks
+
+from database import get_last_library_scan, get_library_summary, list_missing_library_downloads, list_orphan_library_files
+from services.library_indexer import library_indexer
+
+
+router = APIRouter(tags=["library"])
+
+
+@router.get("/library/status")
+def get_library_status():
+    return {
+        "summary": get_library_summary(),
+        "last_scan": get_last_library_scan(),
+        "running": library_indexer.running,
+    }
+
+
+@router.get("/library/orphans")
+def get_library_orphans(limit: int = 100):
+    """Files on disk that no completed download accounts for."""
+    return {"items": list_orphan_library_files(limit)}
+
+
+@router.get("/library/missing")
+def get_library_missing(limit: int = 100):
+    """Completed downloads whose file is no longer on disk."""
+    return {"items": list_missing_library_downloads(limit)}
+
+
+@router.post("/library/scan")
+def scan_library(background_tasks: BackgroundTasks):
+    if library_indexer.running:
+        return {"status": "running"}
+    background_tasks.add_task(library_indexer.scan)
+    return {"status": "started"}
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel, Field
 
-from database import get_active_playback_session, get_setting
+from database import QueueVersionConflict, get_active_playback_session, get_setting, load_session_queue
 from services.playable_source_service import playable_source_service
 from services.radio_service import radio_service
 from services.stream_resolver import build_track_key
@@ -68,20 +68,24 @@ class QueueAddRequest(BaseModel):
     session_id: Optional[int] = None
     placement: Literal["next", "end"]
     items: list[PlaybackTrackRequest]
+    expected_version: Optional[int] = None
 
 
 class QueueRemoveRequest(BaseModel):
     session_id: int
     track_key: str
+    expected_version: Optional[int] = None
 
 
 class QueueReorderRequest(BaseModel):
     session_id: int
     ordered_track_keys: list[str]
+    expected_version: Optional[int] = None
 
 
 class QueueClearUpcomingRequest(BaseModel):
     session_id: int
+    expected_version: Optional[int] = None
 
 
 class PlayNowRequest(BaseModel):
@@ -124,7 +128,7 @@ def _resolve_playable_or_404(track):
 
 
 def _session_response(session, track=None, playable=None, skipped_tracks=None):
-    queue = session.get("queue_payload") or []
+    queue = load_session_queue(session)
     current_index = session.get("current_index", 0)
     current_track = track or (queue[current_index] if 0 <= current_index < len(queue) else None)
     stream_health = None
@@ -146,6 +150,7 @@ def _session_response(session, track=None, playable=None, skipped_tracks=None):
         "mode": session.get("mode"),
         "status": session.get("status"),
         "current_index": current_index,
+        "queue_version": session.get("queue_version"),
         "track": current_track,
         "playable": playable,
         "stream_health": stream_health,
@@ -248,14 +253,21 @@ def add_queue_items(req: QueueAddRequest):
         )
         playable = _resolve_playable_or_404(items[0])
         return _session_response(session, track=items[0], playable=playable)
-    session = radio_service.insert_manual_items(session["id"], items, placement=req.placement)
+    try:
+        session = radio_service.insert_manual_items(
+            session["id"], items, placement=req.placement, expected_version=req.expected_version
+        )
+    except QueueVersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     return _session_response(session)
 
 
 @router.post("/playback/queue/remove")
 def remove_queue_item(req: QueueRemoveRequest):
     try:
-        session = radio_service.remove_item(req.session_id, req.track_key)
+        session = radio_service.remove_item(req.session_id, req.track_key, expected_version=req.expected_version)
+    except QueueVersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     if not session:
@@ -266,7 +278,9 @@ def remove_queue_item(req: QueueRemoveRequest):
 @router.post("/playback/queue/reorder")
 def reorder_queue(req: QueueReorderRequest):
     try:
-        session = radio_service.reorder_items(req.session_id, req.ordered_track_keys)
+        session = radio_service.reorder_items(req.session_id, req.ordered_track_keys, expected_version=req.expected_version)
+    except QueueVersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     if not session:
@@ -276,7 +290,10 @@ def reorder_queue(req: QueueReorderRequest):
 
 @router.post("/playback/queue/clear-upcoming")
 def clear_upcoming_queue(req: QueueClearUpcomingRequest):
-    session = radio_service.clear_upcoming(req.session_id)
+    try:
+        session = radio_service.clear_upcoming(req.session_id, expected_version=req.expected_version)
+    except QueueVersionConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return _session_response(session)
@@ -319,14 +336,10 @@ def stream_playback(stream_source_id: int):
 
 @router.post("/recommendations/prefetch-playable")
 def prefetch_playable(items: list[PlaybackTrackRequest]):
+    items = items[:10]
+    states = playable_source_service.get_playable_states([item.model_dump() for item in items])
     warmed = []
-    for item in items[:10]:
-        state, is_streamable = playable_source_service.get_playable_state(
-            item.artist,
-            item.title,
-            album=item.album,
-            preview_url=item.preview_url,
-        )
+    for item, (state, is_streamable) in zip(items, states):
         warmed.append(
             {
                 "track_key": build_track_key(item.artist, item.title, item.album),
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from core import lastfm_service, analytics_service, logger
+from database import get_latest_scrobble_timestamp
 
 router = APIRouter(prefix="/stats", tags=["stats"])
 
@@ -42,11 +43,11 @@ def sync_stats(user: str, background_tasks: BackgroundTasks):
 @router.get("/chart")
 def get_chart_data(user: str, period: str = "1month", artist: str = None, track: str = None):
     try:
-        if artist or track:
+        if track:
              return analytics_service.get_chart_data(user, period, artist, track)
              
-        # Use local DB for main activity chart via analytics service
-        data = analytics_service.get_chart_data_db(user, period)
+        # Use local DB rollups for the activity chart (overall or per artist)
+        data = analytics_service.get_chart_data_db(user, period, artist)
         return data
     except Exception as e:
         logger.error(f"Error fetching chart data: {e}")
@@ -58,6 +59,8 @@ def get_chart_data(user: str, period: str = "1month", artist: str = None, track:
 @router.get("/listening-clock/{user}")
 def get_listening_clock(user: str, period: str = "1month"):
     try:
+        if get_latest_scrobble_timestamp(user):
+            return analytics_service.get_listening_clock_data_db(user, period)
         data = analytics_service.get_listening_clock_data(user, period)
         return data
     except Exception as e:
@@ -7,7 +7,7 @@ from .cache_manager import CacheManager
 class AnalyticsService:
     def __init__(self, lastfm_service):
         self.lastfm = lastfm_service
-        self.cache = CacheManager(ttl=86400)
+        self.cache = CacheManager(ttl=86400, namespace="analytics")
 
     def get_chart_data(self, user: str, period: str = "1month", artist: str = None, track: str = None):
         start_ts, all_tracks = self.lastfm.get_cached_recent_tracks(user, period)
@@ -154,8 +154,8 @@ class AnalyticsService:
         self.cache.set(cache_key, result)
         return result
 
-    def get_chart_data_db(self, user: str, period: str = "1month"):
-        from database import get_scrobbles_in_range
+    def get_chart_data_db(self, user: str, period: str = "1month", artist: str = None):
+        from database import get_daily_scrobble_counts
         
         # Calculate time range
         now = int(time.time())
@@ -167,37 +167,44 @@ class AnalyticsService:
         days = period_map.get(period, 30)
         start_ts = now - (days * day_seconds)
         
-        scrobbles = get_scrobbles_in_range(user, start_ts, now)
-        
         daily_counts = {}
         current_ts = start_ts
         while current_ts <= now:
             date_str = datetime.fromtimestamp(current_ts).strftime('%Y-%m-%d')
             daily_counts[date_str] = 0
             current_ts += day_seconds
-            
-        for s in scrobbles:
-            ts = s['timestamp']
-            date_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
+
+        # Pre-aggregated per local day, so this reads at most one row per day
+        start_day = datetime.fromtimestamp(start_ts).strftime('%Y-%m-%d')
+        for date_str, count in get_daily_scrobble_counts(user, start_day, artist=artist).items():
             if date_str in daily_counts:
-                daily_counts[date_str] += 1
+                daily_counts[date_str] = count
         
         return [{"date": k, "count": v} for k, v in sorted(daily_counts.items())]
 
+    def get_listening_clock_data_db(self, user: str, period: str = "1month"):
+        from database import get_hourly_scrobble_counts
+
+        period_map = {
+            "7day": 7, "1month": 30, "3month": 90,
+            "6month": 180, "12month": 365
+        }
+        start_day = None
+        if period != "overall":
+            days = period_map.get(period, 30)
+            start_day = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+        counts = get_hourly_scrobble_counts(user, start_day)
+        return [{"hour": h, "count": counts.get(h, 0)} for h in range(24)]
+
     def get_listening_streak_db(self, user: str):
-        from database import get_scrobbles_from_db
+        from database import get_active_scrobble_days
         
-        scrobbles = get_scrobbles_from_db(user, limit=5000)
+        active_days = set(get_active_scrobble_days(user))
         
-        if not scrobbles:
+        if not active_days:
             return {"current_streak": 0}
             
-        active_days = set()
-        for s in scrobbles:
-            ts = s['timestamp']
-            date_str = datetime.fromtimestamp(ts).strftime('%Y-%m-%d')
-            active_days.add(date_str)
-            
         streak = 0
         check_date = datetime.now()
         today_str = check_date.strftime('%Y-%m-%d')
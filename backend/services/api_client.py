@@ -1,12 +1,20 @@
+import json
 import os
 from database import get_setting
-from .external_client import ExternalAPIClient
+from .single_flight import SingleFlight
+
+# Shared by every client instance so identical concurrent lookups collapse process-wide.
+_inflight = SingleFlight("lastfm")
 
 class LastFMApiClient:
-    def __init__(self):
+    def __init__(self, client=None):
         self.base_url = "http://ws.audioscrobbler.com/2.0/"
         self._api_key = None
-        self.client = ExternalAPIClient("lastfm", base_url=self.base_url, timeout=10, retries=3, min_interval=0.25)
+        if client is None:
+            from .provider_registry import providers
+
+            client = providers.external_client("lastfm")
+        self.client = client
 
     @property
     def api_key(self):
@@ -28,8 +36,30 @@ class LastFMApiClient:
         }
         request_params.update(params)
 
+        key = json.dumps(request_params, sort_keys=True, default=str)
         try:
-            return self.client.request_json("GET", "", params=request_params, timeout=timeout)
+            return _inflight.do(key, self.client.request_json, "GET", "", params=request_params, timeout=timeout)
         except Exception as e:
             print(f"Error requesting {method}: {e}")
             return None
+
+    def request_many(self, calls, timeout=10, max_in_flight=None):
+        """
+        Fetch several ``(method, params)`` calls concurrently within the shared Last.fm
+        rate budget, at most ``max_in_flight`` at a time if given. Results are returned
+        in order; failed calls yield None.
+        """
+        if not self.api_key:
+            print("Last.fm API key not configured")
+            return [None] * len(calls)
+
+        specs = []
+        for method, params in calls:
+            request_params = {
+                "method": method,
+                "api_key": self.api_key,
+                "format": "json"
+            }
+            request_params.update(params)
+            specs.append({"method": "GET", "path": "", "params": request_params, "timeout": timeout})
+        return self.client.request_json_many(specs, max_in_flight=max_in_flight)
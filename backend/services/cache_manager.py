@@ -1,33 +1,170 @@
+import json
+import logging
+import threading
 import time
+from collections import Counter, OrderedDict
+
+from database import (
+    delete_cache_entries,
+    get_cache_entry,
+    get_cache_table_stats,
+    purge_expired_cache_entries,
+    set_cache_entry,
+)
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Hit/miss/eviction counters per namespace, shared by every CacheManager instance.
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(namespace, name, amount=1):
+    with _stats_lock:
+        _stats.setdefault(namespace, Counter())[name] += amount
+
+
+def get_cache_stats(include_disk=False):
+    with _stats_lock:
+        stats = {namespace: dict(counter) for namespace, counter in _stats.items()}
+    if include_disk:
+        try:
+            for namespace, disk in get_cache_table_stats().items():
+                stats.setdefault(namespace, {})["disk"] = disk
+        except Exception as exc:
+            logger.warning(f"Could not read cache table stats: {exc}")
+    return stats
+
 
 class CacheManager:
-    def __init__(self, ttl=86400):
-        self._cache = {}
+    """
+    Two-tier TTL cache.
+
+    Tier one is an in-process LRU bounded by ``max_entries`` and ``max_bytes``; tier two
+    is the ``cache_entries`` table, so JSON-serializable values survive restarts. Reads
+    fall through to SQLite and promote hits back into memory. If the database is
+    unavailable the cache keeps working from memory alone.
+    """
+
+    PURGE_EVERY_WRITES = 500
+
+    def __init__(self, ttl=86400, namespace="default", max_entries=2048, max_bytes=32 * 1024 * 1024, persistent=True):
         self._ttl = ttl
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persistent = persistent
+        self._cache = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _remember(self, key, value, expires_at, size):
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous:
+                self._bytes -= previous[2]
+            if size > self.max_bytes:
+                return
+            self._cache[key] = (expires_at, value, size)
+            self._bytes += size
+            evicted = 0
+            while self._cache and (len(self._cache) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, old_size) = self._cache.popitem(last=False)
+                self._bytes -= old_size
+                evicted += 1
+        if evicted:
+            _count(self.namespace, "evictions", evicted)
+
+    def _forget(self, key):
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous:
+                self._bytes -= previous[2]
 
     def get(self, key):
         """Retrieve value from cache if valid."""
-        if key in self._cache:
-            timestamp, data = self._cache[key]
-            if time.time() - timestamp < self._ttl:
-                return data
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._cache.move_to_end(key)
+                    value = entry[1]
+                else:
+                    self._cache.pop(key)
+                    self._bytes -= entry[2]
+                    value = _MISSING
+            else:
+                value = _MISSING
+        if value is not _MISSING:
+            _count(self.namespace, "memory_hits")
+            return value
+
+        if self.persistent:
+            try:
+                stored = get_cache_entry(self.namespace, key, now)
+            except Exception as exc:
+                _count(self.namespace, "disk_errors")
+                logger.debug(f"Cache read failed for {self.namespace}:{key}: {exc}")
+                stored = None
+            if stored:
+                raw, expires_at = stored
+                value = json.loads(raw)
+                self._remember(key, value, expires_at, len(raw))
+                _count(self.namespace, "disk_hits")
+                return value
+
+        _count(self.namespace, "misses")
         return None
 
-    def set(self, key, value):
-        """Set value in cache with current timestamp."""
-        self._cache[key] = (time.time(), value)
+    def set(self, key, value, ttl=None):
+        """Set value in cache; ``ttl`` overrides the manager default for this entry."""
+        expires_at = time.time() + (self._ttl if ttl is None else ttl)
+        try:
+            raw = json.dumps(value)
+        except (TypeError, ValueError):
+            raw = None
+        self._remember(key, value, expires_at, len(raw) if raw is not None else 0)
+        _count(self.namespace, "sets")
+
+        if self.persistent and raw is not None:
+            try:
+                set_cache_entry(self.namespace, key, raw, expires_at)
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY_WRITES == 0:
+                    purge_expired_cache_entries()
+            except Exception as exc:
+                _count(self.namespace, "disk_errors")
+                logger.debug(f"Cache write failed for {self.namespace}:{key}: {exc}")
+
+    def _delete_persistent(self, **kwargs):
+        if not self.persistent:
+            return
+        try:
+            delete_cache_entries(self.namespace, **kwargs)
+        except Exception as exc:
+            _count(self.namespace, "disk_errors")
+            logger.debug(f"Cache delete failed for {self.namespace}: {exc}")
 
     def delete(self, key):
         """Remove key from cache."""
-        if key in self._cache:
-            del self._cache[key]
+        self._forget(key)
+        self._delete_persistent(key=key)
 
     def clear(self):
         """Clear all cache."""
-        self._cache = {}
+        with self._lock:
+            self._cache = OrderedDict()
+            self._bytes = 0
+        self._delete_persistent()
 
     def clear_with_prefix(self, prefix):
         """Clear all keys starting with prefix."""
-        keys_to_delete = [k for k in self._cache.keys() if k.startswith(prefix)]
+        with self._lock:
+            keys_to_delete = [k for k in self._cache.keys() if k.startswith(prefix)]
         for k in keys_to_delete:
-            del self._cache[k]
+            self._forget(k)
+        self._delete_persistent(prefix=prefix)
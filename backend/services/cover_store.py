@@ -0,0 +1,240 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from database import (
+    delete_covers,
+    get_cover_for_url,
+    get_cover_store_stats,
+    get_setting,
+    list_least_recent_covers,
+    save_cover,
+    touch_cover,
+)
+from database.connection import DATA_DIR
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MB = 256
+FETCH_TIMEOUT_SECONDS = 10
+MAX_COVER_BYTES = 10 * 1024 * 1024
+MAX_REDIRECTS = 3
+# Recency is only rewritten when older than this, so hot covers don't cost a write per read.
+TOUCH_INTERVAL_SECONDS = 300
+# Hosts the metadata providers serve artwork from (Last.fm, iTunes, Deezer, Spotify).
+# /covers only proxies these, so it cannot be pointed at internal or arbitrary hosts.
+COVER_HOSTS = ("last.fm", "lastfm.freetls.fastly.net", "mzstatic.com", "dzcdn.net", "scdn.co", "spotifycdn.com")
+
+_inflight = SingleFlight("covers")
+
+
+def url_key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def is_cover_host(url):
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == allowed or host.endswith("." + allowed) for allowed in COVER_HOSTS)
+
+
+def image_content_type(value):
+    """The media type of a Content-Type header if it is an image, else None."""
+    content_type = (value or "").split(";")[0].strip().lower()
+    return content_type if content_type.startswith("image/") else None
+
+
+class CoverStore:
+    """
+    Content-addressed cover art cache on disk.
+
+    Blobs are stored once under their SHA-256 (``root/ab/abcd...``) and indexed by the
+    hash of every URL that produced them, so an album's cover is fetched once however
+    many tracks or endpoints ask for it. The total size is capped (``COVER_CACHE_MAX_MB``)
+    and the least recently used blobs are evicted first.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.path.join(DATA_DIR, "covers")
+        self._max_bytes = max_bytes
+        self.session = requests.Session()
+        self._evict_lock = threading.Lock()
+        self._bytes_lock = threading.Lock()
+        self._bytes = None
+        self.stats = {"hits": 0, "fetches": 0, "deduplicated": 0, "errors": 0, "evicted": 0}
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        try:
+            return int(float(get_setting("COVER_CACHE_MAX_MB") or DEFAULT_MAX_MB) * 1024 * 1024)
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_MB * 1024 * 1024
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def get(self, url):
+        """Return (bytes, content_type) for a cover URL, fetching it at most once; None on failure."""
+        if not url or not url.startswith(("http://", "https://")):
+            return None
+        key = url_key(url)
+        cached = self._read(key)
+        if cached:
+            return cached
+        return _inflight.do(key, self._fetch_and_store, key, url)
+
+    def get_bytes(self, url):
+        cover = self.get(url)
+        return cover[0] if cover else None
+
+    def _read(self, key):
+        try:
+            entry = get_cover_for_url(key)
+        except Exception as e:
+            logger.debug(f"Cover index unavailable: {e}")
+            return None
+        if not entry:
+            return None
+        try:
+            with open(self._blob_path(entry["sha256"]), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if time.time() - (entry.get("last_used_at") or 0) > TOUCH_INTERVAL_SECONDS:
+            try:
+                touch_cover(entry["sha256"])
+            except Exception as e:
+                logger.debug(f"Could not touch cover {entry['sha256']}: {e}")
+        content_type = image_content_type(entry.get("content_type") or "image/jpeg")
+        if not content_type:
+            return None
+        self.stats["hits"] += 1
+        return data, content_type
+
+    def _fetch_and_store(self, key, url):
+        # Another caller may have stored it while we waited to run.
+        cached = self._read(key)
+        if cached:
+            return cached
+        try:
+            fetched = self._download(url)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Failed to fetch cover art {url}: {e}")
+            return None
+        if not fetched:
+            self.stats["errors"] += 1
+            return None
+        data, content_type = fetched
+        self.stats["fetches"] += 1
+
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            if save_cover(key, url, sha256, len(data), content_type):
+                self._add_bytes(len(data))
+            else:
+                self.stats["deduplicated"] += 1
+            if self._add_bytes(0) > self.max_bytes:
+                self._evict()
+        except Exception as e:
+            # The bytes are still good for this caller even if they could not be kept.
+            logger.warning(f"Could not store cover art {url}: {e}")
+        return data, content_type
+
+    def _download(self, url):
+        """
+        Fetch an image body, following redirects by hand so every hop stays on the
+        original host or a known cover host, and streaming so a body is never read
+        past MAX_COVER_BYTES. Returns (bytes, content_type) or None.
+        """
+        origin = (urlparse(url).hostname or "").lower()
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self.session.get(url, timeout=FETCH_TIMEOUT_SECONDS, stream=True, allow_redirects=False)
+            try:
+                if response.is_redirect:
+                    url = urljoin(url, response.headers.get("Location") or "")
+                    host = (urlparse(url).hostname or "").lower()
+                    if not url.startswith(("http://", "https://")) or (host != origin and not is_cover_host(url)):
+                        logger.warning(f"Refusing cover redirect to {url}")
+                        return None
+                    continue
+                response.raise_for_status()
+                content_type = image_content_type(response.headers.get("Content-Type"))
+                if not content_type:
+                    return None
+                chunks = []
+                size = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > MAX_COVER_BYTES:
+                        return None
+                    chunks.append(chunk)
+                data = b"".join(chunks)
+                return (data, content_type) if data else None
+            finally:
+                response.close()
+        return None
+
+    def _add_bytes(self, delta):
+        """Adjust the running total of stored bytes (loaded once from the index) and return it."""
+        with self._bytes_lock:
+            if self._bytes is None:
+                self._bytes = get_cover_store_stats()["bytes"]
+            else:
+                self._bytes += delta
+            return self._bytes
+
+    def _evict(self):
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            total = self._add_bytes(0)
+            limit = self.max_bytes
+            while total > limit:
+                victims = list_least_recent_covers(limit=50)
+                if not victims:
+                    break
+                doomed = []
+                freed = 0
+                for victim in victims:
+                    if total - freed <= limit:
+                        break
+                    doomed.append(victim["sha256"])
+                    freed += victim["size_bytes"]
+                delete_covers(doomed)
+                total = self._add_bytes(-freed)
+                for sha256 in doomed:
+                    try:
+                        os.remove(self._blob_path(sha256))
+                    except OSError:
+                        pass
+                self.stats["evicted"] += len(doomed)
+        finally:
+            self._evict_lock.release()
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        try:
+            stats.update(get_cover_store_stats())
+        except Exception as e:
+            logger.debug(f"Could not read cover store stats: {e}")
+        stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+cover_store = CoverStore()
@@ -0,0 +1,106 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStage:
+    """
+    A pool of worker threads draining one bounded queue.
+
+    ``handler(context)`` returns the context to hand to the next stage, or None when
+    the item is finished (skipped or completed). Exceptions go to ``on_error``. Because
+    the queue is bounded, a slow stage blocks the stage feeding it instead of letting
+    work pile up in memory.
+    """
+
+    def __init__(self, name, handler, workers=1, queue_size=4, on_error=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.on_error = on_error
+        self.next_stage = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._busy = 0
+        self._processed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+
+    def start(self):
+        self._started_at = time.monotonic()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, daemon=True, name=f"Download-{self.name}-{i}")
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, context):
+        self.queue.put(context)
+
+    def _run(self):
+        while True:
+            context = self.queue.get()
+            started = time.monotonic()
+            with self._lock:
+                self._busy += 1
+            failed = False
+            try:
+                forward = self.handler(context)
+            except Exception as exc:
+                failed = True
+                forward = None
+                logger.error(f"Download stage {self.name} failed: {exc}")
+                if self.on_error:
+                    try:
+                        self.on_error(context, self.name, exc)
+                    except Exception as handler_exc:
+                        logger.error(f"Download stage {self.name} error handler failed: {handler_exc}")
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._busy_seconds += time.monotonic() - started
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._processed += 1
+                self.queue.task_done()
+            if forward is not None and self.next_stage is not None:
+                self.next_stage.submit(forward)
+
+    def stats(self):
+        with self._lock:
+            done = self._processed + self._failed
+            elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+            return {
+                "workers": self.workers,
+                "busy": self._busy,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize,
+                "processed": self._processed,
+                "failed": self._failed,
+                "avg_ms": round(self._busy_seconds / done * 1000, 1) if done else None,
+                "per_minute": round(done / elapsed * 60, 2) if elapsed else 0.0,
+            }
+
+
+class DownloadPipeline:
+    """Stages chained in order; items enter at the first stage."""
+
+    def __init__(self, stages):
+        self.stages = stages
+        for current, following in zip(stages, stages[1:]):
+            current.next_stage = following
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def submit(self, context):
+        self.stages[0].submit(context)
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -1,17 +1,81 @@
+import threading
+
 from database import (
     add_download,
+    claim_next_job,
+    create_download_jobs_bulk,
     create_job,
     find_active_job,
     find_download_by_track,
+    get_source_candidates,
+    get_stream_source_by_cache_key,
     increment_job_retry,
+    list_queued_priority_classes,
     mark_job_failed,
     mark_job_running,
     mark_job_succeeded,
+    requeue_running_jobs,
+    update_job,
 )
+from services.event_bus import JOB_STATUS, event_bus
+from services.stream_resolver import MIN_CANDIDATE_SCORE, build_track_key
+
+# Share of worker claims each class gets while several classes are waiting.
+PRIORITY_WEIGHTS = {
+    "interactive": 8,
+    "radio_promotion": 4,
+    "auto_sync": 2,
+    "bulk": 1,
+}
+DEFAULT_PRIORITY_CLASS = "interactive"
+# Remembered search results older than this are searched for again.
+SOURCE_CANDIDATE_MAX_AGE_DAYS = 30
+
+
+class WeightedFairScheduler:
+    """
+    Stride scheduling over priority classes: each claim advances the class's pass by
+    ``1 / weight`` and the waiting class with the lowest pass goes next. Interactive
+    work is served first without starving bulk retries, and a class that was idle
+    re-enters at the current minimum instead of cashing in the time it sat out.
+    """
+
+    def __init__(self, weights):
+        self.weights = weights
+        self._passes = {}
+        self._lock = threading.Lock()
+
+    def order(self, waiting):
+        with self._lock:
+            known = [self._passes[name] for name in waiting if name in self._passes]
+            floor = min(known) if known else 0.0
+            for name in waiting:
+                self._passes[name] = max(self._passes.get(name, floor), floor)
+            return sorted(waiting, key=lambda name: (self._passes[name], -self.weights.get(name, 1)))
+
+    def charge(self, name):
+        with self._lock:
+            self._passes[name] = self._passes.get(name, 0.0) + 1.0 / self.weights.get(name, 1)
 
 
 class DownloadCoordinator:
-    def queue(self, downloader, query, artist=None, title=None, album=None, image_url=None):
+    def __init__(self):
+        self.scheduler = WeightedFairScheduler(PRIORITY_WEIGHTS)
+
+    def queue(
+        self,
+        downloader,
+        query,
+        artist=None,
+        title=None,
+        album=None,
+        image_url=None,
+        priority_class=DEFAULT_PRIORITY_CLASS,
+        source_url=None,
+        cache_key=None,
+    ):
+        if priority_class not in PRIORITY_WEIGHTS:
+            priority_class = DEFAULT_PRIORITY_CLASS
         existing_track = None
         if artist and title:
             existing_track = find_download_by_track(artist, title, album=album)
@@ -24,8 +88,16 @@ class DownloadCoordinator:
 
         existing = find_active_job("download", query=query)
         if existing:
+            # Asking again from a more urgent context bumps the queued job.
+            current = existing.get("priority_class") or DEFAULT_PRIORITY_CLASS
+            if existing["status"] == "queued" and PRIORITY_WEIGHTS[priority_class] > PRIORITY_WEIGHTS.get(current, 1):
+                update_job(existing["id"], priority_class=priority_class)
+                if downloader is not None:
+                    downloader.notify_work()
             return {"status": "skipped", "message": "Already in queue", "job_id": existing["id"]}
 
+        if not cache_key and artist and title:
+            cache_key = build_track_key(artist, title, album)
         add_download(query, artist or "Unknown Artist", title or query, album or "Unknown Album", image_url=image_url, status="pending")
         job_id = create_job(
             "download",
@@ -35,8 +107,10 @@ class DownloadCoordinator:
             artist=artist,
             title=title,
             album=album,
-            payload={"image_url": image_url},
+            payload={"image_url": image_url, "source_url": source_url, "cache_key": cache_key},
+            priority_class=priority_class,
         )
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "queued", "priority_class": priority_class})
         downloader.enqueue_job(
             {
                 "job_id": job_id,
@@ -45,21 +119,110 @@ class DownloadCoordinator:
                 "title": title,
                 "album": album,
                 "image_url": image_url,
+                "source_url": source_url,
+                "cache_key": cache_key,
+                "priority_class": priority_class,
                 "status": "queued",
             }
         )
         return {"status": "queued", "query": query, "job_id": job_id}
 
+    def queue_many(self, downloader, tracks, priority_class="bulk"):
+        """
+        Queue many downloads at once. ``tracks`` are dicts with ``query`` and optional
+        ``artist``, ``title``, ``album`` and ``image_url``. Deduplication, the pending
+        download rows, jobs and their events all happen in a single transaction.
+        """
+        if priority_class not in PRIORITY_WEIGHTS:
+            priority_class = DEFAULT_PRIORITY_CLASS
+        items = []
+        for track in tracks:
+            artist, title, album = track.get("artist"), track.get("title"), track.get("album")
+            items.append(
+                {
+                    "query": track.get("query"),
+                    "artist": artist,
+                    "title": title,
+                    "album": album,
+                    "payload": {
+                        "image_url": track.get("image_url"),
+                        "source_url": None,
+                        "cache_key": build_track_key(artist, title, album) if artist and title else None,
+                    },
+                }
+            )
+        created, skipped = create_download_jobs_bulk(items, priority_class=priority_class)
+        if created:
+            event_bus.publish(JOB_STATUS, {"status": "queued", "count": len(created), "priority_class": priority_class})
+            if downloader is not None:
+                downloader.enqueue_jobs(
+                    [
+                        {
+                            "job_id": item["job_id"],
+                            "query": item["query"],
+                            "artist": item["artist"],
+                            "title": item["title"],
+                            "album": item["album"],
+                            **item["payload"],
+                            "priority_class": priority_class,
+                            "status": "queued",
+                        }
+                        for item in created
+                    ]
+                )
+        return {
+            "status": "queued" if created else "skipped",
+            "queued": len(created),
+            "skipped": skipped,
+            "job_ids": [item["job_id"] for item in created],
+        }
+
+    def known_source_url(self, cache_key):
+        """
+        A source URL already resolved for ``cache_key``: the stream resolver's pick if
+        it has one, else the best remembered search candidate. None means search.
+        """
+        if not cache_key:
+            return None
+        source = get_stream_source_by_cache_key(cache_key)
+        if source and source.get("source_url") and source.get("health_status") != "cooldown":
+            return source["source_url"]
+        candidates = get_source_candidates(
+            cache_key, min_score=MIN_CANDIDATE_SCORE, max_age_days=SOURCE_CANDIDATE_MAX_AGE_DAYS
+        )
+        return candidates[0]["source_url"] if candidates else None
+
+    def claim_next(self, owner, lease_seconds):
+        """Claim the next download job for a worker, honouring the class weights."""
+        waiting = list_queued_priority_classes("download")
+        for priority_class in self.scheduler.order(waiting):
+            job = claim_next_job("download", owner, lease_seconds, priority_class=priority_class)
+            if job:
+                self.scheduler.charge(priority_class)
+                event_bus.publish(JOB_STATUS, {"job_id": job["id"], "status": "running"})
+                return job
+        return None
+
+    def recover(self, expired_only=True):
+        """Requeue download jobs whose worker went away; returns their ids."""
+        job_ids = requeue_running_jobs("download", expired_only=expired_only)
+        for job_id in job_ids:
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "queued"})
+        return job_ids
+
     def mark_running(self, job_id):
         mark_job_running(job_id)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "running"})
 
     def mark_success(self, job_id, payload=None):
         mark_job_succeeded(job_id, payload)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "succeeded"})
 
     def mark_failed(self, job_id, error_message, payload=None, retry=False):
         if retry:
             increment_job_retry(job_id)
         mark_job_failed(job_id, error_message, payload)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
 
 
 download_coordinator = DownloadCoordinator()
@@ -1,237 +1,490 @@
 import os
 import logging
+import shutil
+import socket
+import subprocess
 import threading
-import queue
 import time
+from collections import Counter, OrderedDict
 try:
     import yt_dlp
 except ModuleNotFoundError:
     yt_dlp = None
-from database import is_downloaded, add_download
-from database import get_job_summary
+from database import is_downloaded, add_download, delete_source_candidate, get_setting, list_queued_jobs, renew_job_lease
+from services.cover_store import cover_store
+from services.download_pipeline import DownloadPipeline, PipelineStage
 from services.download_service import download_coordinator
-from services.websocket_manager import manager
+from services.event_bus import DOWNLOAD_COMPLETED, DOWNLOADS_CHANGED, event_bus
+from services.stream_resolver import remember_candidates
+from utils import sanitize_filename
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_LEASE_SECONDS = 900
+
+# (setting, default worker count) per stage; transcoding defaults to one ffmpeg per core.
+STAGE_WORKER_SETTINGS = {
+    "search": ("DOWNLOAD_SEARCH_WORKERS", 2),
+    "fetch": ("DOWNLOAD_FETCH_WORKERS", 3),
+    "transcode": ("DOWNLOAD_TRANSCODE_WORKERS", os.cpu_count() or 2),
+    "tag": ("DOWNLOAD_TAG_WORKERS", 2),
+    "file": ("DOWNLOAD_FILE_WORKERS", 1),
+}
+DEFAULT_STAGE_QUEUE_SIZE = 4
+DEFAULT_PROGRESS_INTERVAL_SECONDS = 1.0
+# Job fields shown to clients in the active downloads list.
+ACTIVE_FIELDS = ("job_id", "query", "artist", "title", "album", "image_url", "priority_class", "status")
+
+
 class DownloaderService:
+    """
+    Runs download jobs from the durable ``jobs`` table.
+
+    Jobs are queued in SQLite by ``download_coordinator`` and claimed atomically under
+    a renewable lease, so work queued or in flight when the process stops is picked up
+    again by ``start`` on the next boot. Each claimed job then flows through a pipeline
+    of separately sized stages (search, fetch, transcode, tag, file) joined by bounded
+    queues, so network-bound downloads and CPU-bound ffmpeg work don't block each other.
+    """
+
+    POLL_SECONDS = 5
+    REAP_EVERY_SECONDS = 60
+
     def __init__(self, download_path: str = "downloads"):
         self.download_path = download_path
         if not os.path.exists(self.download_path):
             os.makedirs(self.download_path)
-        
-        self.active_downloads = [] # List of dicts: {'query': str, 'status': str}
-        self.queue = queue.Queue()
+
+        self.active_downloads = OrderedDict() # job_id -> {'query': str, 'status': str, ...}
         self.active_downloads_lock = threading.Lock()
-        
-        # Start worker threads
-        self.num_workers = 3
-        self.workers = []
-        for i in range(self.num_workers):
-            t = threading.Thread(target=self._worker, daemon=True, name=f"DownloaderWorker-{i}")
-            t.start()
-            self.workers.append(t)
+        self._active_version = 0
+        self._active_snapshot = (-1, [])
+        self._last_progress_publish = 0.0
+        self.progress_interval = DEFAULT_PROGRESS_INTERVAL_SECONDS
+        self._work_available = threading.Condition()
+        self._start_lock = threading.Lock()
+        self._last_reap = 0.0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = DEFAULT_LEASE_SECONDS
+        self.pipeline = None
+        self._dispatcher = None
+        self.source_stats = Counter()
+
+    def _build_pipeline(self):
+        queue_size = int(get_setting("DOWNLOAD_STAGE_QUEUE_SIZE") or DEFAULT_STAGE_QUEUE_SIZE)
+        handlers = {
+            "search": self._stage_search,
+            "fetch": self._stage_fetch,
+            "transcode": self._stage_transcode,
+            "tag": self._stage_tag,
+            "file": self._stage_file,
+        }
+        stages = []
+        for name, handler in handlers.items():
+            setting, default = STAGE_WORKER_SETTINGS[name]
+            workers = int(get_setting(setting) or default)
+            stages.append(PipelineStage(name, handler, workers=workers, queue_size=queue_size, on_error=self._stage_failed))
+        return DownloadPipeline(stages)
+
+    def start(self):
+        """Recover jobs left over by a previous process and start the pipeline."""
+        with self._start_lock:
+            if self._dispatcher:
+                return
+            self.lease_seconds = int(get_setting("DOWNLOAD_LEASE_SECONDS") or self.lease_seconds)
+            self.progress_interval = float(get_setting("DOWNLOAD_PROGRESS_INTERVAL_SECONDS") or self.progress_interval)
+
+            recovered = download_coordinator.recover(expired_only=False)
+            if recovered:
+                logger.info(f"Requeued {len(recovered)} interrupted download job(s)")
+            queued = list_queued_jobs("download")
+            for row in queued:
+                self._track(self._job_info(row))
+            if queued:
+                logger.info(f"Resuming {len(queued)} queued download job(s)")
+
+            self.pipeline = self._build_pipeline()
+            self.pipeline.start()
+            self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name="DownloaderDispatcher")
+            self._dispatcher.start()
+        self._publish_downloads_changed()
 
     def enqueue_job(self, job_info):
-        with self.active_downloads_lock:
-            self.active_downloads.append(job_info)
-        self.queue.put(job_info)
-        self._broadcast_summary()
+        self._track(job_info)
+        self.notify_work()
+        self._publish_downloads_changed()
+
+    def enqueue_jobs(self, job_infos):
+        for job_info in job_infos:
+            self._track(job_info)
+        self.notify_work()
+        self._publish_downloads_changed()
+
+    def notify_work(self):
+        with self._work_available:
+            self._work_available.notify_all()
 
     def get_active_downloads(self):
+        """
+        Snapshot of active downloads in queue order. The snapshot is rebuilt only after a
+        change, and callers must treat it as read-only.
+        """
+        with self.active_downloads_lock:
+            version, snapshot = self._active_snapshot
+            if version != self._active_version:
+                snapshot = [dict(entry) for entry in self.active_downloads.values()]
+                self._active_snapshot = (self._active_version, snapshot)
+            return snapshot
+
+    def get_active_download_count(self):
         with self.active_downloads_lock:
-            # Return a copy to avoid race conditions during iteration by caller
-            return list(self.active_downloads)
+            return len(self.active_downloads)
 
-    def queue_download(self, query: str, artist: str = None, title: str = None, album: str = None, image_url: str = None):
-        result = download_coordinator.queue(self, query, artist=artist, title=title, album=album, image_url=image_url)
+    def get_pipeline_stats(self):
+        return self.pipeline.stats() if self.pipeline else {}
+
+    def get_source_stats(self):
+        """How often a known source URL let a download skip the search."""
+        return dict(self.source_stats)
+
+    def queue_download(self, query: str, artist: str = None, title: str = None, album: str = None, image_url: str = None, priority_class: str = "interactive"):
+        result = download_coordinator.queue(self, query, artist=artist, title=title, album=album, image_url=image_url, priority_class=priority_class)
         if result["status"] == "queued":
             logger.info(f"Queued download: {query}")
         return result
 
-    def _worker(self):
-        while True:
-            job_info = self.queue.get()
+    def queue_downloads(self, tracks, priority_class: str = "bulk"):
+        result = download_coordinator.queue_many(self, tracks, priority_class=priority_class)
+        if result["queued"]:
+            logger.info(f"Queued {result['queued']} downloads ({priority_class})")
+        return result
+
+    def _job_info(self, row):
+        payload = row.get("payload") if isinstance(row.get("payload"), dict) else {}
+        return {
+            "job_id": row["id"],
+            "query": row["query"],
+            "artist": row.get("artist"),
+            "title": row.get("title"),
+            "album": row.get("album"),
+            "image_url": payload.get("image_url"),
+            "source_url": payload.get("source_url"),
+            "cache_key": payload.get("cache_key"),
+            "priority_class": row.get("priority_class"),
+            "status": "queued",
+        }
+
+    def _reap_expired_leases(self):
+        now = time.monotonic()
+        if now - self._last_reap < self.REAP_EVERY_SECONDS:
+            return
+        self._last_reap = now
+        try:
+            requeued = download_coordinator.recover(expired_only=True)
+        except Exception as e:
+            logger.error(f"Could not requeue expired download leases: {e}")
+            return
+        if requeued:
+            logger.warning(f"Requeued {len(requeued)} download job(s) with expired leases")
+
+    def _claim(self):
+        self._reap_expired_leases()
+        try:
+            return download_coordinator.claim_next(self.owner, self.lease_seconds)
+        except Exception as e:
+            logger.error(f"Could not claim download job: {e}")
+            return None
+
+    def _hold_lease(self, job_id, done):
+        # Renew well before expiry; a job that outlives its lease would be handed out twice.
+        while not done.wait(self.lease_seconds / 3):
             try:
-                query = job_info['query']
-                job_id = job_info.get('job_id')
-                
-                # Update status to downloading
-                with self.active_downloads_lock:
-                    # Find the job object in the list (it might be a different dict instance if we re-fetched, but here we use the same dict)
-                    # However, to be safe, let's find it by query
-                    for job in self.active_downloads:
-                        if job['query'] == query:
-                            job['status'] = 'downloading'
-                            break
-                if job_id:
-                    download_coordinator.mark_running(job_id)
-                self._broadcast_summary()
-                
-                self._download_song_sync(job_info)
-                
+                if not renew_job_lease(job_id, self.owner, self.lease_seconds):
+                    logger.warning(f"Lost lease on download job {job_id}")
+                    return
             except Exception as e:
-                logger.error(f"Worker error: {e}")
-            finally:
-                # Remove from active downloads
-                with self.active_downloads_lock:
-                    # We need to remove the specific job_info or find by query
-                    # Using list comprehension to remove
-                    self.active_downloads = [j for j in self.active_downloads if j['query'] != job_info['query']]
-                self._broadcast_summary()
-                
-                self.queue.task_done()
-
-    def _download_song_sync(self, job_info):
-        query = job_info['query']
-        job_id = job_info.get('job_id')
-        artist = job_info.get('artist')
-        title = job_info.get('title')
-        album = job_info.get('album')
-        image_url = job_info.get('image_url')
+                logger.error(f"Could not renew lease on download job {job_id}: {e}")
+
+    def _dispatch(self):
+        """Claim jobs and feed them to the pipeline; blocks while the search stage is full."""
+        while True:
+            row = self._claim()
+            if row is None:
+                with self._work_available:
+                    self._work_available.wait(self.POLL_SECONDS)
+                continue
+
+            job = self._job_info(row)
+            job["done"] = threading.Event()
+            threading.Thread(target=self._hold_lease, args=(job["job_id"], job["done"]), daemon=True).start()
+            self._track(job)
+            self._set_stage(job, "search")
+            self.pipeline.submit(job)
+
+    # --- active download bookkeeping -----------------------------------------
+
+    def _track(self, job):
+        with self.active_downloads_lock:
+            if job['job_id'] not in self.active_downloads:
+                self.active_downloads[job['job_id']] = {key: job.get(key) for key in ACTIVE_FIELDS}
+                self._active_version += 1
 
+    def _update_active(self, job_id, **fields):
+        with self.active_downloads_lock:
+            entry = self.active_downloads.get(job_id)
+            if entry is None:
+                return False
+            entry.update(fields)
+            self._active_version += 1
+        return True
+
+    def _set_stage(self, job, stage):
+        if stage == "fetch":
+            fields = {"status": "downloading", "stage": stage, "progress": 0.0, "speed": None, "eta": None}
+        elif stage == "transcode":
+            fields = {"status": "downloading", "stage": stage, "progress": 100.0, "speed": None, "eta": None}
+        else:
+            fields = {"status": "downloading", "stage": stage}
+        if self._update_active(job['job_id'], **fields):
+            self._publish_downloads_changed()
+
+    def _progress_hook(self, job_id):
+        def hook(progress):
+            if progress.get("status") != "downloading":
+                return
+            total = progress.get("total_bytes") or progress.get("total_bytes_estimate")
+            downloaded = progress.get("downloaded_bytes") or 0
+            speed = progress.get("speed")
+            eta = progress.get("eta")
+            updated = self._update_active(
+                job_id,
+                progress=round(min(downloaded / total * 100, 100.0), 1) if total else None,
+                speed=int(speed) if speed else None,
+                eta=int(eta) if eta is not None else None,
+            )
+            if updated:
+                self._publish_progress()
+        return hook
+
+    def _publish_progress(self):
+        # Progress ticks arrive many times a second per download; the latest values are
+        # always in the snapshot, so only an occasional nudge needs to go out.
+        now = time.monotonic()
+        with self.active_downloads_lock:
+            if now - self._last_progress_publish < self.progress_interval:
+                return
+            self._last_progress_publish = now
+        self._publish_downloads_changed()
+
+    def _finish(self, job):
+        job["done"].set()
+        for path in (job.get("source_file"), job.get("mp3_file"), job.get("thumbnail_file")):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    logger.warning(f"Could not remove temporary file {path}: {e}")
+        with self.active_downloads_lock:
+            if self.active_downloads.pop(job['job_id'], None) is not None:
+                self._active_version += 1
+        self._publish_downloads_changed()
+
+    def _fail(self, job, message):
+        add_download(
+            job['query'],
+            job.get('clean_artist') or job.get('artist') or "Unknown Artist",
+            job.get('clean_title') or job.get('title') or job['query'],
+            job.get('clean_album') or job.get('album') or "Unknown Album",
+            image_url=job.get('image_url'),
+            status="failed",
+            last_error=message,
+        )
+        download_coordinator.mark_failed(job['job_id'], message)
+
+    def _stage_failed(self, job, stage, exc):
+        logger.error(f"Download failed for {job['query']} during {stage}: {exc}")
+        try:
+            self._fail(job, str(exc))
+        finally:
+            self._finish(job)
+
+    # --- pipeline stages -----------------------------------------------------
+
+    def _stage_search(self, job):
+        query = job['query']
         if is_downloaded(query):
             logger.info(f"Skipping {query}, already downloaded.")
-            if job_id:
-                download_coordinator.mark_success(job_id, {"status": "skipped"})
-            return {"status": "skipped", "message": "Already downloaded"}
+            download_coordinator.mark_success(job['job_id'], {"status": "skipped"})
+            self._finish(job)
+            return None
 
         if yt_dlp is None:
             logger.warning("yt_dlp is not installed; downloader is running in degraded mode.")
-            add_download(query, artist or "Unknown Artist", title or query, album or "Unknown Album", image_url=image_url, status="failed", last_error="yt_dlp is not installed")
-            if job_id:
-                download_coordinator.mark_failed(job_id, "yt_dlp is not installed")
-            return {"status": "error", "message": "yt_dlp is not installed"}
+            self._fail(job, "yt_dlp is not installed")
+            self._finish(job)
+            return None
+
+        if not job.get('source_url'):
+            try:
+                job['source_url'] = download_coordinator.known_source_url(job.get('cache_key'))
+            except Exception as e:
+                logger.debug(f"Source lookup failed for {query}: {e}")
+        if job.get('source_url'):
+            # Already resolved (stream promotion or an earlier search): fetch it directly.
+            job['info'] = None
+            self.source_stats["reused"] += 1
+        else:
+            self._search(job)
+            self.source_stats["searched"] += 1
+        self._set_stage(job, "fetch")
+        return job
+
+    def _search(self, job):
+        search_opts = {
+            'format': 'bestaudio/best',
+            'default_search': 'ytsearch',
+            'noplaylist': True,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        with yt_dlp.YoutubeDL(search_opts) as ydl:
+            info = ydl.extract_info(job['query'], download=False)
+        entries = info.get("entries") if info else None
+        job['alternate_candidate_count'] = max(0, len(entries) - 1) if entries else 0
+        if entries and job.get('cache_key') and job.get('artist') and job.get('title'):
+            remember_candidates(job['cache_key'], entries, job['artist'], job['title'])
+        if entries:
+            info = next((entry for entry in entries if entry), None)
+        if not info:
+            raise RuntimeError("No matching source found")
+        job['info'] = info
+        job['source_url'] = None
 
+    def _stage_fetch(self, job):
         # Use a temporary filename to avoid issues with special characters in YouTube titles
-        temp_filename = f'{self.download_path}/temp_{query.replace(" ", "_")}.%(ext)s'
-        
-        ydl_opts = {
+        temp_filename = f'{self.download_path}/temp_{job["query"].replace(" ", "_")}.%(ext)s'
+        fetch_opts = {
             'format': 'bestaudio/best',
-            'postprocessors': [
-                {
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                },
-                {
-                    'key': 'EmbedThumbnail',
-                }
-            ],
             'outtmpl': temp_filename,
-            'default_search': 'ytsearch',
             'noplaylist': True,
-            'writethumbnail': True,
-            # Add quiet mode to reduce log noise, or keep it for debugging
+            # The thumbnail is only needed when there is no cover image to embed.
+            'writethumbnail': not job.get('image_url'),
+            'postprocessors': [{'key': 'FFmpegThumbnailsConvertor', 'format': 'jpg'}],
+            'progress_hooks': [self._progress_hook(job['job_id'])],
             'quiet': True,
             'no_warnings': True,
         }
+        try:
+            info, source_file = self._fetch(job, fetch_opts)
+        except Exception as e:
+            if job.get('info') is not None:
+                raise
+            # The remembered source went away; forget it and fall back to a search.
+            logger.warning(f"Known source {job['source_url']} failed for {job['query']}: {e}")
+            self.source_stats["fallback"] += 1
+            if job.get('cache_key'):
+                delete_source_candidate(job['cache_key'], job['source_url'])
+            self._search(job)
+            info, source_file = self._fetch(job, fetch_opts)
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                info = ydl.extract_info(query, download=True)
-                
-                # Let's construct the final clean filename
-                clean_artist = artist if artist else info.get('artist', 'Unknown Artist')
-                clean_title = title if title else info.get('title', 'Unknown Title')
-                clean_album = album if album else info.get('album', 'Unknown Album')
-                
-                from utils import sanitize_filename
-                sanitized_artist = sanitize_filename(clean_artist)
-                sanitized_album = sanitize_filename(clean_album)
-                sanitized_title = sanitize_filename(clean_title)
-
-                # Create Artist/Album directory structure
-                target_dir = os.path.join(self.download_path, sanitized_artist, sanitized_album)
-                if not os.path.exists(target_dir):
-                    os.makedirs(target_dir)
-
-                final_filename = os.path.join(target_dir, f"{sanitized_title}.mp3")
-                
-                # Locate the temp file
-                downloaded_file = ydl.prepare_filename(info).replace('.webm', '.mp3').replace('.m4a', '.mp3')
-                
-                if not os.path.exists(downloaded_file):
-                        # Try to find it by replacing extension
-                        base = os.path.splitext(downloaded_file)[0]
-                        downloaded_file = f"{base}.mp3"
-                
-                if os.path.exists(downloaded_file):
-                    # Apply metadata using mutagen
-                    try:
-                        from mutagen.id3 import ID3, TIT2, TPE1, TALB, APIC, error
-                        
-                        try:
-                            audio = ID3(downloaded_file)
-                        except error:
-                            audio = ID3()
-                        
-                        # Clear all tags except APIC (Cover Art)
-                        for key in list(audio.keys()):
-                            if not key.startswith("APIC"):
-                                del audio[key]
-                        
-                        # Set correct metadata
-                        audio.add(TIT2(encoding=3, text=clean_title))
-                        audio.add(TPE1(encoding=3, text=clean_artist))
-                        audio.add(TALB(encoding=3, text=clean_album))
-                        
-                        # Handle Cover Art
-                        if image_url:
-                            try:
-                                import requests
-                                response = requests.get(image_url)
-                                if response.status_code == 200:
-                                    audio.add(APIC(
-                                        encoding=3,
-                                        mime='image/jpeg', 
-                                        type=3, 
-                                        desc=u'Cover',
-                                        data=response.content
-                                    ))
-                                    logger.info(f"Embedded cover art from {image_url}")
-                            except Exception as e:
-                                logger.error(f"Failed to download/embed cover art: {e}")
-
-                        audio.save(v2_version=3)
-                        
-                        # Rename/Move to final clean filename
-                        if os.path.exists(final_filename):
-                            os.remove(final_filename) 
-                        
-                        os.rename(downloaded_file, final_filename)
-                        logger.info(f"Renamed to: {final_filename}")
-                        
-                        add_download(query, clean_artist, clean_title, clean_album, image_url=image_url, status="completed", source_url=info.get("webpage_url"), match_confidence=0.9, alternate_candidate_count=max(0, len(info.get("entries", [])) - 1 if info.get("entries") else 0))
-                        if job_id:
-                            download_coordinator.mark_success(job_id, {"file": final_filename, "source_url": info.get("webpage_url")})
-                        return {"status": "success", "info": info, "file": final_filename}
-                    except Exception as e:
-                        logger.error(f"Error tagging/renaming: {e}")
-                        add_download(query, clean_artist, clean_title, clean_album, image_url=image_url, status="failed", last_error=str(e))
-                        if job_id:
-                            download_coordinator.mark_failed(job_id, str(e))
-                        return {"status": "partial_success", "message": "Downloaded but failed to tag/rename"}
-                else:
-                        add_download(query, artist or "Unknown Artist", title or query, album or "Unknown Album", image_url=image_url, status="failed", last_error="Downloaded file not found")
-                        if job_id:
-                            download_coordinator.mark_failed(job_id, "Downloaded file not found")
-                        return {"status": "error", "message": "Downloaded file not found"}
+        if not source_file or not os.path.exists(source_file):
+            raise RuntimeError("Downloaded file not found")
+        job['info'] = info
+        job['clean_artist'] = job.get('artist') or info.get('artist', 'Unknown Artist')
+        job['clean_title'] = job.get('title') or info.get('title', 'Unknown Title')
+        job['clean_album'] = job.get('album') or info.get('album', 'Unknown Album')
+        job['source_file'] = source_file
+        thumbnail = f"{os.path.splitext(source_file)[0]}.jpg"
+        if os.path.exists(thumbnail):
+            job['thumbnail_file'] = thumbnail
+        self._set_stage(job, "transcode")
+        return job
 
-            except Exception as e:
-                logger.error(f"Download failed for {query}: {e}")
-                add_download(query, artist or "Unknown Artist", title or query, album or "Unknown Album", image_url=image_url, status="failed", last_error=str(e))
-                if job_id:
-                    download_coordinator.mark_failed(job_id, str(e))
-                return {"status": "error", "message": str(e)}
+    def _fetch(self, job, fetch_opts):
+        with yt_dlp.YoutubeDL(fetch_opts) as ydl:
+            if job.get('info') is None:
+                info = ydl.extract_info(job['source_url'], download=True)
+            else:
+                info = ydl.process_ie_result(job['info'], download=True)
+            requested = info.get('requested_downloads') or []
+            source_file = requested[0].get('filepath') if requested else ydl.prepare_filename(info)
+        return info, source_file
 
-    def _broadcast_summary(self):
-        try:
-            payload = {
-                "type": "job.summary",
-                "summary": get_job_summary(),
-                "active_downloads": self.get_active_downloads(),
-            }
-            manager.broadcast_sync(payload)
-        except Exception:
-            pass
+    def _stage_transcode(self, job):
+        source_file = job['source_file']
+        mp3_file = f"{os.path.splitext(source_file)[0]}.mp3"
+        if source_file != mp3_file:
+            ffmpeg = shutil.which("ffmpeg")
+            if not ffmpeg:
+                raise RuntimeError("ffmpeg is not installed")
+            subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-i", source_file, "-vn", "-map_metadata", "-1",
+                 "-codec:a", "libmp3lame", "-b:a", "192k", mp3_file],
+                check=True,
+                capture_output=True,
+            )
+            os.remove(source_file)
+        job['source_file'] = None
+        job['mp3_file'] = mp3_file
+        self._set_stage(job, "tag")
+        return job
+
+    def _stage_tag(self, job):
+        from mutagen.id3 import ID3, TIT2, TPE1, TALB, APIC
+
+        # A fresh tag replaces whatever the encoder wrote.
+        audio = ID3()
+        audio.add(TIT2(encoding=3, text=job['clean_title']))
+        audio.add(TPE1(encoding=3, text=job['clean_artist']))
+        audio.add(TALB(encoding=3, text=job['clean_album']))
+
+        cover = self._cover_art(job)
+        if cover:
+            audio.add(APIC(encoding=3, mime='image/jpeg', type=3, desc=u'Cover', data=cover))
+        audio.save(job['mp3_file'], v2_version=3)
+        self._set_stage(job, "file")
+        return job
+
+    def _cover_art(self, job):
+        # Tracks from one album share a cover URL, so this is a local read after the first.
+        cover = cover_store.get_bytes(job.get('image_url')) if job.get('image_url') else None
+        if cover:
+            return cover
+        thumbnail = job.get('thumbnail_file')
+        if thumbnail and os.path.exists(thumbnail):
+            with open(thumbnail, "rb") as f:
+                return f.read()
+        return None
+
+    def _stage_file(self, job):
+        # Create Artist/Album directory structure
+        target_dir = os.path.join(
+            self.download_path,
+            sanitize_filename(job['clean_artist']),
+            sanitize_filename(job['clean_album']),
+        )
+        os.makedirs(target_dir, exist_ok=True)
+        final_filename = os.path.join(target_dir, f"{sanitize_filename(job['clean_title'])}.mp3")
+        os.replace(job['mp3_file'], final_filename)
+        job['mp3_file'] = None
+        logger.info(f"Renamed to: {final_filename}")
+
+        source_url = job['info'].get("webpage_url")
+        add_download(
+            job['query'],
+            job['clean_artist'],
+            job['clean_title'],
+            job['clean_album'],
+            image_url=job.get('image_url'),
+            status="completed",
+            source_url=source_url,
+            match_confidence=0.9,
+            alternate_candidate_count=job.get('alternate_candidate_count', 0),
+        )
+        download_coordinator.mark_success(job['job_id'], {"file": final_filename, "source_url": source_url})
+        event_bus.publish(DOWNLOAD_COMPLETED, {"artist": job['clean_artist'], "title": job['clean_title'], "query": job['query']})
+        self._finish(job)
+        return None
+
+    def _publish_downloads_changed(self):
+        event_bus.publish(DOWNLOADS_CHANGED, {"active": self.get_active_download_count()})
@@ -19,31 +19,30 @@ from database import (
     upsert_track,
     upsert_track_enrichment,
 )
-from services.external_client import ExternalAPIClient
+from services.provider_registry import providers
+from services.event_bus import JOB_STATUS, event_bus
 
 
 class EnrichmentService:
     def __init__(self):
-        self.musicbrainz = ExternalAPIClient(
-            "musicbrainz",
-            base_url="https://musicbrainz.org/ws/2/",
-            timeout=10,
-            retries=2,
-            min_interval=1.1,
-        )
+        # Shared client: MusicBrainz allows ~1 request/second per application.
+        self.musicbrainz = providers.external_client("musicbrainz")
 
     def enrich_library(self, force=False):
         user = get_setting("LASTFM_USER")
         job_id = create_job("enrichment", "insights", "queued", payload={"user": user, "force": force})
         mark_job_running(job_id)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "running"})
         try:
             if not user:
                 mark_job_failed(job_id, "No LASTFM_USER configured")
+                event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
                 return {"status": "failed", "job_id": job_id}
 
             if not force and get_feature_refresh_state("enrichment"):
                 existing = list_enriched_tracks(limit=12)
                 mark_job_succeeded(job_id, {"tracks_enriched": len(existing), "skipped": True})
+                event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "succeeded"})
                 return {"status": "succeeded", "job_id": job_id, "tracks_enriched": len(existing), "skipped": True}
 
             scrobbles = get_all_scrobbles(user)
@@ -100,9 +99,11 @@ class EnrichmentService:
 
             set_feature_refresh_state("enrichment")
             mark_job_succeeded(job_id, {"tracks_enriched": enriched})
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "succeeded"})
             return {"status": "succeeded", "job_id": job_id, "tracks_enriched": enriched}
         except Exception as exc:
             mark_job_failed(job_id, str(exc))
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
             return {"status": "failed", "job_id": job_id, "error": str(exc)}
 
     def _search_musicbrainz_artist(self, artist_name):
@@ -0,0 +1,50 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Topics published by the download/job services.
+JOB_STATUS = "job.status"
+DOWNLOADS_CHANGED = "downloads.changed"
+DOWNLOAD_COMPLETED = "download.completed"
+CLIENT_CONNECTED = "client.connected"
+
+
+class EventBus:
+    """
+    Minimal in-process publish/subscribe.
+
+    Publishers call ``publish`` from any thread; subscribers run synchronously on the
+    publishing thread, so they must be cheap (set a flag, wake a loop) and never block.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, topics=None):
+        """Register ``callback(topic, payload)``. Returns a function that unsubscribes it."""
+        entry = (callback, frozenset(topics) if topics else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+
+        return unsubscribe
+
+    def publish(self, topic, payload=None):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, topics in subscribers:
+            if topics is not None and topic not in topics:
+                continue
+            try:
+                callback(topic, payload or {})
+            except Exception as exc:
+                logger.warning(f"Event subscriber failed for {topic}: {exc}")
+
+
+event_bus = EventBus()
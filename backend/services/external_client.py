@@ -1,27 +1,334 @@
+import asyncio
+import contextvars
+import email.utils
+import logging
+import random
 import threading
 import time
+import weakref
 
 import requests
 
+try:
+    import httpx
+except ModuleNotFoundError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# The bucket whose token the current task already holds for its next request
+# (see ExternalAPIClient.prepaid); that request then does not take another one.
+_prepaid_bucket = contextvars.ContextVar("prepaid_bucket", default=None)
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by sync and async callers.
+
+    ``reserve`` takes a token immediately and returns how long the caller must wait
+    before using it, so waiting happens outside the lock (``time.sleep`` for threads,
+    ``asyncio.sleep`` on the event loop) and concurrent callers queue up fairly.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._blocked_until - now)
+
+    def try_reserve(self, max_wait):
+        """Like ``reserve``, but take no token (and return None) if the wait would exceed ``max_wait``."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            wait = max(0.0 if tokens >= 1 else (1 - tokens) / self.rate, self._blocked_until - now)
+            if wait > max_wait:
+                return None
+            self._tokens = tokens - 1
+            self._updated_at = now
+            return wait
+
+    def refund(self):
+        """Return a reserved token that was never used (its caller gave up while waiting)."""
+        if not self.rate:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def penalize(self, seconds):
+        """Stop handing out tokens for ``seconds`` (e.g. a 429 Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+
+
+class _BackgroundLoop:
+    """A single daemon thread running an asyncio loop for sync-to-async bridging."""
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def get_loop(self):
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, daemon=True, name="ExternalAPIClientLoop")
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop()).result(timeout)
+
+
+background_loop = _BackgroundLoop()
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
 
 class ExternalAPIClient:
-    def __init__(self, provider, base_url=None, timeout=10, retries=3, min_interval=0.0):
+    """
+    JSON HTTP client for one external provider.
+
+    Requests share a per-provider token bucket (``min_interval`` seconds between
+    requests on average), retry 429/5xx with jittered exponential backoff and honour
+    ``Retry-After``. With httpx installed the work runs on pooled keep-alive
+    connections with at most ``max_concurrency`` requests in flight; ``request_json``
+    stays a blocking wrapper for existing callers.
+    """
+
+    def __init__(
+        self,
+        provider,
+        base_url=None,
+        timeout=10,
+        retries=3,
+        min_interval=0.0,
+        max_concurrency=4,
+        max_connections=10,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        transport=None,
+    ):
         self.provider = provider
         self.base_url = base_url
         self.timeout = timeout
         self.retries = retries
         self.min_interval = min_interval
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(1.0 / min_interval if min_interval else None)
         self.session = requests.Session()
-        self._lock = threading.Lock()
-        self._last_request_at = 0.0
+        self._transport = transport
+        # Weakly keyed so the state of a loop that has gone away is released with it.
+        self._loop_state = weakref.WeakKeyDictionary()
+        self._state_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "errors": 0}
+
+    def _url(self, path):
+        return path if path.startswith("http") else f"{self.base_url}{path}"
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        delay = random.uniform(delay / 2, delay)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _note_retry(self, status_code, retry_after):
+        self.stats["retries"] += 1
+        if status_code == 429:
+            self.stats["rate_limited"] += 1
+            if retry_after:
+                self.bucket.penalize(retry_after)
+
+    # --- async path -------------------------------------------------------
+
+    def _state_for_loop(self):
+        # httpx clients and semaphores are bound to the loop they are used on.
+        loop = asyncio.get_running_loop()
+        with self._state_lock:
+            state = self._loop_state.get(loop)
+            if state is None:
+                client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    transport=self._transport,
+                    follow_redirects=True,
+                )
+                state = (client, asyncio.Semaphore(self.max_concurrency))
+                self._loop_state[loop] = state
+            return state
+
+    def prepaid(self):
+        """
+        Mark a token already reserved from ``self.bucket`` (``try_reserve``) as paying
+        for the current task's next request.
+        """
+        _prepaid_bucket.set(self.bucket)
+
+    async def _acquire_token(self):
+        if _prepaid_bucket.get() is self.bucket:
+            _prepaid_bucket.set(None)
+            return
+        await self.bucket.acquire_async()
+
+    async def aclose(self):
+        """Close the httpx clients opened on every loop that is still running."""
+        with self._state_lock:
+            states = list(self._loop_state.items())
+            self._loop_state.clear()
+        current = asyncio.get_running_loop()
+        for loop, (client, _) in states:
+            try:
+                if loop is current:
+                    await client.aclose()
+                elif loop.is_running():
+                    await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop))
+            except Exception as exc:
+                logger.warning(f"Could not close {self.provider} client: {exc}")
+
+    async def request_json_async(self, method, path="", params=None, headers=None, timeout=None):
+        if httpx is None:
+            return await asyncio.to_thread(self._request_json_blocking, method, path, params, headers, timeout)
+
+        client, semaphore = self._state_for_loop()
+        url = self._url(path)
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._acquire_token()
+            try:
+                async with semaphore:
+                    self.stats["requests"] += 1
+                    response = await client.request(
+                        method, url, params=params, headers=headers, timeout=timeout or self.timeout
+                    )
+                if response.status_code in RETRY_STATUSES:
+                    raise _RetryableStatus(response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+                response.raise_for_status()
+                return response.json()
+            except _RetryableStatus as exc:
+                if attempt >= self.retries:
+                    self.stats["errors"] += 1
+                    response.raise_for_status()
+                self._note_retry(exc.status_code, exc.retry_after)
+                await asyncio.sleep(self._backoff(attempt, exc.retry_after))
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    self.stats["errors"] += 1
+                    raise
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt))
+
+    async def request_json_many_async(self, requests_list, max_in_flight=None):
+        # Optional per-batch cap, applied on top of the provider-wide max_concurrency.
+        limit = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+
+        async def one(spec):
+            try:
+                if limit is None:
+                    return await self.request_json_async(**spec)
+                async with limit:
+                    return await self.request_json_async(**spec)
+            except Exception as exc:
+                logger.warning(f"{self.provider} request failed: {exc}")
+                return None
+
+        return await asyncio.gather(*(one(spec) for spec in requests_list))
+
+    # --- sync API ---------------------------------------------------------
 
     def request_json(self, method, path="", params=None, headers=None, timeout=None):
-        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        if httpx is None:
+            return self._request_json_blocking(method, path, params, headers, timeout)
+        return background_loop.run(self.request_json_async(method, path, params=params, headers=headers, timeout=timeout))
+
+    def request_json_many(self, requests_list, max_in_flight=None):
+        """
+        Fan out several requests (dicts of ``request_json`` keyword arguments) concurrently
+        within the provider's rate and concurrency limits, and at most ``max_in_flight``
+        at a time for this batch if given. Failed requests yield None.
+        """
+        if not requests_list:
+            return []
+        if httpx is None:
+            results = []
+            for spec in requests_list:
+                try:
+                    results.append(self._request_json_blocking(**spec))
+                except Exception as exc:
+                    logger.warning(f"{self.provider} request failed: {exc}")
+                    results.append(None)
+            return results
+        return background_loop.run(self.request_json_many_async(requests_list, max_in_flight=max_in_flight))
+
+    def _request_json_blocking(self, method, path="", params=None, headers=None, timeout=None):
+        url = self._url(path)
         attempt = 0
-        while attempt < self.retries:
+        while True:
             attempt += 1
-            self._respect_rate_limit()
+            self.bucket.acquire()
             try:
+                self.stats["requests"] += 1
                 response = self.session.request(
                     method,
                     url,
@@ -29,23 +336,19 @@ class ExternalAPIClient:
                     headers=headers,
                     timeout=timeout or self.timeout,
                 )
-                if response.status_code in (429, 500, 502, 503, 504):
-                    if attempt < self.retries:
-                        time.sleep(attempt)
-                        continue
+                if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    self._note_retry(response.status_code, retry_after)
+                    time.sleep(self._backoff(attempt, retry_after))
+                    continue
                 response.raise_for_status()
                 return response.json()
+            except requests.HTTPError:
+                self.stats["errors"] += 1
+                raise
             except requests.RequestException:
                 if attempt >= self.retries:
+                    self.stats["errors"] += 1
                     raise
-                time.sleep(attempt)
-        return None
-
-    def _respect_rate_limit(self):
-        if not self.min_interval:
-            return
-        with self._lock:
-            elapsed = time.time() - self._last_request_at
-            if elapsed < self.min_interval:
-                time.sleep(self.min_interval - elapsed)
-            self._last_request_at = time.time()
+                self.stats["retries"] += 1
+                time.sleep(self._backoff(attempt))
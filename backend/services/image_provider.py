@@ -1,228 +1,359 @@
-import os
-import requests
-import subprocess
-import urllib.parse
-import json
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from database import get_image_lookups, get_setting, save_image_lookup
+from .external_client import background_loop
+from .provider_registry import providers
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_inflight = SingleFlight("images")
+
+# iTunes rejects requests without a browser-like user agent.
+ITUNES_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+HIT_TTL = 30 * 86400
+MISS_TTL = 3 * 86400
+BATCH_WORKERS = 8
+DEFAULT_DEADLINE_SECONDS = 4.0
+# Query variants (primary artist, cleaned title) start this much later per rank, so
+# an exact hit usually settles the lookup before they take rate-limit tokens ...
+VARIANT_STAGGER_SECONDS = 0.25
+# ... and a variant hit waits up to this long for a better-ranked attempt still running.
+EXACT_GRACE_SECONDS = 0.5
+
+# Recent per-provider lookup latencies (seconds) and outcomes, for percentiles.
+_latencies = {}
+_outcomes = {}
+_stats_lock = threading.Lock()
+
+
+def _record_lookup(source, seconds, outcome):
+    with _stats_lock:
+        _latencies.setdefault(source, deque(maxlen=512)).append(seconds)
+        _outcomes.setdefault(source, Counter())[outcome] += 1
+
+
+def _percentile(ordered, fraction):
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def get_image_lookup_stats():
+    with _stats_lock:
+        snapshot = {source: sorted(samples) for source, samples in _latencies.items()}
+        outcomes = {source: dict(counter) for source, counter in _outcomes.items()}
+    stats = {}
+    for source, ordered in snapshot.items():
+        stats[source] = {
+            "samples": len(ordered),
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 1),
+            "p90_ms": round(_percentile(ordered, 0.9) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+            "outcomes": outcomes.get(source, {}),
+        }
+    return stats
+
+
+def _normalize(value):
+    return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+
+def lookup_key(artist, title=None):
+    if title:
+        return f"track:{_normalize(artist)}|{_normalize(title)}"
+    return f"artist:{_normalize(artist)}"
+
+
+def _primary_artist(artist):
+    return re.split(r'/|;| feat\. | ft\. | & ', artist)[0].strip()
+
+
+def _clean_title(title):
+    return re.sub(r'\s*[\(\[].*?[\)\]]', '', title).strip()
+
 
 class ImageProvider:
     def __init__(self):
-        self._image_cache = {}
         self._placeholder_hash = "2a96cbd8b46e442fc41c2b86b821562f"
 
     def get_image(self, lastfm_images, artist, title):
         """
         Get best available image.
         1. Check Last.fm provided images (XL > L).
-        2. If missing or placeholder, try iTunes.
-        3. If iTunes fails, try Deezer.
+        2. If missing or placeholder, use the stored lookup for (artist, title).
+        3. Otherwise race iTunes and Deezer within the deadline and store the hit or miss.
+        """
+        image_url = self._usable_lastfm_image(lastfm_images)
+        if image_url or not artist:
+            return image_url or self._extract_lastfm_image(lastfm_images)
+
+        key = lookup_key(artist, title)
+        stored = self._stored_lookups([key])
+        if key in stored:
+            return stored[key] or self._extract_lastfm_image(lastfm_images)
+        resolved = _inflight.do(key, self._resolve_and_store, key, artist, title)
+        return resolved or self._extract_lastfm_image(lastfm_images)
+
+    def get_images(self, items):
+        """
+        Resolve many images at once. ``items`` is a list of (lastfm_images, artist, title);
+        returns image URLs in the same order. Stored lookups are read in one query and
+        the remaining lookups run concurrently.
         """
+        results = [None] * len(items)
+        pending = {}
+        for index, (lastfm_images, artist, title) in enumerate(items):
+            image_url = self._usable_lastfm_image(lastfm_images)
+            if image_url or not artist:
+                results[index] = image_url or self._extract_lastfm_image(lastfm_images)
+            else:
+                pending.setdefault(lookup_key(artist, title), []).append(index)
+
+        stored = self._stored_lookups(list(pending))
+        unresolved = []
+        for key, indexes in pending.items():
+            if key in stored:
+                for index in indexes:
+                    results[index] = stored[key]
+            else:
+                unresolved.append(key)
+
+        if unresolved:
+            def resolve(key):
+                _, artist, title = items[pending[key][0]]
+                return _inflight.do(key, self._resolve_and_store, key, artist, title)
+
+            with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(unresolved))) as pool:
+                for key, image_url in zip(unresolved, pool.map(resolve, unresolved)):
+                    for index in pending[key]:
+                        results[index] = image_url
+
+        for index, (lastfm_images, _, _) in enumerate(items):
+            if not results[index]:
+                results[index] = self._extract_lastfm_image(lastfm_images)
+        return results
+
+    def _usable_lastfm_image(self, lastfm_images):
         image_url = self._extract_lastfm_image(lastfm_images)
+        if image_url and self._placeholder_hash not in image_url:
+            return image_url
+        return None
+
+    def _stored_lookups(self, keys):
+        try:
+            return get_image_lookups(keys)
+        except Exception as e:
+            logger.debug(f"Image lookup cache unavailable: {e}")
+            return {}
 
-        # Check for placeholder or missing
-        if not image_url or self._placeholder_hash in image_url:
-            if artist and title:
-                fallback_url = self._fetch_itunes_image(artist, title)
-                if fallback_url:
-                    image_url = fallback_url
-                else:
-                    deezer_url = self._fetch_deezer_image(artist, title)
-                    if deezer_url:
-                        image_url = deezer_url
-            elif artist:
-                # Artist-only fallback (for Concerts/Profiles)
-                fallback_url = self._fetch_itunes_artist_image(artist)
-                if fallback_url:
-                    image_url = fallback_url
-                else:
-                    deezer_url = self._fetch_deezer_artist_image(artist)
-                    if deezer_url:
-                        image_url = deezer_url
-        
+    def _resolve_and_store(self, key, artist, title):
+        image_url, source, complete = self._resolve_fallback(artist, title)
+        # A miss is only remembered when every provider actually answered.
+        if image_url or complete:
+            try:
+                save_image_lookup(key, artist, title, image_url, source, HIT_TTL if image_url else MISS_TTL)
+            except Exception as e:
+                logger.debug(f"Could not store image lookup for {key}: {e}")
         return image_url
 
+    def _deadline(self):
+        try:
+            return float(get_setting("IMAGE_LOOKUP_DEADLINE_SECONDS") or DEFAULT_DEADLINE_SECONDS)
+        except (TypeError, ValueError):
+            return DEFAULT_DEADLINE_SECONDS
+
+    def _lookup_attempts(self, artist, title):
+        """(rank, source, coroutine function, args) for every provider and query variant; rank 0 is exact."""
+        if title:
+            attempts = []
+            for rank, (s_artist, s_title) in enumerate(self._query_variants(artist, title)):
+                attempts.append((rank, "itunes", self._perform_itunes_search, (s_artist, s_title)))
+                attempts.append((rank, "deezer", self._perform_deezer_search, (s_artist, s_title)))
+            return attempts
+
+        # Artist-only fallback (for Concerts/Profiles)
+        variants = [artist]
+        primary_artist = _primary_artist(artist)
+        if primary_artist != artist:
+            variants.append(primary_artist)
+        attempts = []
+        for rank, s_artist in enumerate(variants):
+            attempts.append((rank, "itunes", self._perform_itunes_artist_search, (s_artist,)))
+            attempts.append((rank, "deezer", self._perform_deezer_artist_search, (s_artist,)))
+        return attempts
+
+    async def _timed_attempt(self, source, perform, args, delay, ends_at):
+        """
+        Run one attempt after ``delay``. Its rate-limit token is reserved without
+        blocking: if the provider cannot grant one before ``ends_at`` the attempt is
+        skipped (returns source None), and a token is handed back if the attempt is
+        cancelled while still waiting for it.
+        """
+        loop = asyncio.get_running_loop()
+        if delay:
+            await asyncio.sleep(delay)
+        client = providers.external_client(source)
+        wait = client.bucket.try_reserve(ends_at - loop.time())
+        if wait is None:
+            _record_lookup(source, 0.0, "skipped")
+            return None, None
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            if wait > 0:
+                try:
+                    await asyncio.sleep(wait)
+                except asyncio.CancelledError:
+                    client.bucket.refund()
+                    raise
+            client.prepaid()
+            image_url = await perform(*args)
+            outcome = "hit" if image_url else "miss"
+            return source, image_url
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            _record_lookup(source, time.monotonic() - started, outcome)
+
+    async def _race(self, attempts, deadline):
+        """
+        Race the attempts and return the best-ranked hit as (image_url, source, complete).
+
+        Exact-query attempts start at once and variants are staggered by rank. A hit
+        settles the lookup once no better-ranked attempt is still running, or after
+        EXACT_GRACE_SECONDS. The lookup is incomplete if it hit the deadline, an attempt
+        failed, or an attempt was skipped for lack of rate-limit budget. Whatever is
+        still running at the end is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + deadline
+        pending = {
+            asyncio.ensure_future(self._timed_attempt(source, perform, args, rank * VARIANT_STAGGER_SECONDS, ends_at)): rank
+            for rank, source, perform, args in attempts
+        }
+        complete = True
+        best = None
+        settle_at = ends_at
+        try:
+            while pending:
+                remaining = settle_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    rank = pending.pop(task)
+                    if task.exception() is not None:
+                        logger.debug(f"Image lookup failed: {task.exception()}")
+                        complete = False
+                        continue
+                    source, image_url = task.result()
+                    if source is None:
+                        complete = False
+                    elif image_url and (best is None or rank < best[0]):
+                        best = (rank, image_url, source)
+                        settle_at = min(ends_at, loop.time() + EXACT_GRACE_SECONDS)
+                if best and not any(rank < best[0] for rank in pending.values()):
+                    break
+            if best:
+                return best[1], best[2], True
+            return None, None, complete and not pending
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _resolve_fallback(self, artist, title):
+        """Race iTunes and Deezer (and cleaned-query variants) within the lookup deadline."""
+        deadline = self._deadline()
+        try:
+            return background_loop.run(self._race(self._lookup_attempts(artist, title), deadline), timeout=deadline + 1)
+        except Exception as e:
+            logger.debug(f"Image lookup race failed for {artist} - {title}: {e}")
+            return None, None, False
+
     def _extract_lastfm_image(self, images):
         """Extract best image from Last.fm list."""
         if not images or not isinstance(images, list):
             return None
-            
+
         image_url = None
         # Try extralarge, then large, then last available
         for img in images:
             if img.get("size") == "extralarge":
                 image_url = img.get("#text")
                 break
-        
+
         if not image_url and images:
             image_url = images[-1].get("#text")
-            
-        return image_url
 
-    def _fetch_itunes_image(self, artist, title):
-        """Fallback to iTunes Search API for album art."""
-        cache_key = f"itunes_{artist}_{title}"
-        if cache_key in self._image_cache:
-            return self._image_cache[cache_key]
-
-        img_url = self._perform_itunes_search(artist, title)
-        
-        # If no result, try aggressive cleaning strategies
-        if not img_url:
-            import re
-            
-            # Strategy 1: Clean Artist (Primary only)
-            primary_artist = re.split(r'/|;| feat\. | ft\. | & ', artist)[0].strip()
-            
-            # Strategy 2: Clean Title (Remove (...) and [...] content)
-            clean_title = re.sub(r'\s*[\(\[].*?[\)\]]', '', title).strip()
-            
-            strategies = []
-            if primary_artist != artist:
-                strategies.append((primary_artist, title)) # Clean Artist
-            if clean_title != title:
-                strategies.append((artist, clean_title)) # Clean Title
-            if primary_artist != artist and clean_title != title:
-                strategies.append((primary_artist, clean_title)) # Both Clean
-                
-            for s_artist, s_title in strategies:
-                # print(f"DEBUG: Retrying iTunes with: {s_artist} - {s_title}")
-                img_url = self._perform_itunes_search(s_artist, s_title)
-                if img_url:
-                    break
+        return image_url
 
-        if img_url:
-            self._image_cache[cache_key] = img_url
-            
-        return img_url
+    def _query_variants(self, artist, title):
+        """The original query, then primary-artist / cleaned-title retries."""
+        primary_artist = _primary_artist(artist)
+        clean_title = _clean_title(title)
+        variants = [(artist, title)]
+        if primary_artist != artist:
+            variants.append((primary_artist, title))
+        if clean_title != title:
+            variants.append((artist, clean_title))
+        if primary_artist != artist and clean_title != title:
+            variants.append((primary_artist, clean_title))
+        return variants
 
-    def _perform_itunes_search(self, artist, title):
-        try:
-            term = urllib.parse.quote(f"{artist} {title}")
-            url = f"https://itunes.apple.com/search?term={term}&entity=song&limit=1"
-            
-            curl_cmd = 'curl.exe' if os.name == 'nt' else 'curl'
-            cmd = [
-                curl_cmd, '-s',
-                '-A', "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-                url
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=5)
-            
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                if data["resultCount"] > 0:
-                    result_item = data["results"][0]
-                    raw_url = result_item.get("artworkUrl100")
-                    if raw_url:
-                        return raw_url.replace("100x100bb", "600x600bb")
-        except Exception:
-            pass
+    async def _perform_itunes_search(self, artist, title):
+        data = await providers.external_client("itunes").request_json_async(
+            "GET",
+            "search",
+            params={"term": f"{artist} {title}", "entity": "song", "limit": 1},
+            headers=ITUNES_HEADERS,
+        )
+        if data and data.get("resultCount", 0) > 0:
+            raw_url = data["results"][0].get("artworkUrl100")
+            if raw_url:
+                return raw_url.replace("100x100bb", "600x600bb")
         return None
 
-    def _fetch_deezer_image(self, artist, title):
-        """Fallback to Deezer API for album art."""
-        img_url = self._perform_deezer_search(artist, title)
-        
-        if not img_url:
-            import re
-            primary_artist = re.split(r'/|;| feat\. | ft\. | & ', artist)[0].strip()
-            clean_title = re.sub(r'\s*[\(\[].*?[\)\]]', '', title).strip()
-            
-            strategies = []
-            if primary_artist != artist: strategies.append((primary_artist, title))
-            if clean_title != title: strategies.append((artist, clean_title))
-            if primary_artist != artist and clean_title != title: strategies.append((primary_artist, clean_title))
-            
-            for s_artist, s_title in strategies:
-                img_url = self._perform_deezer_search(s_artist, s_title)
-                if img_url: break
-        
-        return img_url
-
-    def _perform_deezer_search(self, artist, title):
-        try:
-            query = f'artist:"{artist}" track:"{title}"'
-            params = {
-                "q": query,
-                "limit": 1
-            }
-            url = "https://api.deezer.com/search"
-            response = requests.get(url, params=params, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "data" in data and len(data["data"]) > 0:
-                    track = data["data"][0]
-                    album = track.get("album", {})
-                    return album.get("cover_xl") or album.get("cover_big") or album.get("cover_medium")
-        except Exception:
-            pass
+    async def _perform_deezer_search(self, artist, title):
+        data = await providers.external_client("deezer").request_json_async(
+            "GET",
+            "search",
+            params={"q": f'artist:"{artist}" track:"{title}"', "limit": 1},
+        )
+        if data and data.get("data"):
+            album = data["data"][0].get("album", {})
+            return album.get("cover_xl") or album.get("cover_big") or album.get("cover_medium")
         return None
 
-    def _fetch_itunes_artist_image(self, artist):
-        """Fallback to iTunes Search API for artist image."""
-        cache_key = f"itunes_artist_{artist}"
-        if cache_key in self._image_cache:
-            return self._image_cache[cache_key]
-
-        img_url = self._perform_itunes_artist_search(artist)
-        
-        if not img_url:
-            import re
-            # Clean Artist (Primary only)
-            primary_artist = re.split(r'/|;| feat\. | ft\. | & ', artist)[0].strip()
-            
-            if primary_artist != artist:
-                img_url = self._perform_itunes_artist_search(primary_artist)
-
-        if img_url:
-            self._image_cache[cache_key] = img_url
-            
-        return img_url
-
-    def _perform_itunes_artist_search(self, artist):
-        try:
-            term = urllib.parse.quote(artist)
-            # Method 1: Search for top album (often better art than artist search)
-            url = f"https://itunes.apple.com/search?term={term}&entity=album&limit=1"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data["resultCount"] > 0:
-                     img_url = data["results"][0].get("artworkUrl100")
-                     if img_url:
-                        return img_url.replace("100x100bb", "600x600bb")
-        except Exception:
-            pass
+    async def _perform_itunes_artist_search(self, artist):
+        # Search for top album (often better art than artist search)
+        data = await providers.external_client("itunes").request_json_async(
+            "GET",
+            "search",
+            params={"term": artist, "entity": "album", "limit": 1},
+            headers=ITUNES_HEADERS,
+        )
+        if data and data.get("resultCount", 0) > 0:
+            img_url = data["results"][0].get("artworkUrl100")
+            if img_url:
+                return img_url.replace("100x100bb", "600x600bb")
         return None
 
-    def _fetch_deezer_artist_image(self, artist):
-        """Fallback to Deezer API for artist image."""
-        img_url = self._perform_deezer_artist_search(artist)
-        
-        if not img_url:
-            import re
-            primary_artist = re.split(r'/|;| feat\. | ft\. | & ', artist)[0].strip()
-            if primary_artist != artist:
-                img_url = self._perform_deezer_artist_search(primary_artist)
-        
-        return img_url
-
-    def _perform_deezer_artist_search(self, artist):
-        try:
-            query = f'"{artist}"'
-            params = {
-                "q": query,
-                "limit": 1
-            }
-            url = "https://api.deezer.com/search/artist"
-            response = requests.get(url, params=params, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "data" in data and len(data["data"]) > 0:
-                    a = data["data"][0]
-                    return a.get("picture_xl") or a.get("picture_big") or a.get("picture_medium")
-        except Exception:
-            pass
+    async def _perform_deezer_artist_search(self, artist):
+        data = await providers.external_client("deezer").request_json_async(
+            "GET",
+            "search/artist",
+            params={"q": f'"{artist}"', "limit": 1},
+        )
+        if data and data.get("data"):
+            a = data["data"][0]
+            return a.get("picture_xl") or a.get("picture_big") or a.get("picture_medium")
         return None
@@ -3,13 +3,13 @@ from datetime import datetime
 
 from database import (
     get_all_scrobbles,
-    get_downloads,
     get_ignored_items,
     get_scrobbles_in_range,
     get_sessions,
     get_setting,
     get_top_artists_from_db,
     get_top_tracks_from_db,
+    library_index,
     replace_sessions,
 )
 
@@ -139,31 +139,28 @@ class InsightService:
 
     def get_gaps(self, user):
         top_tracks = get_top_tracks_from_db(user, limit=40)
-        downloads = get_downloads(page=1, limit=100000, status="completed")
-        downloaded = {(item["artist"].lower(), item["title"].lower()) for item in downloads}
         ignored = {
             ((item.get("artist") or "").lower(), (item.get("title") or "").lower())
             for item in get_ignored_items(user, "gap_track")
         }
 
         missing_tracks = []
-        for track in top_tracks:
+        downloaded = library_index.contains_many((track["artist"], track["title"]) for track in top_tracks)
+        for track, is_downloaded in zip(top_tracks, downloaded):
             key = (track["artist"].lower(), track["title"].lower())
-            if key not in downloaded and key not in ignored:
+            if not is_downloaded and key not in ignored:
                 missing_tracks.append(track)
 
-        local_artists = Counter(item["artist"] for item in downloads if item.get("artist"))
         favorite_artists = get_top_artists_from_db(user, limit=15)
         weak_coverage = []
         for artist in favorite_artists:
-            local_count = local_artists.get(artist["name"], 0)
+            local_count = library_index.artist_track_count(artist["name"])
             if local_count < 3:
                 weak_coverage.append({"artist": artist["name"], "playcount": artist["playcount"], "local_tracks": local_count})
 
-        local_albums = Counter((item["artist"], item["album"]) for item in downloads if item.get("album"))
         sparse_albums = [
             {"artist": artist, "album": album, "local_tracks": count}
-            for (artist, album), count in local_albums.items()
+            for (artist, album), count in library_index.album_counts().items()
             if count <= 2
         ]
 
@@ -1,10 +1,8 @@
-from .api_client import LastFMApiClient
-from .cache_manager import CacheManager
-from .image_provider import ImageProvider
 from .lastfm_support.artist_data import (
     get_artist_image,
     get_artist_info,
     get_artist_listeners,
+    get_artist_profile,
     get_artist_tags,
     get_artist_top_albums,
     get_artist_top_tracks,
@@ -24,10 +22,14 @@ from .lastfm_support.user_tracks import (
 
 
 class LastFMService:
-    def __init__(self):
-        self.cache = CacheManager(ttl=86400)
-        self.client = LastFMApiClient()
-        self.image_provider = ImageProvider()
+    def __init__(self, client=None, image_provider=None, cache=None):
+        # Dependencies default to the shared registry instances so every
+        # LastFMService shares one cache, image lookup and rate limit.
+        from .provider_registry import providers
+
+        self.cache = cache or providers.cache("lastfm", ttl=86400)
+        self.client = client or providers.lastfm_client()
+        self.image_provider = image_provider or providers.image_provider()
 
     get_recent_tracks = get_recent_tracks
     get_top_tracks = get_top_tracks
@@ -35,6 +37,7 @@ class LastFMService:
     get_cached_recent_tracks = get_cached_recent_tracks
     prefetch_track_infos = prefetch_track_infos
     refresh_stats_cache = refresh_stats_cache
+    get_artist_profile = get_artist_profile
     get_artist_listeners = get_artist_listeners
     get_artist_tags = get_artist_tags
     get_artist_image = get_artist_image
@@ -1,47 +1,58 @@
+from .artist_profile import ArtistProfile, clean_tags
 from .mappers import ensure_list
 
 
-def get_artist_listeners(self, artist_name):
-    cache_key = f"artist_listeners_{artist_name}"
+# Unknown artists are remembered for a while so obscure names are not refetched per request.
+ARTIST_PROFILE_MISS_TTL = 6 * 3600
+
+
+def get_artist_profile(self, artist_name):
+    """Single cached ``artist.getinfo`` lookup that the artist helpers below project from."""
+    cache_key = f"artist_profile_{artist_name}"
     cached = self.cache.get(cache_key)
-    if cached:
-        return cached
+    if cached is not None:
+        return ArtistProfile.from_dict(cached)
 
-    data = self.client.request("GET", {"method": "artist.getinfo", "artist": artist_name})
-    if data and "artist" in data:
-        listeners = int(data["artist"].get("stats", {}).get("listeners", 0))
-        self.cache.set(cache_key, listeners)
-        return listeners
-    return 0
+    data = self.client.request("artist.getinfo", {"artist": artist_name})
+    if data is None:
+        # Transport failure rather than a miss; do not cache it.
+        return ArtistProfile(artist_name, found=False)
+    profile = ArtistProfile.from_response(artist_name, data)
+    self.cache.set(cache_key, profile.to_dict(), ttl=None if profile.found else ARTIST_PROFILE_MISS_TTL)
+    return profile
+
+
+def get_artist_listeners(self, artist_name):
+    return self.get_artist_profile(artist_name).listeners
 
 
 def get_artist_tags(self, artist_name):
+    profile = self.get_artist_profile(artist_name)
+    if profile.tags or not profile.found:
+        return profile.tags
+
+    # getinfo carries no tags for some artists; fall back to the full tag list.
     cache_key = f"artist_tags_{artist_name}"
     cached = self.cache.get(cache_key)
-    if cached:
+    if cached is not None:
         return cached
 
-    data = self.client.request("GET", {"method": "artist.gettoptags", "artist": artist_name})
-    tags = []
-    for tag in ensure_list(data.get("toptags", {}).get("tag") if data else []):
-        tag_name = tag.get("name", "").lower()
-        if tag_name not in ["seen live", "seen", "concerts", "fip"]:
-            tags.append(tag_name.title())
+    data = self.client.request("artist.gettoptags", {"artist": artist_name})
+    tags = clean_tags(data.get("toptags", {}).get("tag") if data else [])
     self.cache.set(cache_key, tags)
     return tags
 
 
 def get_artist_image(self, artist_name):
+    # Resolved lazily: the iTunes/Deezer fallback only runs for artists whose image is shown.
     cache_key = f"artist_image_{artist_name}"
     cached = self.cache.get(cache_key)
-    if cached:
-        return cached
+    if cached is not None:
+        return cached or None
 
-    data = self.client.request("GET", {"method": "artist.getinfo", "artist": artist_name})
-    image_url = None
-    if data and "artist" in data:
-        image_url = self.image_provider.get_image(data["artist"].get("image", []), artist_name, None)
-    self.cache.set(cache_key, image_url)
+    profile = self.get_artist_profile(artist_name)
+    image_url = self.image_provider.get_image(profile.images, artist_name, None)
+    self.cache.set(cache_key, image_url or "")
     return image_url
 
 
@@ -108,15 +119,17 @@ def get_similar_artists(self, artist: str, limit: int = 5):
 
 
 def get_artist_info(self, artist: str, username: str = None):
+    if not username:
+        profile = self.get_artist_profile(artist)
+        return profile.info if profile.found else None
+
+    # Per-user stats (userplaycount) are not part of the shared profile.
     cache_key = f"artist_info_{artist}_{username}"
     cached = self.cache.get(cache_key)
     if cached:
         return cached
 
-    params = {"method": "artist.getinfo", "artist": artist}
-    if username:
-        params["user"] = username
-    data = self.client.request("GET", params)
+    data = self.client.request("artist.getinfo", {"artist": artist, "user": username})
     if data and "artist" in data:
         self.cache.set(cache_key, data["artist"])
         return data["artist"]
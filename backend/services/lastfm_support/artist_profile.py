@@ -0,0 +1,61 @@
+from .mappers import ensure_list
+
+IGNORED_TAGS = {"seen live", "seen", "concerts", "fip"}
+
+
+def clean_tags(raw_tags):
+    tags = []
+    for tag in ensure_list(raw_tags):
+        tag_name = (tag.get("name") or "").lower()
+        if tag_name and tag_name not in IGNORED_TAGS:
+            tags.append(tag_name.title())
+    return tags
+
+
+class ArtistProfile:
+    """Everything we use from one ``artist.getinfo`` response, cacheable as plain JSON."""
+
+    def __init__(self, name, found=True, listeners=0, playcount=0, images=None, bio=None, tags=None, url=None, info=None):
+        self.name = name
+        self.found = found
+        self.listeners = listeners
+        self.playcount = playcount
+        self.images = images or []
+        self.bio = bio
+        self.tags = tags or []
+        self.url = url
+        self.info = info
+
+    @classmethod
+    def from_response(cls, artist_name, data):
+        artist = (data or {}).get("artist")
+        if not artist:
+            return cls(artist_name, found=False)
+        stats = artist.get("stats", {})
+        return cls(
+            artist.get("name") or artist_name,
+            listeners=int(stats.get("listeners", 0) or 0),
+            playcount=int(stats.get("playcount", 0) or 0),
+            images=artist.get("image", []),
+            bio=(artist.get("bio") or {}).get("summary"),
+            tags=clean_tags((artist.get("tags") or {}).get("tag")),
+            url=artist.get("url"),
+            info=artist,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "found": self.found,
+            "listeners": self.listeners,
+            "playcount": self.playcount,
+            "images": self.images,
+            "bio": self.bio,
+            "tags": self.tags,
+            "url": self.url,
+            "info": self.info,
+        }
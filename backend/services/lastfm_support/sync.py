@@ -1,65 +1,123 @@
 import time
 
-from database.repositories.scrobbles import add_scrobbles_batch, get_latest_scrobble_timestamp
+from database import get_setting
+from database.repositories.scrobbles import (
+    add_scrobbles_batch,
+    clear_sync_checkpoint,
+    get_latest_scrobble_timestamp,
+    get_sync_checkpoint,
+    mark_sync_pages_completed,
+    start_sync_checkpoint,
+)
 
 from .mappers import ensure_list
 
+PAGE_LIMIT = 200
 
-def sync_scrobbles_to_db(self, user: str):
-    last_ts = get_latest_scrobble_timestamp(user)
-    start_ts = last_ts + 1 if last_ts > 0 else 0
 
-    print(f"Syncing scrobbles for {user} starting from {start_ts}...")
-    page = 1
-    limit = 200
-    new_scrobbles_count = 0
+def _page_params(user, page, from_ts, to_ts):
+    return {
+        "user": user,
+        "limit": PAGE_LIMIT,
+        "page": page,
+        "from": from_ts,
+        "to": to_ts,
+    }
+
 
-    while True:
-        data = self.client.request(
-            "GET",
-            {
-                "method": "user.getrecenttracks",
-                "user": user,
-                "limit": limit,
-                "page": page,
-                "from": start_ts,
-            },
+def _parse_page(user, data):
+    """Return (scrobble tuples, total_pages) for a recenttracks page, or None if malformed."""
+    if not data or "recenttracks" not in data or "track" not in data["recenttracks"]:
+        return None
+
+    tracks = ensure_list(data["recenttracks"]["track"])
+    batch_data = []
+    for track in tracks:
+        if "@attr" in track and track["@attr"].get("nowplaying") == "true":
+            continue
+        if "date" not in track:
+            continue
+        batch_data.append(
+            (
+                user,
+                track.get("artist", {}).get("#text"),
+                track.get("name"),
+                track.get("album", {}).get("#text"),
+                track.get("image", [{}])[-1].get("#text"),
+                int(track["date"]["uts"]),
+            )
         )
-        if not data or "recenttracks" not in data or "track" not in data["recenttracks"]:
-            break
+    total_pages = int(data["recenttracks"].get("@attr", {}).get("totalPages", 1) or 1)
+    return batch_data, total_pages
+
 
-        tracks = ensure_list(data["recenttracks"]["track"])
-        if not tracks:
-            break
+def sync_scrobbles_to_db(self, user: str):
+    """
+    Import new scrobbles for ``user``.
 
-        valid_tracks = [track for track in tracks if not ("@attr" in track and track["@attr"].get("nowplaying") == "true")]
-        if not valid_tracks and page == 1:
-            break
+    The window is pinned to ``[from, to]`` when the sync starts so page numbers stay
+    stable while the user keeps listening. Page 1 gives ``totalPages``; the remaining
+    pages are fetched concurrently (within the shared Last.fm rate limit) and stored
+    as each chunk arrives. Completed pages are checkpointed, so an interrupted
+    backfill resumes the same window instead of starting over.
+    """
+    checkpoint = get_sync_checkpoint(user)
+    if checkpoint:
+        from_ts, to_ts = checkpoint["from_ts"], checkpoint["to_ts"]
+        completed = checkpoint["completed_pages"]
+        print(f"Resuming scrobble sync for {user} ({len(completed)} pages already stored)...")
+    else:
+        last_ts = get_latest_scrobble_timestamp(user)
+        from_ts = last_ts + 1 if last_ts > 0 else 0
+        to_ts = int(time.time())
+        completed = set()
+        print(f"Syncing scrobbles for {user} starting from {from_ts}...")
 
-        batch_data = []
-        for track in valid_tracks:
-            if "date" not in track:
-                continue
-            batch_data.append(
-                (
-                    user,
-                    track.get("artist", {}).get("#text"),
-                    track.get("name"),
-                    track.get("album", {}).get("#text"),
-                    track.get("image", [{}])[-1].get("#text"),
-                    int(track["date"]["uts"]),
-                )
-            )
+    new_scrobbles_count = 0
+    first = _parse_page(user, self.client.request("user.getrecenttracks", _page_params(user, 1, from_ts, to_ts)))
+    if first is None:
+        return 0
+    batch_data, total_pages = first
+    if not batch_data and total_pages <= 1:
+        clear_sync_checkpoint(user)
+        print("Sync complete. Added 0 new scrobbles.")
+        return 0
 
+    start_sync_checkpoint(user, from_ts, to_ts, total_pages)
+    if 1 not in completed:
         if batch_data:
             add_scrobbles_batch(batch_data)
             new_scrobbles_count += len(batch_data)
+        mark_sync_pages_completed(user, [1])
 
-        total_pages = int(data["recenttracks"].get("@attr", {}).get("totalPages", 1))
-        if page >= total_pages or page >= 200:
-            break
-        page += 1
-        time.sleep(0.5)
+    # LASTFM_SYNC_CONCURRENCY caps page requests in flight (the Last.fm token bucket
+    # still paces them); pages are stored and checkpointed in chunks of twice that.
+    concurrency = max(int(get_setting("LASTFM_SYNC_CONCURRENCY") or 4), 1)
+    remaining = [page for page in range(2, total_pages + 1) if page not in completed]
+    chunk_size = concurrency * 2
+    for offset in range(0, len(remaining), chunk_size):
+        pages = remaining[offset:offset + chunk_size]
+        results = self.client.request_many(
+            [("user.getrecenttracks", _page_params(user, page, from_ts, to_ts)) for page in pages],
+            max_in_flight=concurrency,
+        )
+        done = []
+        failed = False
+        for page, data in zip(pages, results):
+            parsed = _parse_page(user, data)
+            if parsed is None:
+                failed = True
+                continue
+            if parsed[0]:
+                add_scrobbles_batch(parsed[0])
+                new_scrobbles_count += len(parsed[0])
+            done.append(page)
+        mark_sync_pages_completed(user, done)
+        if failed:
+            # Keep the checkpoint; the next sync retries only the missing pages.
+            print(f"Sync interrupted for {user}; added {new_scrobbles_count} scrobbles, will resume.")
+            return new_scrobbles_count
 
+    clear_sync_checkpoint(user)
     print(f"Sync complete. Added {new_scrobbles_count} new scrobbles.")
     return new_scrobbles_count
@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import mutagen
+except ModuleNotFoundError:
+    mutagen = None
+
+from database import (
+    get_completed_download_tracks,
+    get_library_file_index,
+    link_library_files,
+    mark_library_files_missing,
+    record_library_scan,
+    upsert_library_files,
+)
+from utils import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = {".mp3", ".m4a", ".flac", ".ogg", ".opus", ".wav", ".aac"}
+WRITE_BATCH_SIZE = 500
+
+
+def expected_download_path(artist, album, title):
+    """Relative path the downloader files a track under (see DownloaderService._stage_file)."""
+    return "/".join(
+        [
+            sanitize_filename(artist or "Unknown Artist"),
+            sanitize_filename(album or "Unknown Album"),
+            f"{sanitize_filename(title or 'Unknown Title')}.mp3",
+        ]
+    )
+
+
+class LibraryIndexer:
+    """
+    Reconciles the ``downloads`` table with the files actually on disk.
+
+    Each scan walks the download directory and compares size and mtime against
+    ``library_files``; only new or changed files are probed (duration, bitrate) and
+    hashed, so repeat scans of a large, mostly static library cost little more than a
+    directory walk. Files that disappeared are marked missing, and every file is
+    linked to the completed download that accounts for it (orphans have no link).
+    """
+
+    def __init__(self, root="downloads"):
+        self.root = root
+        self._lock = threading.Lock()
+        self.last_result = None
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    def _walk(self, directory):
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            logger.warning(f"Library scan could not read {directory}: {e}")
+            return
+        for entry in entries:
+            if entry.name.startswith((".", "temp_")):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield from self._walk(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in AUDIO_EXTENSIONS:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                relative = os.path.relpath(entry.path, self.root).replace(os.sep, "/")
+                yield relative, stat.st_size, stat.st_mtime
+
+    def _probe(self, path):
+        if mutagen is None:
+            return None, None
+        try:
+            audio = mutagen.File(path)
+        except Exception as e:
+            logger.debug(f"Could not read audio info for {path}: {e}")
+            return None, None
+        info = getattr(audio, "info", None)
+        if info is None:
+            return None, None
+        bitrate = getattr(info, "bitrate", None)
+        length = getattr(info, "length", None)
+        return (round(length, 2) if length else None), (int(bitrate) if bitrate else None)
+
+    def _hash(self, path):
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def scan(self):
+        """Run one incremental scan; returns counts, or None if a scan is already running."""
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._scan()
+        finally:
+            self._lock.release()
+
+    def _scan(self):
+        started = time.monotonic()
+        started_at = datetime.now(timezone.utc).isoformat()
+        stats = {"files_seen": 0, "added": 0, "changed": 0, "unchanged": 0, "removed": 0, "relinked": 0, "errors": 0}
+        if not os.path.isdir(self.root):
+            logger.warning(f"Library scan skipped: {self.root} does not exist")
+            return stats
+
+        index = get_library_file_index()
+        expected = {}
+        for query, artist, title, album in get_completed_download_tracks():
+            expected[expected_download_path(artist, album, title)] = query
+
+        seen = set()
+        pending = []
+        links = []
+        for relative, size, mtime in self._walk(self.root):
+            seen.add(relative)
+            stats["files_seen"] += 1
+            query = expected.get(relative)
+            known = index.get(relative)
+            if known and known[0] == size and known[1] == mtime:
+                stats["unchanged"] += 1
+                if known[2] != query:
+                    links.append((relative, query))
+                continue
+
+            absolute = os.path.join(self.root, relative)
+            try:
+                content_hash = self._hash(absolute)
+            except OSError as e:
+                stats["errors"] += 1
+                logger.warning(f"Library scan could not hash {absolute}: {e}")
+                continue
+            duration, bitrate = self._probe(absolute)
+            pending.append(
+                {
+                    "path": relative,
+                    "size_bytes": size,
+                    "mtime": mtime,
+                    "duration_seconds": duration,
+                    "bitrate": bitrate,
+                    "content_hash": content_hash,
+                    "download_query": query,
+                }
+            )
+            stats["changed" if known else "added"] += 1
+            if len(pending) >= WRITE_BATCH_SIZE:
+                upsert_library_files(pending)
+                pending = []
+
+        upsert_library_files(pending)
+        stats["relinked"] = link_library_files(links)
+        stats["removed"] = mark_library_files_missing(path for path in index if path not in seen)
+
+        duration_ms = int((time.monotonic() - started) * 1000)
+        record_library_scan(started_at, stats, duration_ms)
+        stats["duration_ms"] = duration_ms
+        self.last_result = stats
+        return stats
+
+
+library_indexer = LibraryIndexer()
@@ -1,18 +1,83 @@
 import logging
-from database import get_stream_source, mark_stream_source_failure, mark_stream_source_verified
+from database import (
+    find_download_by_track,
+    find_downloads_by_tracks,
+    find_recent_stream_source,
+    find_recent_stream_sources_for_tracks,
+    get_stream_source,
+    mark_stream_source_failure,
+    mark_stream_source_verified,
+)
+from services.cache_manager import CacheManager
+from services.event_bus import DOWNLOAD_COMPLETED, event_bus
 from services.stream_resolver import build_track_key, stream_resolver
 
 logger = logging.getLogger(__name__)
 
+# Short on purpose: entries hold raw rows and health is re-derived on every read, so
+# the TTL only bounds how long a write made outside this service can go unnoticed.
+PLAYABLE_CACHE_TTL_SECONDS = 60
+
 
 class PlayableSourceService:
+    """
+    Decides how a track can be played (local file, cached stream, fresh resolution).
+
+    The download and stream-source rows behind that decision are kept in an in-memory
+    map by track key, so queue payloads and recommendation lists don't re-query SQLite
+    for every item. Entries are invalidated when a download completes or a source is
+    resolved, verified or marked failed.
+    """
+
+    def __init__(self):
+        self._hot = CacheManager(
+            ttl=PLAYABLE_CACHE_TTL_SECONDS, namespace="playable_sources", max_entries=4096, persistent=False
+        )
+        event_bus.subscribe(self._on_download_completed, topics={DOWNLOAD_COMPLETED})
+
+    def _lookup(self, artist, title, album=None):
+        key = build_track_key(artist, title, album)
+        entry = self._hot.get(key)
+        if entry is None:
+            entry = {
+                "download": find_download_by_track(artist, title, album=album),
+                "stream": find_recent_stream_source(artist, title, album=album),
+            }
+            self._hot.set(key, entry)
+        return entry
+
+    def _state_from(self, entry, preview_url):
+        if entry["download"]:
+            return "local", True
+        source = entry["stream"]
+        health = stream_resolver.describe_source_health(source) if source else None
+        if health and health["can_use_cached"]:
+            return "cached_stream", True
+        if health and not health.get("should_attempt_resolution"):
+            return "cooldown", bool(preview_url)
+        if preview_url:
+            return "resolvable", True
+        if self.is_streaming_enabled():
+            return "resolvable", True
+        return "unavailable", False
+
+    def invalidate(self, artist=None, title=None):
+        """Forget cached state for one track (any album), or for everything when no track is given."""
+        if artist is None and title is None:
+            self._hot.clear()
+            return
+        self._hot.clear_with_prefix(build_track_key(artist, title))
+
+    def _on_download_completed(self, topic, payload):
+        self.invalidate(payload.get("artist"), payload.get("title"))
+
     def resolve(self, artist, title, album=None, preview_url=None):
-        local = stream_resolver.find_local_source(artist, title, album=album)
-        if local:
-            return local
+        entry = self._lookup(artist, title, album=album)
+        if entry["download"]:
+            return stream_resolver.local_source_result(entry["download"], artist, title, album)
 
-        cached = stream_resolver.get_cached_stream_source(artist, title, album=album)
-        if cached:
+        cached = entry["stream"]
+        if cached and stream_resolver.describe_source_health(cached)["can_use_cached"]:
             return {
                 "playback_type": cached.get("playback_type"),
                 "audio_url": cached.get("playable_url"),
@@ -27,7 +92,7 @@ class PlayableSourceService:
                 "stream_source_id": cached.get("id"),
             }
 
-        source_health = stream_resolver.get_stream_source_health(artist, title, album=album)
+        source_health = stream_resolver.describe_source_health(cached) if cached else None
         if source_health and not source_health.get("should_attempt_resolution"):
             logger.info(
                 "stream_resolution_cooldown artist=%s title=%s stream_source_id=%s cooldown_until=%s",
@@ -42,23 +107,48 @@ class PlayableSourceService:
             return stream_resolver._preview_result(preview_url, build_track_key(artist, title, album))
         if not self.is_streaming_enabled():
             return None
-        return stream_resolver.resolve_remote_stream(artist, title, album=album, preview_url=preview_url)
+        result = stream_resolver.resolve_remote_stream(artist, title, album=album, preview_url=preview_url)
+        self.invalidate(artist, title)
+        return result
 
     def get_playable_state(self, artist, title, album=None, preview_url=None):
-        local = stream_resolver.find_local_source(artist, title, album=album)
-        if local:
-            return "local", True
-        cached = stream_resolver.get_cached_stream_source(artist, title, album=album)
-        if cached:
-            return "cached_stream", True
-        source_health = stream_resolver.get_stream_source_health(artist, title, album=album)
-        if source_health and not source_health.get("should_attempt_resolution"):
-            return "cooldown", bool(preview_url)
-        if preview_url:
-            return "resolvable", True
-        if self.is_streaming_enabled():
-            return "resolvable", True
-        return "unavailable", False
+        return self._state_from(self._lookup(artist, title, album=album), preview_url)
+
+    def get_playable_states(self, items):
+        """
+        ``get_playable_state`` for many tracks at once (dicts with artist, title, album,
+        preview_url). Tracks missing from the hot cache are loaded with one query per
+        table; returns a list of (state, is_streamable) in input order.
+        """
+        entries = {}
+        cold = []
+        for item in items:
+            key = build_track_key(item.get("artist"), item.get("title"), item.get("album"))
+            if key in entries:
+                continue
+            entry = self._hot.get(key)
+            entries[key] = entry
+            if entry is None:
+                cold.append(item)
+
+        if cold:
+            tracks = [(item.get("artist"), item.get("title"), item.get("album")) for item in cold]
+            downloads = find_downloads_by_tracks(tracks)
+            sources = find_recent_stream_sources_for_tracks(tracks)
+            for item in cold:
+                artist, title, album = item.get("artist"), item.get("title"), item.get("album")
+                entry = {
+                    "download": downloads.get((artist, title, album or "")),
+                    "stream": sources.get((artist, title, album or "")),
+                }
+                key = build_track_key(artist, title, album)
+                entries[key] = entry
+                self._hot.set(key, entry)
+
+        return [
+            self._state_from(entries[build_track_key(item.get("artist"), item.get("title"), item.get("album"))], item.get("preview_url"))
+            for item in items
+        ]
 
     def mark_failure(self, stream_source_id, error_message):
         if not stream_source_id:
@@ -69,15 +159,20 @@ class PlayableSourceService:
         next_failure_count = int(source.get("failure_count") or 0) + 1
         health_status = "cooldown" if next_failure_count >= stream_resolver.failure_threshold else "degraded"
         mark_stream_source_failure(stream_source_id, error_message, health_status=health_status)
+        self.invalidate(source["artist"], source["title"])
         updated_source = get_stream_source(stream_source_id)
         return stream_resolver.describe_source_health(updated_source)
 
     def mark_success(self, stream_source_id, playable_url=None, expires_at=None):
         if stream_source_id:
             mark_stream_source_verified(stream_source_id, playable_url=playable_url, expires_at=expires_at)
+            source = get_stream_source(stream_source_id)
+            if source:
+                self.invalidate(source["artist"], source["title"])
 
     def get_stream_health(self, artist, title, album=None):
-        return stream_resolver.get_stream_source_health(artist, title, album=album)
+        source = self._lookup(artist, title, album=album)["stream"]
+        return stream_resolver.describe_source_health(source) if source else None
 
     def refresh_proxy_url(self, stream_source_id):
         source = get_stream_source(stream_source_id)
@@ -0,0 +1,104 @@
+import threading
+
+from .cache_manager import CacheManager
+from .external_client import ExternalAPIClient
+
+
+# One client (and therefore one session and one rate-limit budget) per provider.
+PROVIDER_CONFIG = {
+    "lastfm": {
+        "base_url": "http://ws.audioscrobbler.com/2.0/",
+        "timeout": 10,
+        "retries": 3,
+        "min_interval": 0.25,
+    },
+    "musicbrainz": {
+        "base_url": "https://musicbrainz.org/ws/2/",
+        "timeout": 10,
+        "retries": 2,
+        "min_interval": 1.1,
+    },
+    "itunes": {
+        "base_url": "https://itunes.apple.com/",
+        "timeout": 5,
+        "retries": 2,
+        "min_interval": 0.2,
+        "max_concurrency": 4,
+    },
+    "deezer": {
+        "base_url": "https://api.deezer.com/",
+        "timeout": 5,
+        "retries": 2,
+        "min_interval": 0.1,
+        "max_concurrency": 4,
+    },
+}
+
+
+class ProviderRegistry:
+    """
+    Process-wide home for external API clients and the services built on them.
+
+    Everything is created lazily on first use and then shared, so the Last.fm cache,
+    image lookups and per-provider rate limiting are the same object no matter which
+    service (dashboard, recommendations, radio) asks for them.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances = {}
+
+    def _get(self, name, factory):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = factory()
+                self._instances[name] = instance
+            return instance
+
+    def external_client(self, provider):
+        config = PROVIDER_CONFIG.get(provider, {})
+        return self._get(f"client:{provider}", lambda: ExternalAPIClient(provider, **config))
+
+    async def aclose(self):
+        """Release the pooled connections of every external client (app shutdown)."""
+        with self._lock:
+            clients = [instance for instance in self._instances.values() if isinstance(instance, ExternalAPIClient)]
+        for client in clients:
+            await client.aclose()
+
+    def cache(self, namespace, ttl=86400):
+        return self._get(f"cache:{namespace}", lambda: CacheManager(ttl=ttl, namespace=namespace))
+
+    def lastfm_client(self):
+        from .api_client import LastFMApiClient
+
+        return self._get("lastfm_client", lambda: LastFMApiClient(client=self.external_client("lastfm")))
+
+    def image_provider(self):
+        from .image_provider import ImageProvider
+
+        return self._get("image_provider", ImageProvider)
+
+    def lastfm_service(self):
+        from .lastfm import LastFMService
+
+        return self._get(
+            "lastfm_service",
+            lambda: LastFMService(
+                client=self.lastfm_client(),
+                image_provider=self.image_provider(),
+                cache=self.cache("lastfm", ttl=86400),
+            ),
+        )
+
+    def analytics_service(self):
+        from .analytics import AnalyticsService
+
+        return self._get("analytics_service", lambda: AnalyticsService(self.lastfm_service()))
+
+
+providers = ProviderRegistry()
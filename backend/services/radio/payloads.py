@@ -1,9 +1,11 @@
+from database.repositories.playback.playback_sessions import load_session_queue
 from database.repositories.playback.stream_sources import get_stream_source
+from services.playable_source_service import playable_source_service
 from services.stream_resolver import stream_resolver
 
 
 def _build_response_payload(self, session):
-    queue = session.get("queue_payload") or []
+    queue = load_session_queue(session)
     current_index = session.get("current_index", 0)
     current_track = queue[current_index] if 0 <= current_index < len(queue) else None
     stream_health = None
@@ -14,6 +16,7 @@ def _build_response_payload(self, session):
         "mode": session.get("mode"),
         "status": session.get("status"),
         "current_index": current_index,
+        "queue_version": session.get("queue_version"),
         "current_track": current_track,
         "queue": queue,
         "queue_summary": self._build_queue_summary(queue, current_index),
@@ -38,7 +41,7 @@ def _build_stream_health_payload(self, stream_source_id=None, track=None):
         return None
     if track.get("playback_type") == "local":
         return {"status": "local", "can_use_cached": True, "should_attempt_resolution": False}
-    return stream_resolver.get_stream_source_health(track.get("artist"), track.get("title"), album=track.get("album"))
+    return playable_source_service.get_stream_health(track.get("artist"), track.get("title"), album=track.get("album"))
 
 
 def _build_queue_summary(self, queue, current_index):
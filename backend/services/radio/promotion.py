@@ -39,6 +39,9 @@ def _maybe_promote(self, username, payload):
 
 def _queue_download_promotion(self, artist, title, album, payload):
     query = f"{artist} - {title}"
+    stream_source_id = payload.get("stream_source_id")
+    source = get_stream_source(stream_source_id) if stream_source_id else None
+    # The resolver already picked a source for this stream; download that instead of searching again.
     result = download_coordinator.queue(
         downloader_service,
         query=query,
@@ -46,29 +49,29 @@ def _queue_download_promotion(self, artist, title, album, payload):
         title=title,
         album=album,
         image_url=payload.get("image"),
+        priority_class="radio_promotion",
+        source_url=(source or {}).get("source_url"),
+        cache_key=(source or {}).get("cache_key") or payload.get("cache_key"),
     )
-    stream_source_id = payload.get("stream_source_id")
-    if stream_source_id:
-        source = get_stream_source(stream_source_id)
-        if source:
-            upsert_stream_source(
-                track_id=source.get("track_id"),
-                artist=source["artist"],
-                title=source["title"],
-                album=source.get("album"),
-                source_name=source["source_name"],
-                source_url=source.get("source_url"),
-                playable_url=source.get("playable_url"),
-                playback_type=source["playback_type"],
-                resolver_payload=source.get("resolver_payload"),
-                expires_at=source.get("expires_at"),
-                last_verified_at=source.get("last_verified_at"),
-                health_status=source.get("health_status", "healthy"),
-                failure_count=source.get("failure_count", 0),
-                last_error=source.get("last_error"),
-                promoted_to_download=True,
-                cache_key=source["cache_key"],
-            )
+    if source:
+        upsert_stream_source(
+            track_id=source.get("track_id"),
+            artist=source["artist"],
+            title=source["title"],
+            album=source.get("album"),
+            source_name=source["source_name"],
+            source_url=source.get("source_url"),
+            playable_url=source.get("playable_url"),
+            playback_type=source["playback_type"],
+            resolver_payload=source.get("resolver_payload"),
+            expires_at=source.get("expires_at"),
+            last_verified_at=source.get("last_verified_at"),
+            health_status=source.get("health_status", "healthy"),
+            failure_count=source.get("failure_count", 0),
+            last_error=source.get("last_error"),
+            promoted_to_download=True,
+            cache_key=source["cache_key"],
+        )
     manager.broadcast_sync(
         {
             "type": "playback.session",
@@ -1,8 +1,24 @@
-from database.repositories.playback.playback_sessions import get_playback_session, replace_queue_segment, update_playback_session
-from database.repositories.playback.queue_ops import clear_upcoming_queue_items, insert_queue_items, remove_queue_item, reorder_queue_items
+from database.repositories.playback.playback_sessions import (
+    get_playback_session,
+    get_queue_window,
+    update_playback_session,
+)
+from database.repositories.playback.queue_ops import (
+    append_queue_items,
+    clear_upcoming_queue_items,
+    insert_queue_items,
+    remove_queue_item,
+    reorder_queue_items,
+)
+from services.stream_prefetcher import stream_prefetcher
 
 
-def insert_manual_items(self, session_id, items, placement="end"):
+def _version_or(session, expected_version):
+    # Edits computed from this read must not land on a queue that changed since.
+    return expected_version if expected_version is not None else session.get("queue_version")
+
+
+def insert_manual_items(self, session_id, items, placement="end", expected_version=None):
     session = get_playback_session(session_id)
     if not session:
         return None
@@ -28,13 +44,13 @@ def insert_manual_items(self, session_id, items, placement="end"):
         suspended_queue = queue[current_index + 1 :]
         suspended_mode = "radio" if suspended_queue else None
         queue = queue[: current_index + 1]
-    updated = insert_queue_items(session_id, insert_at, normalized_items)
+    updated = insert_queue_items(session_id, insert_at, normalized_items, expected_version=_version_or(session, expected_version))
     if suspended_queue is not None:
         updated = update_playback_session(
             session_id,
-            queue_payload=updated.get("queue_payload"),
             suspended_queue_payload=suspended_queue,
             suspended_mode=suspended_mode,
+            with_queue=False,
         )
     self._broadcast_session(
         updated,
@@ -46,24 +62,24 @@ def insert_manual_items(self, session_id, items, placement="end"):
             }
         },
     )
+    stream_prefetcher.schedule(updated)
     return updated
 
 
-def remove_item(self, session_id, track_key):
-    session = get_playback_session(session_id)
+def remove_item(self, session_id, track_key, expected_version=None):
+    session = get_playback_session(session_id, with_queue=False)
     if not session:
         return None
-    queue = list(session.get("queue_payload") or [])
-    current_index = session.get("current_index", 0)
-    current_track = queue[current_index] if current_index < len(queue) else None
+    current_track = next(iter(get_queue_window(session_id, session.get("current_index", 0), 1)), None)
     if current_track and current_track.get("track_key") == track_key:
         raise ValueError("Current item must be skipped, not removed")
-    updated = remove_queue_item(session_id, track_key)
+    updated = remove_queue_item(session_id, track_key, expected_version=expected_version)
     self._broadcast_session(updated, extra={"queue_change": {"action": "removed", "track_keys": [track_key], "count": 1}})
+    stream_prefetcher.schedule(updated)
     return updated
 
 
-def reorder_items(self, session_id, ordered_track_keys):
+def reorder_items(self, session_id, ordered_track_keys, expected_version=None):
     session = get_playback_session(session_id)
     if not session:
         return None
@@ -73,37 +89,34 @@ def reorder_items(self, session_id, ordered_track_keys):
     upcoming_keys = [item.get("track_key") for item in upcoming]
     if sorted(upcoming_keys) != sorted(ordered_track_keys):
         raise ValueError("ordered_track_keys must match the upcoming queue exactly")
-    updated = reorder_queue_items(session_id, ordered_track_keys)
+    updated = reorder_queue_items(session_id, ordered_track_keys, expected_version=_version_or(session, expected_version))
     self._broadcast_session(
         updated,
         extra={"queue_change": {"action": "reordered", "track_keys": ordered_track_keys, "count": len(ordered_track_keys)}},
     )
+    stream_prefetcher.schedule(updated)
     return updated
 
 
-def clear_upcoming(self, session_id):
-    updated = clear_upcoming_queue_items(session_id)
+def clear_upcoming(self, session_id, expected_version=None):
+    updated = clear_upcoming_queue_items(session_id, expected_version=expected_version)
     if updated and updated.get("suspended_mode") == "radio":
-        updated = update_playback_session(session_id, suspended_queue_payload=None, suspended_mode=None)
+        updated = update_playback_session(session_id, suspended_queue_payload=None, suspended_mode=None, with_queue=False)
     self._broadcast_session(updated, extra={"queue_change": {"action": "cleared", "track_keys": [], "count": 0}})
+    if updated:
+        stream_prefetcher.cancel(updated["id"])
     return updated
 
 
 def resume_suspended_queue_if_needed(self, session):
     if not session:
         return None
-    queue = list(session.get("queue_payload") or [])
     current_index = session.get("current_index", 0)
     suspended = list(session.get("suspended_queue_payload") or [])
-    if current_index < len(queue) - 1 or not suspended:
+    if current_index < session["queue_length"] - 1 or not suspended:
         return session
-    updated = replace_queue_segment(
-        session["id"],
-        queue_payload=queue + suspended,
-        current_index=current_index,
-        suspended_queue_payload=None,
-        suspended_mode=None,
-    )
+    append_queue_items(session["id"], suspended)
+    updated = update_playback_session(session["id"], suspended_queue_payload=None, suspended_mode=None, with_queue=False)
     self._broadcast_session(
         updated,
         extra={
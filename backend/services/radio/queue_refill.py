@@ -1,6 +1,17 @@
-from database.repositories.playback.playback_sessions import finish_playback_session, get_playback_session, update_playback_session
+from database.repositories.playback.playback_sessions import (
+    finish_playback_session,
+    get_playback_session,
+    get_queue_window,
+    load_session_queue,
+)
+from database.repositories.playback.queue_ops import advance_queue, append_queue_items
 from services.playable_source_service import playable_source_service
 from services.recommendation_index_service import recommendation_index_service
+from services.stream_prefetcher import stream_prefetcher
+
+# Upcoming items read per lookup while searching for the next playable track; the
+# full queue is only loaded to refill a radio session or to render the result.
+NEXT_TRACK_WINDOW = 10
 
 
 def next_track(self, session_id, reason="next"):
@@ -8,31 +19,37 @@ def next_track(self, session_id, reason="next"):
 
 
 def next_playable_track(self, session_id, reason="next"):
-    session = get_playback_session(session_id)
+    session = get_playback_session(session_id, with_queue=False)
     if not session or session.get("status") == "finished":
         return None, None, None, []
 
     session = self.resume_suspended_queue_if_needed(session)
-    queue = list(session.get("queue_payload") or [])
     search_index = session.get("current_index", 0) + 1
+    window, window_start = [], search_index
     skipped_tracks = []
 
     while True:
-        if session.get("mode") == "radio" and len(queue) - search_index <= self.refill_threshold:
-            session, queue, refill_added = self._refill_radio_queue(session, queue)
+        if session.get("mode") == "radio" and session["queue_length"] - search_index <= self.refill_threshold:
+            session, refill_added = self._refill_radio_queue(session)
             if refill_added:
                 self._broadcast_session(session, extra={"queue_change": {"action": "refilled", "track_keys": [], "count": refill_added}})
 
-        if search_index >= len(queue):
+        if search_index - window_start >= len(window):
+            window_start = search_index
+            window = get_queue_window(session_id, search_index, NEXT_TRACK_WINDOW) if search_index < session["queue_length"] else []
+
+        if not window:
             if session.get("suspended_mode") == "radio" and session.get("suspended_queue_payload"):
-                session = self.resume_suspended_queue_if_needed(session)
-                queue = list(session.get("queue_payload") or [])
-                continue
-            finished = finish_playback_session(session_id)
+                resumed = self.resume_suspended_queue_if_needed(session)
+                if resumed is not session:
+                    session = resumed
+                    continue
+            finished = finish_playback_session(session_id, with_queue=False)
+            stream_prefetcher.cancel(session_id, finished=True)
             self._broadcast_session(finished, extra={"event": {"type": "finished"}})
             return finished, None, None, skipped_tracks
 
-        candidate = queue[search_index]
+        candidate = window[search_index - window_start]
         playable = playable_source_service.resolve(
             candidate["artist"],
             candidate["title"],
@@ -40,9 +57,10 @@ def next_playable_track(self, session_id, reason="next"):
             preview_url=candidate.get("preview_url"),
         )
         if playable:
-            session = update_playback_session(session_id, current_index=search_index, queue_payload=queue)
+            session = advance_queue(session_id, search_index)
             session = self.resume_suspended_queue_if_needed(session)
             self._broadcast_session(session)
+            stream_prefetcher.schedule(session)
             return session, candidate, playable, skipped_tracks
 
         skipped_tracks.append(candidate)
@@ -50,31 +68,31 @@ def next_playable_track(self, session_id, reason="next"):
 
 
 def ensure_refill(self, session_id):
-    session = get_playback_session(session_id)
+    session = get_playback_session(session_id, with_queue=False)
     if not session or session.get("mode") != "radio":
         return session
-    queue = list(session.get("queue_payload") or [])
-    if len(queue) - session.get("current_index", 0) <= self.refill_threshold:
-        session, _, refill_added = self._refill_radio_queue(session, queue)
+    if session["queue_length"] - session.get("current_index", 0) <= self.refill_threshold:
+        session, refill_added = self._refill_radio_queue(session)
         if refill_added:
             self._broadcast_session(session, extra={"queue_change": {"action": "refilled", "track_keys": [], "count": refill_added}})
+            stream_prefetcher.schedule(session)
     return session
 
 
-def _refill_radio_queue(self, session, queue):
+def _refill_radio_queue(self, session):
     if session.get("mode") != "radio":
-        return session, queue, 0
+        return session, 0
+    queue = load_session_queue(session)
     seed_track = queue[0] if queue else session.get("seed_payload") or {}
     refill = recommendation_index_service.build_radio_candidates(seed_track, session_tracks=queue, limit=self.batch_size)
     existing_keys = {item.get("track_key") for item in queue}
-    added = 0
+    additions = []
     for track in refill:
         normalized = self._normalize_track(track, "radio")
         if normalized.get("track_key") in existing_keys:
             continue
-        queue.append(normalized)
+        additions.append(normalized)
         existing_keys.add(normalized.get("track_key"))
-        added += 1
-    if added:
-        session = update_playback_session(session["id"], queue_payload=queue)
-    return session, queue, added
+    if additions:
+        session = append_queue_items(session["id"], additions)
+    return session, len(additions)
@@ -7,6 +7,7 @@ from database.repositories.playback.playback_sessions import (
     get_playback_session,
 )
 from services.recommendation_index_service import recommendation_index_service
+from services.stream_prefetcher import stream_prefetcher
 from services.stream_resolver import build_track_key
 
 
@@ -28,6 +29,7 @@ def start_manual_session(self, username, track, queue_items, start_index=0, repl
         queue_payload=queue,
     )
     self._broadcast_session(session, extra={"event": {"type": "start_manual"}})
+    stream_prefetcher.schedule(session)
     return session
 
 
@@ -58,6 +60,7 @@ def start_radio_session(self, username, seed_track, seed_type="recommendation",
         queue_payload=queue,
     )
     self._broadcast_session(session, extra={"event": {"type": "start_radio"}})
+    stream_prefetcher.schedule(session)
     return session
 
 
@@ -75,10 +78,11 @@ def get_or_create_active_session(self, username, preferred_mode="manual"):
 
 
 def _finish_existing_sessions(self, username):
-    existing = get_active_playback_session(username)
+    existing = get_active_playback_session(username, with_queue=False)
     while existing:
-        finish_playback_session(existing["id"])
-        existing = get_active_playback_session(username)
+        finish_playback_session(existing["id"], with_queue=False)
+        stream_prefetcher.cancel(existing["id"], finished=True)
+        existing = get_active_playback_session(username, with_queue=False)
 
 
 def _normalize_track(self, track, queue_source):
@@ -2,28 +2,57 @@ from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 import logging
 import os
+import threading
+import time
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
 
 from database import (
-    get_downloads,
     get_feedback_map,
     get_dismissed_tracks,
+    get_recommendation_index_state,
     get_setting,
     get_top_artists_from_db,
     get_top_tracks_from_db,
+    library_index,
     list_enriched_tracks,
+    list_recommendation_candidates,
     list_releases,
-    get_stream_failure_counts,
+    get_stream_failure_counts_for_tracks,
+    save_recommendation_index_state,
+    update_recommendation_candidates,
 )
-from services.lastfm import LastFMService
+from services.provider_registry import providers
 from services.playable_source_service import playable_source_service
 from services.stream_resolver import build_track_key
 
 logger = logging.getLogger(__name__)
 
+SIMILAR_ARTIST_SOURCE = "similar_artist"
+# Candidate sources built from local tables; cheap enough to rebuild on every refresh.
+LOCAL_SOURCE_TYPES = ("top_track_memory", "enriched_library", "release_radar")
+FEEDBACK_WEIGHTS = {"liked": 18, "saved_for_later": 12, "already_know": -10, "not_my_taste": -25}
+
 
 class RecommendationIndexService:
+    """
+    Recommendations are served from a precomputed candidate pool.
+
+    ``refresh_index`` does the expensive Last.fm fan-out (similar artists, their tags
+    and top tracks) and stores the pool in ``recommendation_candidates``; it runs on a
+    schedule and incrementally after scrobble syncs, only fetching seeds that are new
+    to the user's top artists. ``build_recommendations`` reads the pool and applies the
+    per-user filters and scoring, so requests never wait on the network once an index
+    exists.
+    """
+
     def __init__(self):
-        self.lastfm = LastFMService()
+        self.lastfm = providers.lastfm_service()
+        self._refresh_lock = threading.Lock()
+        self._last_timings = {}
 
     def get_user(self):
         return get_setting("LASTFM_USER") or os.getenv("LASTFM_USER")
@@ -33,25 +62,45 @@ class RecommendationIndexService:
         if not user:
             return []
 
-        downloaded = self._get_downloaded_map()
+        state = get_recommendation_index_state(user)
+        if not state:
+            # First request before the scheduled build: build once inline.
+            self.refresh_index(user, full=True)
+            state = get_recommendation_index_state(user)
+        recent_top_artists = (state or {}).get("seed_artists") or []
+
+        timings = {}
+        started = time.monotonic()
         dismissed = get_dismissed_tracks(user)
         feedback = get_feedback_map(user)
-        recent_top_artists = self._recent_top_artists(user)
-        recent_top_tracks = self._recent_top_tracks(user)
 
-        candidates = {}
-        for item in self._candidate_pool(recent_top_artists, recent_top_tracks):
+        items = list_recommendation_candidates(user)
+        pool = []
+        for item, downloaded in zip(items, library_index.contains_many((item["artist"], item["title"]) for item in items)):
             key = (item["artist"].lower(), item["title"].lower())
-            if key in dismissed or key in downloaded["tracks"]:
+            if key in dismissed or downloaded:
                 continue
             if "dismissed" in feedback.get(key, set()) or "not_my_taste" in feedback.get(key, set()):
                 continue
-            scored = self._score_candidate(item, key, recent_top_artists, feedback, downloaded)
-            if not scored:
-                continue
+            pool.append((item, key))
+        timings["load_ms"] = self._elapsed_ms(started)
+
+        stage = time.monotonic()
+        playable_states = playable_source_service.get_playable_states([item for item, _ in pool])
+        failure_counts = get_stream_failure_counts_for_tracks((item["artist"], item["title"]) for item, _ in pool)
+        timings["lookup_ms"] = self._elapsed_ms(stage)
+
+        stage = time.monotonic()
+        scored = self._score_candidates(pool, recent_top_artists, feedback, playable_states, failure_counts)
+        candidates = {}
+        for item, key in scored:
             existing = candidates.get(key)
-            if not existing or scored["score"] > existing["score"]:
-                candidates[key] = scored
+            if not existing or item["score"] > existing["score"]:
+                candidates[key] = item
+        timings["score_ms"] = self._elapsed_ms(stage)
+        timings["total_ms"] = self._elapsed_ms(started)
+        timings["candidates"] = len(pool)
+        self._last_timings = timings
 
         result = list(candidates.values())
         result.sort(key=lambda item: item["score"], reverse=True)
@@ -93,10 +142,53 @@ class RecommendationIndexService:
             return top_from_db
         return self.lastfm.get_top_tracks(user, period="1month", limit=10)
 
-    def _candidate_pool(self, recent_top_artists, recent_top_tracks):
+    def refresh_index(self, user=None, full=False):
+        """
+        Rebuild the user's candidate pool. Incremental refreshes fetch similar artists
+        only for seeds that joined the top artists and drop rows for seeds that left;
+        ``full`` re-fetches every seed. Returns a summary, or None if no user is set or
+        another refresh is running.
+        """
+        user = user or self.get_user()
+        if not user:
+            return None
+        if not self._refresh_lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.monotonic()
+            state = None if full else get_recommendation_index_state(user)
+            recent_top_artists = self._recent_top_artists(user)
+            recent_top_tracks = self._recent_top_tracks(user)
+            seeds = [artist["name"] for artist in recent_top_artists[:10]]
+            if state:
+                previous = {artist["name"] for artist in state["seed_artists"][:10]}
+                added = [name for name in seeds if name not in previous]
+                dropped = [name for name in previous if name not in seeds]
+                replace_types = LOCAL_SOURCE_TYPES
+            else:
+                added, dropped = seeds, []
+                replace_types = (SIMILAR_ARTIST_SOURCE,) + LOCAL_SOURCE_TYPES
+
+            candidates = self._similar_artist_candidates(added) + self._local_candidates(recent_top_tracks)
+            total = update_recommendation_candidates(user, candidates, replace_types=replace_types, drop_seeds=dropped)
+            duration_ms = int((time.monotonic() - started) * 1000)
+            seed_artists = [
+                {"name": artist["name"], "playcount": int(artist.get("playcount") or 1)} for artist in recent_top_artists
+            ]
+            save_recommendation_index_state(user, seed_artists, total, duration_ms)
+            return {
+                "mode": "incremental" if state else "full",
+                "added_seeds": added,
+                "dropped_seeds": dropped,
+                "candidates": total,
+                "duration_ms": duration_ms,
+            }
+        finally:
+            self._refresh_lock.release()
+
+    def _similar_artist_candidates(self, seed_artists):
         pool = []
-        for artist in recent_top_artists[:10]:
-            source_artist = artist["name"]
+        for source_artist in seed_artists:
             similar = self.lastfm.get_similar_artists(source_artist, limit=5)
             for similar_artist in similar:
                 tags = self.lastfm.get_artist_tags(similar_artist["name"])[:3]
@@ -112,10 +204,14 @@ class RecommendationIndexService:
                             "tags": tags,
                             "reason": f"Because you love {source_artist}",
                             "base_similarity_score": 45,
-                            "source_type": "similar_artist",
+                            "source_type": SIMILAR_ARTIST_SOURCE,
+                            "source_artist": source_artist,
                         }
                     )
+        return pool
 
+    def _local_candidates(self, recent_top_tracks):
+        pool = []
         for track in recent_top_tracks[:6]:
             pool.append(
                 {
@@ -166,63 +262,71 @@ class RecommendationIndexService:
 
         return pool
 
-    def _score_candidate(self, item, key, recent_top_artists, feedback, downloaded):
-        score = float(item.get("base_similarity_score", 0))
+    def _score_candidates(self, pool, recent_top_artists, feedback, playable_states, failure_counts):
+        """
+        Score every ``(item, key)`` in ``pool`` in one pass. Per-item lookups are done
+        once into column lists; the weighted sum runs over them as arrays (NumPy when
+        installed, plain Python otherwise). Returns ``(item, key)`` pairs with the
+        score and playback fields set on each item.
+        """
         recent_artist_names = {artist["name"].lower(): artist.get("playcount", 1) for artist in recent_top_artists}
-        artist_key = item["artist"].lower()
-
-        if artist_key in recent_artist_names:
-            score += min(20, recent_artist_names[artist_key])
-        if item.get("tags"):
-            score += min(6, len(item["tags"]) * 2)
-        if key not in downloaded["tracks"]:
-            score += 8
-        if artist_key in downloaded["artists"]:
-            score += 6
-
-        actions = feedback.get(key, set())
-        if "liked" in actions:
-            score += 18
-        if "saved_for_later" in actions:
-            score += 12
-        if "already_know" in actions:
-            score -= 10
-        if "not_my_taste" in actions:
-            score -= 25
-
-        failure_penalty = get_stream_failure_counts(item["artist"], item["title"])
-        score -= failure_penalty * 6
-
-        playable_state, is_streamable = playable_source_service.get_playable_state(
-            item["artist"],
-            item["title"],
-            album=item.get("album"),
-            preview_url=item.get("preview_url"),
-        )
-        item["track_key"] = build_track_key(item["artist"], item["title"], item.get("album"))
-        item["playable_state"] = playable_state
-        item["is_streamable"] = is_streamable
-        item["recommended_because"] = item.get("reason")
-        item["available_actions"] = ["download", "add_to_playlist", "dismiss", "save"]
-        if is_streamable:
-            item["available_actions"].insert(1, "play")
-        item["generated_at"] = datetime.now().astimezone().isoformat()
-        item["score"] = round(score, 2)
-        return item
-
-    def _get_downloaded_map(self):
-        rows = get_downloads(page=1, limit=100000, status="completed")
-        downloaded = set()
-        artists = set()
-        for row in rows:
-            key = ((row.get("artist") or "").lower(), (row.get("title") or "").lower())
-            downloaded.add(key)
-            artists.add((row.get("artist") or "").lower())
-        return {"tracks": downloaded, "artists": artists}
+        columns = {name: [] for name in ("base", "recent", "tags", "fresh", "known_artist", "feedback", "failures")}
+        columns["fresh"] = [not downloaded for downloaded in library_index.contains_many(key for _, key in pool)]
+        for item, key in pool:
+            artist_key = item["artist"].lower()
+            columns["base"].append(float(item.get("base_similarity_score", 0)))
+            columns["recent"].append(recent_artist_names.get(artist_key, 0))
+            columns["tags"].append(len(item.get("tags") or []))
+            columns["known_artist"].append(library_index.has_artist(artist_key))
+            columns["feedback"].append(sum(FEEDBACK_WEIGHTS.get(action, 0) for action in feedback.get(key, ())))
+            columns["failures"].append(failure_counts.get((item["artist"], item["title"]), 0))
+
+        scores = _combine_scores(columns)
+        generated_at = datetime.now().astimezone().isoformat()
+        scored = []
+        for (item, key), score, (playable_state, is_streamable) in zip(pool, scores, playable_states):
+            item["track_key"] = build_track_key(item["artist"], item["title"], item.get("album"))
+            item["playable_state"] = playable_state
+            item["is_streamable"] = is_streamable
+            item["recommended_because"] = item.get("reason")
+            item["available_actions"] = ["download", "add_to_playlist", "dismiss", "save"]
+            if is_streamable:
+                item["available_actions"].insert(1, "play")
+            item["generated_at"] = generated_at
+            item["score"] = round(score, 2)
+            scored.append((item, key))
+        return scored
+
+    def get_stats(self):
+        return {"vectorized": np is not None, "last_build": dict(self._last_timings)}
+
+    def _elapsed_ms(self, started):
+        return round((time.monotonic() - started) * 1000, 2)
 
     def _recent_start_ts(self, days):
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
         return int(cutoff.timestamp())
 
 
+def _combine_scores(columns):
+    if np is not None:
+        col = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        total = (
+            col["base"]
+            + np.minimum(col["recent"], 20)
+            + np.minimum(col["tags"] * 2, 6)
+            + col["fresh"] * 8
+            + col["known_artist"] * 6
+            + col["feedback"]
+            - col["failures"] * 6
+        )
+        return total.tolist()
+    return [
+        base + min(recent, 20) + min(tags * 2, 6) + fresh * 8 + known_artist * 6 + feedback - failures * 6
+        for base, recent, tags, fresh, known_artist, feedback, failures in zip(
+            *(columns[name] for name in ("base", "recent", "tags", "fresh", "known_artist", "feedback", "failures"))
+        )
+    ]
+
+
 recommendation_index_service = RecommendationIndexService()
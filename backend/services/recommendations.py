@@ -4,8 +4,7 @@ import logging
 import os
 
 from database import add_feedback, get_setting
-from .lastfm import LastFMService
-from .cache_manager import CacheManager
+from .provider_registry import providers
 from .recommendation_index_service import recommendation_index_service
 
 logger = logging.getLogger(__name__)
@@ -13,8 +12,8 @@ logger = logging.getLogger(__name__)
 
 class RecommendationsService:
     def __init__(self):
-        self.lastfm = LastFMService()
-        self.cache = CacheManager(ttl=3600)
+        self.lastfm = providers.lastfm_service()
+        self.cache = providers.cache("recommendations", ttl=3600)
 
     def _get_user(self):
         return get_setting("LASTFM_USER") or os.getenv("LASTFM_USER")
@@ -34,9 +33,7 @@ class RecommendationsService:
         return True
 
     def _get_forgotten_gems(self, user: str, limit: int = 6):
-        from .analytics import AnalyticsService
-
-        analytics = AnalyticsService(self.lastfm)
+        analytics = providers.analytics_service()
         return analytics.get_forgotten_gems(user)[:limit]
 
     def get_artist_radar(self, limit: int = 12):
@@ -101,9 +98,7 @@ class RecommendationsService:
         if cached:
             return cached
 
-        from .analytics import AnalyticsService
-
-        analytics = AnalyticsService(self.lastfm)
+        analytics = providers.analytics_service()
         genre_data = analytics.get_genre_breakdown(user, period="1month")
         top_tags = [g["name"] for g in genre_data[:limit_moods]]
         if not top_tags:
@@ -137,10 +132,8 @@ class RecommendationsService:
             return cached
 
         try:
-            from .api_client import LastFMApiClient
-            from .image_provider import ImageProvider
-
-            client = LastFMApiClient()
+            client = providers.lastfm_client()
+            image_provider = providers.image_provider()
             data = client.request(
                 "GET",
                 {
@@ -154,22 +147,24 @@ class RecommendationsService:
                 raw = data["tracks"]["track"]
                 if isinstance(raw, dict):
                     raw = [raw]
+                entries = []
                 for t in raw:
                     artist_obj = t.get("artist", {})
                     artist = artist_obj.get("name") if isinstance(artist_obj, dict) else artist_obj
                     title = t.get("name")
-                    lastfm_imgs = t.get("image", [])
-                    img = ImageProvider().get_image(lastfm_imgs, artist, title)
                     if artist and title:
-                        tracks.append(
-                            {
-                                "artist": artist,
-                                "title": title,
-                                "image": img,
-                                "query": f"{artist} {title}",
-                                "tags": [tag],
-                            }
-                        )
+                        entries.append((t.get("image", []), artist, title))
+                images = image_provider.get_images(entries)
+                for (_, artist, title), img in zip(entries, images):
+                    tracks.append(
+                        {
+                            "artist": artist,
+                            "title": title,
+                            "image": img,
+                            "query": f"{artist} {title}",
+                            "tags": [tag],
+                        }
+                    )
         except Exception as e:
             logger.error(f"Error fetching tag tracks for {tag}: {e}")
             tracks = []
@@ -188,9 +183,7 @@ class RecommendationsService:
             return cached
 
         from datetime import datetime, timedelta
-        from .api_client import LastFMApiClient
-
-        client = LastFMApiClient()
+        client = providers.lastfm_client()
         now = datetime.now()
         week_start = now - timedelta(days=now.weekday())
         week_end = week_start + timedelta(days=6)
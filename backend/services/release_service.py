@@ -4,9 +4,9 @@ from core import lastfm_service
 from database import (
     create_job,
     get_favorite_artists,
-    get_downloads,
     get_setting,
     get_top_artists_from_db,
+    library_index,
     list_release_watch_artists,
     list_releases,
     mark_job_failed,
@@ -16,23 +16,20 @@ from database import (
     upsert_artist_release,
     upsert_release_watch_artist,
 )
-from services.external_client import ExternalAPIClient
+from services.provider_registry import providers
+from services.event_bus import JOB_STATUS, event_bus
 
 
 class ReleaseService:
     def __init__(self):
-        self.musicbrainz = ExternalAPIClient(
-            "musicbrainz",
-            base_url="https://musicbrainz.org/ws/2/",
-            timeout=10,
-            retries=2,
-            min_interval=1.1,
-        )
+        # Shared client: MusicBrainz allows ~1 request/second per application.
+        self.musicbrainz = providers.external_client("musicbrainz")
 
     def refresh(self):
         user = get_setting("LASTFM_USER")
         job_id = create_job("release_refresh", "releases", "queued", payload={"user": user})
         mark_job_running(job_id)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "running"})
         try:
             watched = self._build_watchlist(user)
             count = 0
@@ -51,17 +48,17 @@ class ReleaseService:
                     count += 1
             set_feature_refresh_state("releases")
             mark_job_succeeded(job_id, {"releases_found": count, "watched_artists": len(watched)})
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "succeeded"})
             return {"status": "succeeded", "job_id": job_id, "releases_found": count}
         except Exception as exc:
             mark_job_failed(job_id, str(exc))
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
             return {"status": "failed", "job_id": job_id, "error": str(exc)}
 
     def get_releases(self, limit=60):
         releases = list_releases(limit=limit)
-        downloads = get_downloads(page=1, limit=100000, status="completed")
-        downloaded_artists = {str(item.get("artist") or "").lower() for item in downloads}
         for item in releases:
-            if item.get("artist", "").lower() in downloaded_artists:
+            if library_index.has_artist(item.get("artist")):
                 item["downloaded"] = 1
         return releases
 
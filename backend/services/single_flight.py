@@ -0,0 +1,73 @@
+import threading
+
+# Every SingleFlight group registers here so their counters can be reported together.
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight_stats():
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical calls into one.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is cached once the
+    call completes: that is the job of the caches in front of it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executed": 0, "collapsed": 0, "errors": 0}
+        with _groups_lock:
+            _groups[name] = self
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executed"] += 1
+            else:
+                self._stats["collapsed"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
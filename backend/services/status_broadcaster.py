@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import threading
+
+from database import get_job_summary
+from services.event_bus import CLIENT_CONNECTED, DOWNLOADS_CHANGED, JOB_STATUS, event_bus
+from services.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class StatusBroadcaster:
+    """
+    Pushes job summary / active download updates to websocket clients.
+
+    Job and download transitions arrive on the event bus; the broadcaster only marks
+    what is stale and wakes up. Bursts are coalesced into at most
+    ``max_messages_per_second`` messages, each carrying only the keys whose value
+    changed since the last send. With no clients connected, or nothing stale, it does
+    no database work at all.
+    """
+
+    def __init__(self, max_messages_per_second=4):
+        self.max_messages_per_second = max_messages_per_second
+        self._lock = threading.Lock()
+        self._summary_stale = True
+        self._downloads_stale = True
+        self._full_snapshot = True
+        self._last_sent = {}
+        self._wake = None
+        self._loop = None
+        self.stats = {"events": 0, "messages": 0, "summary_queries": 0}
+
+    def _on_event(self, topic, payload):
+        with self._lock:
+            self.stats["events"] += 1
+            if topic == JOB_STATUS:
+                self._summary_stale = True
+            elif topic == DOWNLOADS_CHANGED:
+                self._downloads_stale = True
+            elif topic == CLIENT_CONNECTED:
+                self._full_snapshot = True
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass
+
+    def _take_pending(self):
+        with self._lock:
+            pending = (self._summary_stale, self._downloads_stale, self._full_snapshot)
+            self._summary_stale = self._downloads_stale = self._full_snapshot = False
+        return pending
+
+    async def _build_message(self, get_active_downloads):
+        summary_stale, downloads_stale, full_snapshot = self._take_pending()
+        if full_snapshot:
+            self._last_sent = {}
+            summary_stale = downloads_stale = True
+
+        current = {}
+        if summary_stale:
+            # The summary is a jobs table aggregate; keep it off the event loop.
+            current["summary"] = await asyncio.to_thread(get_job_summary)
+            self.stats["summary_queries"] += 1
+        if downloads_stale:
+            current["active_downloads"] = get_active_downloads()
+
+        changed = {key: value for key, value in current.items() if self._last_sent.get(key) != value}
+        if not changed:
+            return None
+        self._last_sent.update(changed)
+        return {"type": "job.summary", **changed}
+
+    async def run(self, get_active_downloads):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        unsubscribe = event_bus.subscribe(self._on_event, topics={JOB_STATUS, DOWNLOADS_CHANGED, CLIENT_CONNECTED})
+        interval = 1.0 / max(self.max_messages_per_second, 1)
+        try:
+            while True:
+                await self._wake.wait()
+                self._wake.clear()
+                if not manager.active_connections:
+                    # Nobody to tell; the next client connection triggers a full snapshot.
+                    self._take_pending()
+                    continue
+                try:
+                    message = await self._build_message(get_active_downloads)
+                    if message:
+                        await manager.broadcast(message)
+                        self.stats["messages"] += 1
+                except Exception as e:
+                    logger.error(f"Error in status broadcaster: {e}")
+                # Events arriving during this pause are folded into the next message.
+                await asyncio.sleep(interval)
+        finally:
+            unsubscribe()
+            self._loop = None
+
+
+status_broadcaster = StatusBroadcaster()
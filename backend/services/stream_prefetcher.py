@@ -0,0 +1,161 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from database import get_queue_window, get_setting
+from services.playable_source_service import playable_source_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKAHEAD = 3
+DEFAULT_WORKERS = 2
+
+
+def _int_setting(key, default):
+    try:
+        return int(get_setting(key) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class StreamPrefetcher:
+    """
+    Resolves the next few queue items in the background so track boundaries hit a warm
+    ``stream_sources`` row instead of a cold yt-dlp extraction.
+
+    Every schedule bumps the session's generation; queued work from an older generation
+    is dropped before it starts, so reorders, removals and replacements cancel stale
+    lookahead. Each session has at most ``STREAM_PREFETCH_LOOKAHEAD`` resolutions
+    running, and the pool is shared (``STREAM_PREFETCH_WORKERS``) so one busy session
+    cannot monopolise extraction.
+    """
+
+    def __init__(self, lookahead=None, workers=None):
+        self._lookahead = lookahead
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._in_flight = {}
+        self._finished = set()
+        self.stats = {"scheduled": 0, "resolved": 0, "warm": 0, "unavailable": 0, "cancelled": 0, "over_budget": 0, "errors": 0}
+
+    @property
+    def lookahead(self):
+        return self._lookahead if self._lookahead is not None else _int_setting("STREAM_PREFETCH_LOOKAHEAD", DEFAULT_LOOKAHEAD)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                workers = self._workers or _int_setting("STREAM_PREFETCH_WORKERS", DEFAULT_WORKERS)
+                self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="stream-prefetch")
+            return self._executor
+
+    def schedule(self, session):
+        """Queue resolution of the items after the session's current index; returns how many were queued."""
+        if not session or session.get("status") == "finished":
+            return 0
+        lookahead = self.lookahead
+        if lookahead <= 0 or not playable_source_service.is_streaming_enabled():
+            return 0
+        session_id = session["id"]
+        start = session.get("current_index", 0) + 1
+        if "queue_payload" in session:
+            window = session["queue_payload"][start:start + lookahead]
+        else:
+            window = get_queue_window(session_id, start, lookahead)
+        upcoming = []
+        seen = set()
+        for item in window:
+            key = item.get("track_key")
+            if key in seen or not item.get("artist") or not item.get("title"):
+                continue
+            seen.add(key)
+            upcoming.append(item)
+
+        with self._lock:
+            generation = self._generations.get(session_id, 0) + 1
+            self._generations[session_id] = generation
+            # {track_key: (generation, started)}; work that has not started yet is
+            # superseded by this generation, so only running resolutions use the budget.
+            in_flight = self._in_flight.setdefault(session_id, {})
+            running = {key for key, (_, started) in in_flight.items() if started}
+            todo = [item for item in upcoming if item.get("track_key") not in running]
+            room = max(0, lookahead - len(running))
+            if len(todo) > room:
+                self.stats["over_budget"] += len(todo) - room
+                todo = todo[:room]
+            for item in todo:
+                in_flight[item.get("track_key")] = (generation, False)
+            self.stats["scheduled"] += len(todo)
+
+        pool = self._pool()
+        for item in todo:
+            pool.submit(self._prefetch, session_id, generation, item)
+        return len(todo)
+
+    def cancel(self, session_id, finished=False):
+        """
+        Drop any lookahead that has not started yet for a session. A ``finished``
+        session's state is forgotten once nothing of it is queued or running.
+        """
+        with self._lock:
+            if session_id in self._generations:
+                self._generations[session_id] += 1
+            if finished:
+                self._finished.add(session_id)
+                self._forget_if_idle(session_id)
+
+    def _forget_if_idle(self, session_id):
+        # Caller holds self._lock. Queued work of a forgotten session still finds no
+        # matching generation in _start, so it is dropped as cancelled.
+        if session_id in self._finished and not self._in_flight.get(session_id):
+            self._finished.discard(session_id)
+            self._generations.pop(session_id, None)
+            self._in_flight.pop(session_id, None)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _start(self, session_id, generation, key):
+        with self._lock:
+            if self._generations.get(session_id) != generation:
+                return False
+            self._in_flight.setdefault(session_id, {})[key] = (generation, True)
+            return True
+
+    def _prefetch(self, session_id, generation, item):
+        key = item.get("track_key")
+        try:
+            if not self._start(session_id, generation, key):
+                self._count("cancelled")
+                return
+            artist, title, album = item["artist"], item["title"], item.get("album")
+            state, _ = playable_source_service.get_playable_state(artist, title, album=album)
+            if state != "resolvable":
+                self._count("warm" if state in ("local", "cached_stream") else "unavailable")
+                return
+            playable = playable_source_service.resolve(artist, title, album=album, preview_url=item.get("preview_url"))
+            self._count("resolved" if playable else "unavailable")
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Stream prefetch failed for {key}: {e}")
+        finally:
+            with self._lock:
+                in_flight = self._in_flight.get(session_id, {})
+                # A newer generation may have re-queued the same track; leave its entry alone.
+                if in_flight.get(key, (None,))[0] == generation:
+                    del in_flight[key]
+                if not in_flight:
+                    self._in_flight.pop(session_id, None)
+                self._forget_if_idle(session_id)
+
+    def get_stats(self):
+        with self._lock:
+            in_flight = sum(len(keys) for keys in self._in_flight.values())
+            stats = dict(self.stats)
+        return {**stats, "in_flight": in_flight, "sessions": len(self._generations), "lookahead": self.lookahead}
+
+
+stream_prefetcher = StreamPrefetcher()
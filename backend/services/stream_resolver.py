@@ -11,12 +11,18 @@ from database import (
     find_download_by_track,
     find_recent_stream_source,
     get_setting,
+    save_source_candidates,
     upsert_stream_source,
 )
 from utils import sanitize_filename
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# A track boundary that lands while the prefetcher is resolving the same track waits
+# for that extraction instead of starting a second one.
+_inflight = SingleFlight("stream_resolve")
+
 
 def build_track_key(artist, title, album=None):
     return "|".join(
@@ -28,6 +34,54 @@ def build_track_key(artist, title, album=None):
     )
 
 
+# Candidates scoring below this are not trusted to be the requested track.
+MIN_CANDIDATE_SCORE = 3
+
+
+def score_candidate(candidate, artist, title):
+    candidate_title = (candidate.get("title") or "").lower()
+    webpage_url = (candidate.get("webpage_url") or candidate.get("original_url") or "").lower()
+    target = f"{artist} {title}".lower()
+    score = 0
+    if artist.lower() in candidate_title:
+        score += 2
+    if title.lower() in candidate_title:
+        score += 3
+    if "audio" in candidate.get("format", ""):
+        score += 1
+    if "music" in webpage_url or "watch" in webpage_url:
+        score += 1
+    if target in candidate_title:
+        score += 3
+    return score
+
+
+def remember_candidates(cache_key, candidates, artist, title):
+    """Store scored search results so later downloads can skip the search."""
+    scored = []
+    for candidate in candidates or []:
+        if not candidate:
+            continue
+        source_url = candidate.get("webpage_url") or candidate.get("original_url")
+        if not source_url:
+            continue
+        scored.append(
+            {
+                "source_url": source_url,
+                "source_name": candidate.get("extractor_key") or candidate.get("extractor"),
+                "title": candidate.get("title"),
+                "duration_seconds": candidate.get("duration"),
+                "score": score_candidate(candidate, artist, title),
+            }
+        )
+    if not scored:
+        return
+    try:
+        save_source_candidates(cache_key, scored)
+    except Exception as exc:
+        logger.warning("Could not store source candidates for %s: %s", cache_key, exc)
+
+
 def build_local_audio_url(download_row):
     artist = sanitize_filename(download_row.get("artist"))
     album = sanitize_filename(download_row.get("album"))
@@ -69,6 +123,9 @@ class StreamResolver:
         download = find_download_by_track(artist, title, album=album)
         if not download:
             return None
+        return self.local_source_result(download, artist, title, album)
+
+    def local_source_result(self, download, artist, title, album=None):
         return {
             "playback_type": "local",
             "audio_url": build_local_audio_url(download),
@@ -141,6 +198,9 @@ class StreamResolver:
 
     def resolve_remote_stream(self, artist, title, album=None, preview_url=None):
         cache_key = build_track_key(artist, title, album)
+        return _inflight.do(cache_key, self._resolve_remote_stream, cache_key, artist, title, album, preview_url)
+
+    def _resolve_remote_stream(self, cache_key, artist, title, album, preview_url):
         if yt_dlp is None:
             logger.warning("yt_dlp is not installed; remote stream resolution disabled.")
             return self._preview_result(preview_url, cache_key)
@@ -167,6 +227,7 @@ class StreamResolver:
             return self._preview_result(preview_url, cache_key)
 
         candidates = info.get("entries") if isinstance(info, dict) and info.get("entries") else [info]
+        remember_candidates(cache_key, candidates, artist, title)
         best = self._pick_best_candidate(candidates, artist, title)
         if not best:
             return self._preview_result(preview_url, cache_key)
@@ -236,25 +297,12 @@ class StreamResolver:
     def _pick_best_candidate(self, candidates, artist, title):
         best = None
         best_score = -1
-        target = f"{artist} {title}".lower()
         for candidate in candidates or []:
-            candidate_title = (candidate.get("title") or "").lower()
-            webpage_url = (candidate.get("webpage_url") or candidate.get("original_url") or "").lower()
-            score = 0
-            if artist.lower() in candidate_title:
-                score += 2
-            if title.lower() in candidate_title:
-                score += 3
-            if "audio" in candidate.get("format", ""):
-                score += 1
-            if "music" in webpage_url or "watch" in webpage_url:
-                score += 1
-            if target in candidate_title:
-                score += 3
+            score = score_candidate(candidate, artist, title)
             if score > best_score:
                 best = candidate
                 best_score = score
-        return best if best_score >= 3 else None
+        return best if best_score >= MIN_CANDIDATE_SCORE else None
 
     def _parse_iso(self, value):
         if not value:
@@ -3,6 +3,7 @@ import os
 from core import downloader_service, lastfm_service, logger
 from database import add_download, create_job, get_download_status, get_setting, mark_job_failed, mark_job_running, mark_job_succeeded
 from services.download_service import download_coordinator
+from services.event_bus import JOB_STATUS, event_bus
 
 
 class SyncService:
@@ -10,8 +11,10 @@ class SyncService:
         user = get_setting("LASTFM_USER") or os.getenv("LASTFM_USER")
         job_id = create_job("sync", "library", "queued", payload={"user": user})
         mark_job_running(job_id)
+        event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "running"})
         if not user:
             mark_job_failed(job_id, "No LASTFM_USER configured")
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
             logger.warning("No LASTFM_USER configured for auto-download.")
             return {"status": "failed", "job_id": job_id}
 
@@ -34,6 +37,7 @@ class SyncService:
                         title=track["title"],
                         album=track["album"],
                         image_url=track.get("image"),
+                        priority_class="auto_sync",
                     )
                     if result["status"] == "queued":
                         queued += 1
@@ -41,10 +45,12 @@ class SyncService:
                     add_download(query, track["artist"], track["title"], track["album"], image_url=track.get("image"), status="pending")
 
             mark_job_succeeded(job_id, {"synced_scrobbles": synced_count, "queued_downloads": queued})
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "succeeded"})
             return {"status": "succeeded", "job_id": job_id, "synced_scrobbles": synced_count, "queued_downloads": queued}
         except Exception as exc:
             logger.error(f"Error in background sync job: {exc}")
             mark_job_failed(job_id, str(exc))
+            event_bus.publish(JOB_STATUS, {"job_id": job_id, "status": "failed"})
             return {"status": "failed", "job_id": job_id}
 
 
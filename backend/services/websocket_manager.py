@@ -2,6 +2,7 @@ from fastapi import WebSocket
 from typing import List
 import logging
 import asyncio
+from services.event_bus import CLIENT_CONNECTED, event_bus
 
 class ConnectionManager:
     def __init__(self):
@@ -17,6 +18,7 @@ class ConnectionManager:
         except RuntimeError:
             self._loop = None
         self.logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
+        event_bus.publish(CLIENT_CONNECTED)
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
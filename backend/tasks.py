@@ -2,12 +2,16 @@ import os
 from database import get_setting
 from core import lastfm_service, logger
 from services.enrichment_service import enrichment_service
+from services.library_indexer import library_indexer
+from services.recommendation_index_service import recommendation_index_service
 from services.release_service import release_service
 from services.radio_service import radio_service
 from services.sync_service import sync_service
 
 def check_new_scrobbles():
-    sync_service.run_sync()
+    result = sync_service.run_sync()
+    if result.get("status") == "succeeded" and result.get("synced_scrobbles"):
+        refresh_recommendation_index(full=False)
 
 def refresh_daily_stats():
     user = get_setting("LASTFM_USER") or os.getenv("LASTFM_USER")
@@ -29,3 +33,25 @@ def verify_stream_sources():
 def warm_recommendation_streamability():
     result = radio_service.warm_recommendation_streamability()
     logger.info("warm_recommendation_streamability warmed=%s", result["warmed"])
+
+
+def scan_library():
+    result = library_indexer.scan()
+    if result is None:
+        logger.info("scan_library skipped: a scan is already running")
+        return
+    logger.info(
+        "scan_library seen=%s added=%s changed=%s removed=%s relinked=%s",
+        result["files_seen"], result["added"], result["changed"], result["removed"], result["relinked"],
+    )
+
+
+def refresh_recommendation_index(full=True):
+    result = recommendation_index_service.refresh_index(full=full)
+    if result is None:
+        logger.info("refresh_recommendation_index skipped: no user configured or a refresh is running")
+        return
+    logger.info(
+        "refresh_recommendation_index mode=%s candidates=%s added_seeds=%s dropped_seeds=%s duration_ms=%s",
+        result["mode"], result["candidates"], len(result["added_seeds"]), len(result["dropped_seeds"]), result["duration_ms"],
+    )
@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.downloader import DownloaderService
+from services.event_bus import DOWNLOADS_CHANGED, event_bus
+
+
+def _job(job_id, query="Artist - Song"):
+    return {"job_id": job_id, "query": query, "artist": "Artist", "title": "Song", "status": "queued"}
+
+
+def test_jobs_are_tracked_by_id_and_snapshot_is_reused(tmp_path):
+    downloader = DownloaderService(download_path=str(tmp_path))
+    downloader.enqueue_job(_job(1))
+    downloader.enqueue_job(_job(2))  # same query, different job
+
+    first = downloader.get_active_downloads()
+    assert [entry["job_id"] for entry in first] == [1, 2]
+    assert downloader.get_active_downloads() is first
+
+    downloader._set_stage({"job_id": 2, "query": "Artist - Song"}, "fetch")
+    second = downloader.get_active_downloads()
+    assert second is not first
+    assert first[1]["status"] == "queued"  # earlier snapshots are not mutated
+    assert second[1]["stage"] == "fetch"
+
+    downloader._finish({"job_id": 1, "query": "Artist - Song", "done": threading.Event()})
+    assert [entry["job_id"] for entry in downloader.get_active_downloads()] == [2]
+
+
+def test_progress_updates_are_recorded_but_publishing_is_throttled(tmp_path):
+    downloader = DownloaderService(download_path=str(tmp_path))
+    downloader.progress_interval = 60
+    downloader.enqueue_job(_job(7))
+    published = []
+    unsubscribe = event_bus.subscribe(lambda topic, payload: published.append(topic), topics={DOWNLOADS_CHANGED})
+    try:
+        hook = downloader._progress_hook(7)
+        for downloaded in range(0, 1000, 100):
+            hook({"status": "downloading", "downloaded_bytes": downloaded, "total_bytes": 1000, "speed": 2048.5, "eta": 3})
+    finally:
+        unsubscribe()
+
+    assert len(published) == 1
+    entry = downloader.get_active_downloads()[0]
+    assert entry["progress"] == 90.0
+    assert entry["speed"] == 2048
+    assert entry["eta"] == 3
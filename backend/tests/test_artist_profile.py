@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cache_manager import CacheManager
+from services.lastfm import LastFMService
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def request(self, method, params):
+        self.calls.append((method, params["artist"]))
+        return self.responses.get((method, params["artist"]))
+
+
+class FakeImageProvider:
+    def __init__(self):
+        self.calls = 0
+
+    def get_image(self, lastfm_images, artist, title):
+        self.calls += 1
+        return lastfm_images[-1]["#text"] if lastfm_images else None
+
+
+def _service(responses):
+    client = FakeClient(responses)
+    images = FakeImageProvider()
+    cache = CacheManager(ttl=60, namespace="test-artist-profile", persistent=False)
+    return LastFMService(client=client, image_provider=images, cache=cache), client, images
+
+
+def test_helpers_project_from_one_getinfo_call():
+    service, client, images = _service({
+        ("artist.getinfo", "Low"): {
+            "artist": {
+                "name": "Low",
+                "stats": {"listeners": "523000", "playcount": "9000000"},
+                "image": [{"size": "extralarge", "#text": "https://img/low.jpg"}],
+                "bio": {"summary": "Slowcore from Duluth."},
+                "tags": {"tag": [{"name": "slowcore"}, {"name": "seen live"}, {"name": "indie"}]},
+            }
+        }
+    })
+
+    assert service.get_artist_listeners("Low") == 523000
+    assert service.get_artist_tags("Low") == ["Slowcore", "Indie"]
+    assert service.get_artist_image("Low") == "https://img/low.jpg"
+    assert service.get_artist_image("Low") == "https://img/low.jpg"
+    assert service.get_artist_info("Low")["name"] == "Low"
+    assert service.get_artist_profile("Low").bio == "Slowcore from Duluth."
+
+    assert client.calls == [("artist.getinfo", "Low")]
+    assert images.calls == 1
+
+
+def test_unknown_artists_and_zero_listeners_are_cached():
+    service, client, _ = _service({
+        ("artist.getinfo", "Nobody"): {"error": 6, "message": "The artist you supplied could not be found"},
+        ("artist.getinfo", "Tiny"): {"artist": {"name": "Tiny", "stats": {"listeners": "0"}, "tags": {"tag": []}}},
+        ("artist.gettoptags", "Tiny"): {"toptags": {"tag": [{"name": "lo-fi"}]}},
+    })
+
+    for _ in range(3):
+        assert service.get_artist_listeners("Nobody") == 0
+        assert service.get_artist_tags("Nobody") == []
+        assert service.get_artist_listeners("Tiny") == 0
+        assert service.get_artist_tags("Tiny") == ["Lo-Fi"]
+
+    assert client.calls == [
+        ("artist.getinfo", "Nobody"),
+        ("artist.getinfo", "Tiny"),
+        ("artist.gettoptags", "Tiny"),
+    ]
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import init_db, set_setting
+from services.cache_manager import CacheManager, get_cache_stats
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_cache.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def test_values_survive_a_new_manager_instance(temp_db):
+    CacheManager(ttl=60, namespace="t-persist").set("tags_Artist", ["ambient", "idm"])
+
+    restarted = CacheManager(ttl=60, namespace="t-persist")
+    assert restarted.get("tags_Artist") == ["ambient", "idm"]
+    assert get_cache_stats()["t-persist"]["disk_hits"] == 1
+
+    assert restarted.get("tags_Artist") == ["ambient", "idm"]
+    assert get_cache_stats()["t-persist"]["memory_hits"] == 1
+
+
+def test_memory_tier_is_lru_bounded(temp_db):
+    cache = CacheManager(ttl=60, namespace="t-lru", max_entries=2, persistent=False)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert get_cache_stats()["t-lru"]["evictions"] == 1
+
+
+def test_expired_entries_and_prefix_clear(temp_db):
+    cache = CacheManager(ttl=60, namespace="t-expiry")
+    cache.set("stale", "x", ttl=-1)
+    cache.set("recent_tester_10", [1])
+    cache.set("recent_tester_50", [2])
+    cache.set("recent_other_10", [3])
+    cache.set("recent%_10", [4])
+
+    cache.clear_with_prefix("recent_tester_")
+
+    fresh = CacheManager(ttl=60, namespace="t-expiry")
+    assert fresh.get("stale") is None
+    assert fresh.get("recent_tester_10") is None
+    assert fresh.get("recent_tester_50") is None
+    assert fresh.get("recent_other_10") == [3]
+    assert fresh.get("recent%_10") == [4]
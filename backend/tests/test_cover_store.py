@@ -0,0 +1,128 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import get_cover_store_stats, init_db, set_setting
+from services.cover_store import CoverStore, is_cover_host
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_covers.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+class FakeResponse:
+    def __init__(self, content=b"", content_type="image/png", location=None):
+        self.content = content
+        self.headers = {"Content-Type": content_type}
+        self.is_redirect = location is not None
+        if location:
+            self.headers["Location"] = location
+        self.read_bytes = 0
+
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.content), chunk_size):
+            self.read_bytes += chunk_size
+            yield self.content[offset:offset + chunk_size]
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.calls = []
+
+    def get(self, url, timeout=None, stream=False, allow_redirects=True):
+        self.calls.append(url)
+        body = self.bodies[url]
+        return body if isinstance(body, FakeResponse) else FakeResponse(body)
+
+
+def _store(tmp_path, bodies, max_bytes=1024 * 1024):
+    store = CoverStore(root=str(tmp_path / "covers"), max_bytes=max_bytes)
+    store.session = FakeSession(bodies)
+    return store
+
+
+def test_cover_is_fetched_once_and_deduplicated_by_content(temp_db, tmp_path):
+    store = _store(tmp_path, {"https://a/cover.jpg": b"same", "https://b/cover.jpg": b"same"})
+
+    for _ in range(3):
+        assert store.get("https://a/cover.jpg") == (b"same", "image/png")
+    assert store.get_bytes("https://b/cover.jpg") == b"same"
+
+    assert store.session.calls == ["https://a/cover.jpg", "https://b/cover.jpg"]
+    assert get_cover_store_stats() == {"blobs": 1, "urls": 2, "bytes": 4}
+    assert store.stats["deduplicated"] == 1
+
+
+def test_least_recently_used_covers_are_evicted_over_the_cap(temp_db, tmp_path):
+    bodies = {f"https://c/{i}.jpg": bytes([i]) * 10 for i in range(3)}
+    store = _store(tmp_path, bodies, max_bytes=25)
+
+    for url in bodies:
+        store.get(url)
+
+    stats = get_cover_store_stats()
+    assert stats["bytes"] <= 25
+    assert stats["blobs"] == 2
+    # The oldest cover is gone and has to be fetched again.
+    store.get("https://c/0.jpg")
+    assert store.session.calls.count("https://c/0.jpg") == 2
+
+
+def test_non_http_urls_are_rejected(temp_db, tmp_path):
+    store = _store(tmp_path, {})
+    assert store.get("file:///etc/passwd") is None
+    assert store.session.calls == []
+
+
+def test_only_image_responses_from_cover_hosts_are_served(temp_db, tmp_path):
+    store = _store(tmp_path, {"https://a/page": FakeResponse(b"<script>", "text/html; charset=utf-8")})
+
+    assert store.get("https://a/page") is None
+    assert get_cover_store_stats()["blobs"] == 0
+    assert is_cover_host("https://lastfm.freetls.fastly.net/i/u/300x300/x.png")
+    assert is_cover_host("https://is1-ssl.mzstatic.com/image/x.jpg")
+    assert not is_cover_host("http://169.254.169.254/latest/meta-data")
+    assert not is_cover_host("http://localhost:8000/covers")
+    assert not is_cover_host("https://evil.com/mzstatic.com/x.jpg")
+
+
+def test_redirects_off_the_cover_hosts_are_refused(temp_db, tmp_path):
+    store = _store(
+        tmp_path,
+        {
+            "https://lastfm.freetls.fastly.net/a.png": FakeResponse(location="http://169.254.169.254/latest"),
+            "https://lastfm.freetls.fastly.net/b.png": FakeResponse(location="https://is1-ssl.mzstatic.com/b.png"),
+            "https://is1-ssl.mzstatic.com/b.png": b"cover",
+        },
+    )
+
+    assert store.get("https://lastfm.freetls.fastly.net/a.png") is None
+    assert store.get("https://lastfm.freetls.fastly.net/b.png") == (b"cover", "image/png")
+    assert "http://169.254.169.254/latest" not in store.session.calls
+
+
+def test_oversized_bodies_stop_reading_at_the_cap(temp_db, tmp_path, monkeypatch):
+    monkeypatch.setattr("services.cover_store.MAX_COVER_BYTES", 10)
+    big = FakeResponse(b"x" * 200_000)
+    store = _store(tmp_path, {"https://a/big.png": big})
+
+    assert store.get("https://a/big.png") is None
+    assert big.read_bytes < 200_000
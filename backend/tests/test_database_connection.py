@@ -0,0 +1,81 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import get_pool_stats, get_setting, init_db, set_setting
+from database.core import get_connection
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_connection.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    return db_path
+
+
+def test_connection_is_reused_within_a_thread(temp_db):
+    with get_connection() as first:
+        pass
+    with get_connection() as second:
+        pass
+    assert first is second
+
+
+def test_connections_use_wal_and_tuned_pragmas(temp_db):
+    with get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+
+def test_each_thread_gets_its_own_connection(temp_db):
+    seen = []
+
+    def worker():
+        with get_connection() as conn:
+            seen.append(id(conn))
+
+    with get_connection() as main_conn:
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    assert seen and seen[0] != id(main_conn)
+
+
+def test_uncommitted_writes_are_rolled_back_on_exit(temp_db):
+    with get_connection() as conn:
+        conn.execute("INSERT INTO settings (key, value) VALUES ('dangling', 'yes')")
+    assert get_setting("dangling") is None
+
+    set_setting("committed", "yes")
+    assert get_setting("committed") == "yes"
+
+
+def test_switching_database_path_reopens_connection(tmp_path, monkeypatch, temp_db):
+    with get_connection() as first:
+        pass
+    other = tmp_path / "other.db"
+    monkeypatch.setattr(database, "DB_NAME", str(other))
+    with get_connection() as second:
+        pass
+    assert first is not second
+    assert os.path.exists(other)
+
+
+def test_pool_stats_track_reuse(temp_db):
+    before = get_pool_stats()
+    for _ in range(3):
+        with get_connection():
+            pass
+    after = get_pool_stats()
+    assert after["checkouts"] - before["checkouts"] == 3
+    assert after["reused"] - before["reused"] == 3
+    assert after["pragmas"]["journal_mode"] == "wal"
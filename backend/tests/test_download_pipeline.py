@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.download_pipeline import DownloadPipeline, PipelineStage
+
+
+def _wait_for(stage, count):
+    for _ in range(200):
+        stats = stage.stats()
+        if stats["processed"] + stats["failed"] >= count:
+            return stats
+        threading.Event().wait(0.01)
+    raise AssertionError(f"{stage.name} did not finish {count} items")
+
+
+def test_items_flow_through_stages_and_errors_are_reported():
+    finished = []
+    errors = []
+
+    def double(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item * 2
+
+    def collect(item):
+        finished.append(item)
+        return None
+
+    first = PipelineStage("double", double, workers=2, queue_size=2, on_error=lambda item, stage, exc: errors.append((item, stage)))
+    last = PipelineStage("collect", collect, workers=1, queue_size=2)
+    pipeline = DownloadPipeline([first, last])
+    pipeline.start()
+    for item in range(5):
+        pipeline.submit(item)
+
+    _wait_for(last, 4)
+    assert sorted(finished) == [0, 2, 4, 8]
+    assert errors == [(3, "double")]
+    stats = pipeline.stats()
+    assert stats["double"]["processed"] == 4
+    assert stats["double"]["failed"] == 1
+    assert stats["collect"]["queue_capacity"] == 2
+
+
+def test_full_stage_blocks_the_stage_feeding_it():
+    release = threading.Event()
+    slow = PipelineStage("slow", lambda item: release.wait(2) and None, workers=1, queue_size=1)
+    fast = PipelineStage("fast", lambda item: item, workers=1, queue_size=4)
+    DownloadPipeline([fast, slow]).start()
+
+    for item in range(4):
+        fast.submit(item)
+    threading.Event().wait(0.2)
+    # One item in the slow worker, one waiting in its queue, the fast worker stuck handing off.
+    assert slow.stats()["queue_depth"] == 1
+    assert fast.stats()["queue_depth"] == 1
+    release.set()
+    _wait_for(slow, 4)
@@ -0,0 +1,184 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import (
+    add_download,
+    claim_next_job,
+    create_job,
+    get_job,
+    get_job_events,
+    get_total_downloads_count,
+    init_db,
+    list_jobs,
+    save_source_candidates,
+    set_setting,
+    upsert_stream_source,
+)
+from services.download_service import PRIORITY_WEIGHTS, DownloadCoordinator, WeightedFairScheduler
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_download_queue.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+class RecordingDownloader:
+    def __init__(self):
+        self.jobs = []
+        self.notified = 0
+
+    def enqueue_job(self, job_info):
+        self.jobs.append(job_info)
+
+    def enqueue_jobs(self, job_infos):
+        self.jobs.extend(job_infos)
+
+    def notify_work(self):
+        self.notified += 1
+
+
+def test_claim_is_exclusive_and_records_lease(temp_db):
+    job_id = create_job("download", "library", query="A - B")
+
+    claimed = claim_next_job("download", "worker-1", 60)
+    assert claimed["id"] == job_id
+    assert claimed["status"] == "running"
+    assert claimed["lease_owner"] == "worker-1"
+    assert claim_next_job("download", "worker-2", 60) is None
+
+
+def test_interactive_jobs_jump_ahead_of_bulk_backlog(temp_db):
+    coordinator = DownloadCoordinator()
+    downloader = RecordingDownloader()
+    for i in range(5):
+        coordinator.queue(downloader, f"Bulk - {i}", priority_class="bulk")
+    coordinator.queue(downloader, "Now - Please", priority_class="interactive")
+
+    first = coordinator.claim_next("worker", 60)
+    assert first["query"] == "Now - Please"
+    assert coordinator.claim_next("worker", 60)["query"] == "Bulk - 0"
+
+
+def test_fair_scheduler_does_not_starve_low_priority():
+    scheduler = WeightedFairScheduler(PRIORITY_WEIGHTS)
+    picks = []
+    for _ in range(18):
+        name = scheduler.order(["interactive", "bulk"])[0]
+        scheduler.charge(name)
+        picks.append(name)
+    assert picks.count("bulk") == 2
+    assert picks.count("interactive") == 16
+
+
+def test_requeue_promotes_existing_job(temp_db):
+    coordinator = DownloadCoordinator()
+    downloader = RecordingDownloader()
+    queued = coordinator.queue(downloader, "Song - X", priority_class="bulk")
+
+    again = coordinator.queue(downloader, "Song - X", priority_class="interactive")
+    assert again["status"] == "skipped"
+    assert get_job(queued["job_id"])["priority_class"] == "interactive"
+    assert downloader.notified == 1
+
+
+def test_recover_requeues_interrupted_jobs(temp_db):
+    coordinator = DownloadCoordinator()
+    job_id = create_job("download", "library", query="Crash - Test")
+    claim_next_job("download", "dead-worker", 600)
+
+    # A live lease is left alone unless this is startup recovery.
+    assert coordinator.recover(expired_only=True) == []
+    assert coordinator.recover(expired_only=False) == [job_id]
+    job = get_job(job_id)
+    assert job["status"] == "queued"
+    assert job["lease_owner"] is None
+
+
+def test_known_source_prefers_resolved_stream_then_candidates(temp_db):
+    coordinator = DownloadCoordinator()
+    save_source_candidates(
+        "artist|song|",
+        [
+            {"source_url": "https://example.com/weak", "score": 1},
+            {"source_url": "https://example.com/strong", "score": 8},
+        ],
+    )
+    assert coordinator.known_source_url("artist|song|") == "https://example.com/strong"
+    assert coordinator.known_source_url("nobody|nothing|") is None
+
+    upsert_stream_source(
+        artist="Artist",
+        title="Song",
+        source_name="youtube",
+        source_url="https://example.com/resolved",
+        playable_url="https://example.com/audio",
+        playback_type="remote_stream",
+        cache_key="artist|song|",
+    )
+    assert coordinator.known_source_url("artist|song|") == "https://example.com/resolved"
+
+
+def test_queue_records_source_hints(temp_db):
+    coordinator = DownloadCoordinator()
+    downloader = RecordingDownloader()
+    result = coordinator.queue(downloader, "Artist - Song", artist="Artist", title="Song", source_url="https://example.com/v")
+
+    payload = get_job(result["job_id"])["payload"]
+    assert payload["source_url"] == "https://example.com/v"
+    assert payload["cache_key"] == "artist|song|"
+    assert downloader.jobs[0]["source_url"] == "https://example.com/v"
+
+
+def test_queue_many_dedups_and_queues_in_one_pass(temp_db):
+    coordinator = DownloadCoordinator()
+    downloader = RecordingDownloader()
+    add_download("Done - Song", "Done", "Song", "Album", status="completed")
+    coordinator.queue(downloader, "Busy - Song", artist="Busy", title="Song")
+    tracks = [
+        {"query": "Done - Song again", "artist": "done", "title": "SONG"},
+        {"query": "Busy - Song", "artist": "Busy", "title": "Song"},
+        {"query": "New - One", "artist": "New", "title": "One", "image_url": "https://img/1"},
+        {"query": "New - One", "artist": "New", "title": "One"},
+        {"query": "New - Two", "artist": "New", "title": "Two"},
+    ]
+
+    result = coordinator.queue_many(downloader, tracks)
+
+    assert result["queued"] == 2
+    assert result["skipped"] == {"downloaded": 1, "active": 1}
+    queued = {job["query"]: job for job in list_jobs(job_type="download", status="queued")}
+    assert set(queued) == {"Busy - Song", "New - One", "New - Two"}
+    assert queued["New - One"]["priority_class"] == "bulk"
+    assert queued["New - One"]["payload"] == {"image_url": "https://img/1", "source_url": None, "cache_key": "new|one|"}
+    assert get_job_events(queued["New - Two"]["id"])[0]["event_type"] == "job.queued"
+    assert get_total_downloads_count(status="pending") == 3
+    assert [job["query"] for job in downloader.jobs[1:]] == ["New - One", "New - Two"]
+
+
+def test_queue_many_keeps_the_same_track_on_different_albums(temp_db):
+    coordinator = DownloadCoordinator()
+    downloader = RecordingDownloader()
+    add_download("Artist - Song (Live)", "Artist", "Song", "Live", status="completed")
+    tracks = [
+        {"query": "Artist - Song (Studio)", "artist": "Artist", "title": "Song", "album": "Studio"},
+        {"query": "Artist - Song (Studio) #2", "artist": "artist", "title": "song", "album": "studio"},
+        {"query": "Artist - Song (Deluxe)", "artist": "Artist", "title": "Song", "album": "Deluxe"},
+        {"query": "Artist - Song (Live) again", "artist": "Artist", "title": "Song", "album": "Live"},
+    ]
+
+    result = coordinator.queue_many(downloader, tracks)
+
+    assert result["queued"] == 2
+    assert result["skipped"] == {"downloaded": 1}
+    assert sorted(job["cache_key"] for job in downloader.jobs) == ["artist|song|deluxe", "artist|song|studio"]
@@ -0,0 +1,117 @@
+import asyncio
+import gc
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.external_client import ExternalAPIClient, TokenBucket, parse_retry_after
+
+
+def _client(handler, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return ExternalAPIClient("test", base_url="https://api.test/", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_retries_429_and_honors_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"})
+        return httpx.Response(200, json={"ok": True, "q": request.url.params["q"]})
+
+    client = _client(handler)
+    assert client.request_json("GET", "search", params={"q": "x"}) == {"ok": True, "q": "x"}
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.19
+    assert client.stats["rate_limited"] == 1
+
+
+def test_client_errors_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _client(handler).request_json("GET", "missing")
+    assert len(calls) == 1
+
+
+def test_request_json_many_runs_concurrently_and_isolates_failures():
+    def handler(request):
+        if request.url.path.endswith("bad"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    results = _client(handler).request_json_many([
+        {"method": "GET", "path": "a"},
+        {"method": "GET", "path": "bad"},
+        {"method": "GET", "path": "b"},
+    ])
+    assert results == [{"path": "/a"}, None, {"path": "/b"}]
+
+
+def test_request_json_many_respects_max_in_flight():
+    active = []
+    peak = []
+
+    async def handler(request):
+        active.append(request)
+        peak.append(len(active))
+        await asyncio.sleep(0.02)
+        active.remove(request)
+        return httpx.Response(200, json={})
+
+    client = _client(handler, max_concurrency=8)
+    client.request_json_many([{"method": "GET", "path": str(i)} for i in range(6)], max_in_flight=2)
+    assert max(peak) == 2
+
+
+def test_token_bucket_spaces_requests_and_penalizes():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+    bucket.penalize(5)
+    assert bucket.reserve() >= 4.9
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("garbage") is None
+
+
+def test_loop_clients_are_closed_and_released():
+    client = _client(lambda request: httpx.Response(200, json={}))
+    client.request_json("GET", "a")
+    background_client, _ = next(iter(client._loop_state.values()))
+
+    asyncio.run(client.request_json_async("GET", "b"))
+    gc.collect()
+    assert len(client._loop_state) == 1
+
+    asyncio.run(client.aclose())
+    assert background_client.is_closed
+    assert len(client._loop_state) == 0
+
+
+def test_try_reserve_skips_long_waits_and_cancelled_waits_refund():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.try_reserve(0) == 0.0
+    assert bucket.try_reserve(0.05) is None
+    assert 0.05 < bucket.try_reserve(0.2) <= 0.1
+
+    async def cancelled_acquire():
+        task = asyncio.ensure_future(bucket.acquire_async())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled_acquire())
+    # The cancelled acquire's token came back, so the queue did not grow.
+    assert bucket.try_reserve(0.25) <= 0.2
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import sys
+import time
+import weakref
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import get_image_lookups, init_db, set_setting
+from services.external_client import TokenBucket
+from services.image_provider import ImageProvider, get_image_lookup_stats, lookup_key
+from services.provider_registry import providers
+
+PLACEHOLDER = [{"size": "extralarge", "#text": "https://lastfm/2a96cbd8b46e442fc41c2b86b821562f.png"}]
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_images.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+class StubProvider(ImageProvider):
+    def __init__(self, itunes=None, deezer=None, fail=False, slow=()):
+        super().__init__()
+        self.slow = set(slow)
+        self.itunes = itunes or {}
+        self.deezer = deezer or {}
+        self.fail = fail
+        self.calls = []
+
+    async def _perform_itunes_search(self, artist, title):
+        self.calls.append(("itunes", artist, title))
+        if self.fail:
+            raise ConnectionError("offline")
+        return self.itunes.get((artist, title))
+
+    async def _perform_deezer_search(self, artist, title):
+        self.calls.append(("deezer", artist, title))
+        if (artist, title) in self.slow:
+            await asyncio.sleep(10)
+        return self.deezer.get((artist, title))
+
+
+class DelayedProvider(StubProvider):
+    def __init__(self, delays, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays
+
+    async def _perform_itunes_search(self, artist, title):
+        await asyncio.sleep(self.delays.get((artist, title), 0))
+        return await super()._perform_itunes_search(artist, title)
+
+
+def test_hits_and_misses_are_persisted(temp_db):
+    provider = StubProvider(deezer={("Artist", "Song"): "https://deezer/cover.jpg"})
+    assert provider.get_image(PLACEHOLDER, "Artist", "Song") == "https://deezer/cover.jpg"
+    assert provider.get_image([], "Nobody", "Nothing") is None
+    calls = len(provider.calls)
+
+    fresh = StubProvider()
+    assert fresh.get_image(PLACEHOLDER, " artist ", "SONG") == "https://deezer/cover.jpg"
+    assert fresh.get_image([], "Nobody", "Nothing") is None
+    assert fresh.calls == []
+    # Both providers are raced for each lookup
+    assert calls == 4
+    assert get_image_lookups([lookup_key("Nobody", "Nothing")]) == {lookup_key("Nobody", "Nothing"): None}
+
+
+def test_transport_failures_are_not_negatively_cached(temp_db):
+    StubProvider(fail=True).get_image([], "Artist", "Song")
+    assert get_image_lookups([lookup_key("Artist", "Song")]) == {}
+
+
+def test_get_images_resolves_batch_in_order(temp_db):
+    provider = StubProvider(itunes={("A", "1"): "https://itunes/a1.jpg", ("B", "2"): "https://itunes/b2.jpg"})
+    good = [{"size": "extralarge", "#text": "https://lastfm/real.jpg"}]
+    results = provider.get_images([
+        (PLACEHOLDER, "A", "1"),
+        (good, "C", "3"),
+        ([], "B", "2"),
+        (PLACEHOLDER, "A", "1"),
+    ])
+    assert results == ["https://itunes/a1.jpg", "https://lastfm/real.jpg", "https://itunes/b2.jpg", "https://itunes/a1.jpg"]
+    assert sorted(call for call in provider.calls if call[0] == "itunes") == [("itunes", "A", "1"), ("itunes", "B", "2")]
+
+
+def test_first_hit_wins_and_slow_providers_are_cancelled(temp_db):
+    provider = StubProvider(
+        itunes={("Artist", "Song"): "https://itunes/fast.jpg"},
+        slow={("Artist", "Song")},
+    )
+    started = time.monotonic()
+    assert provider.get_image([], "Artist", "Song (Live)") == "https://itunes/fast.jpg"
+    assert provider.get_image([], "Artist", "Song") == "https://itunes/fast.jpg"
+    assert time.monotonic() - started < 2
+    stats = get_image_lookup_stats()
+    assert stats["itunes"]["samples"] >= 1
+    assert stats["deezer"]["outcomes"].get("cancelled", 0) >= 1
+
+
+def test_deadline_bounds_lookup_time(temp_db):
+    set_setting("IMAGE_LOOKUP_DEADLINE_SECONDS", "0.2")
+    provider = StubProvider(slow={("Artist", "Song")})
+    started = time.monotonic()
+    assert provider.get_image([], "Artist", "Song") is None
+    assert time.monotonic() - started < 1.5
+    # Timed out, so the miss is not remembered
+    assert get_image_lookups([lookup_key("Artist", "Song")]) == {}
+
+
+def test_exact_hit_beats_a_faster_variant_within_grace(temp_db):
+    provider = DelayedProvider(
+        {("Artist", "Song (Live)"): 0.4},
+        itunes={("Artist", "Song (Live)"): "https://itunes/exact.jpg"},
+        deezer={("Artist", "Song"): "https://deezer/cleaned.jpg"},
+    )
+    assert provider.get_image([], "Artist", "Song (Live)") == "https://itunes/exact.jpg"
+
+
+def test_batch_lookups_fit_the_real_rate_limit(temp_db, monkeypatch):
+    set_setting("IMAGE_LOOKUP_DEADLINE_SECONDS", "1")
+
+    def handler(request):
+        if request.url.host == "itunes.apple.com":
+            term = request.url.params["term"].replace(" ", "_")
+            return httpx.Response(200, json={"resultCount": 1, "results": [{"artworkUrl100": f"https://img/{term}/100x100bb.jpg"}]})
+        return httpx.Response(200, json={"data": []})
+
+    for name, rate in (("itunes", 20), ("deezer", 40)):
+        client = providers.external_client(name)
+        monkeypatch.setattr(client, "_transport", httpx.MockTransport(handler))
+        monkeypatch.setattr(client, "_loop_state", weakref.WeakKeyDictionary())
+        monkeypatch.setattr(client, "bucket", TokenBucket(rate))
+
+    # Four query variants each: 16 lookups x 8 variant attempts would book ~1.6 s
+    # of iTunes tokens up front if every variant reserved at once.
+    items = [([], f"A{i} feat. B", "Song (Live)") for i in range(16)]
+    results = ImageProvider().get_images(items)
+
+    assert results == [f"https://img/A{i}_feat._B_Song_(Live)/600x600bb.jpg" for i in range(16)]
+    keys = [lookup_key(artist, title) for _, artist, title in items]
+    assert all(get_image_lookups(keys).values())
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import add_download, init_db, library_index, set_setting
+from database.core import get_connection
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_library_index.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def test_index_loads_completed_rows_and_follows_writes(temp_db):
+    add_download("a - one", "Artist", "One", "Album")
+    add_download("a - two", "Artist", "Two", "Album", status="pending")
+
+    assert library_index.contains_many([("artist", "ONE"), ("Artist", "Two")]) == [True, False]
+    assert library_index.artist_track_count("ARTIST") == 1
+
+    add_download("a - two", "Artist", "Two", "Album")
+    add_download("a - one", "Artist", "One", "Album", status="failed")
+
+    assert library_index.contains("Artist", "Two")
+    assert not library_index.contains("Artist", "One")
+    assert library_index.album_counts() == {("Artist", "Album"): 1}
+
+
+def test_index_serves_from_memory_once_loaded(temp_db):
+    add_download("a - one", "Artist", "One", "Album")
+    assert library_index.has_artist("artist")
+
+    with get_connection() as conn:
+        conn.execute("DELETE FROM downloads")
+        conn.commit()
+
+    assert library_index.has_artist("artist")
+    library_index.invalidate()
+    assert not library_index.has_artist("artist")
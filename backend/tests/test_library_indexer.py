@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import (
+    add_download,
+    get_last_library_scan,
+    get_library_file_index,
+    get_library_summary,
+    init_db,
+    list_missing_library_downloads,
+    list_orphan_library_files,
+    set_setting,
+)
+from services.library_indexer import LibraryIndexer
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_library_indexer.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def write_track(root, relative, data=b"audio"):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_scan_indexes_links_and_skips_unchanged(temp_db, tmp_path):
+    root = tmp_path / "downloads"
+    write_track(root, "Artist/Album/Song.mp3")
+    write_track(root, "Stray/Unknown/Other.mp3")
+    write_track(root, "Artist/Album/temp_partial.mp3")
+    add_download("Artist - Song", "Artist", "Song", "Album", status="completed")
+    indexer = LibraryIndexer(root=str(root))
+
+    first = indexer.scan()
+    assert first["added"] == 2
+    assert get_library_file_index()["Artist/Album/Song.mp3"][2] == "Artist - Song"
+    assert [row["path"] for row in list_orphan_library_files()] == ["Stray/Unknown/Other.mp3"]
+
+    second = indexer.scan()
+    assert second["unchanged"] == 2
+    assert second["added"] == second["changed"] == 0
+    assert get_last_library_scan()["files_seen"] == 2
+
+
+def test_scan_detects_changed_and_removed_files(temp_db, tmp_path):
+    root = tmp_path / "downloads"
+    song = write_track(root, "Artist/Album/Song.mp3")
+    gone = write_track(root, "Artist/Album/Gone.mp3")
+    add_download("Artist - Song", "Artist", "Song", "Album", status="completed")
+    add_download("Artist - Gone", "Artist", "Gone", "Album", status="completed")
+    indexer = LibraryIndexer(root=str(root))
+    indexer.scan()
+
+    song.write_bytes(b"re-encoded audio")
+    gone.unlink()
+    result = indexer.scan()
+
+    assert result["changed"] == 1
+    assert result["removed"] == 1
+    assert [row["query"] for row in list_missing_library_downloads()] == ["Artist - Gone"]
+    assert get_library_summary()["missing_downloads"] == 1
+
+
+def test_unchanged_file_is_relinked_when_download_completes(temp_db, tmp_path):
+    root = tmp_path / "downloads"
+    write_track(root, "Artist/Album/Song.mp3")
+    indexer = LibraryIndexer(root=str(root))
+    indexer.scan()
+    assert get_library_summary()["orphan_files"] == 1
+
+    add_download("Artist - Song", "Artist", "Song", "Album", status="completed")
+    result = indexer.scan()
+
+    assert result["relinked"] == 1
+    assert get_library_summary()["orphan_files"] == 0
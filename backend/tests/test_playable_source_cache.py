@@ -0,0 +1,95 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+import services.playable_source_service as playable_module
+from database import add_download, get_setting, init_db, set_setting, upsert_stream_source
+from database.core import get_connection
+from services.event_bus import DOWNLOAD_COMPLETED, event_bus
+from services.playable_source_service import playable_source_service
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_playable_source_cache.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    playable_source_service.invalidate()
+    return db_path
+
+
+def cache_stream(artist, title):
+    upsert_stream_source(
+        artist=artist,
+        title=title,
+        source_name="youtube",
+        source_url="https://example.com/source",
+        playable_url="https://example.com/audio",
+        playback_type="remote_stream",
+        expires_at=(datetime.now(timezone.utc) + timedelta(minutes=30)).isoformat(),
+        cache_key=f"{artist.lower()}|{title.lower()}|",
+    )
+
+
+def test_batch_states_match_single_lookups(temp_db):
+    add_download("Local - Song", "Local", "Song", "Album", status="completed")
+    cache_stream("Cached", "Song")
+    items = [
+        {"artist": "local", "title": "SONG"},
+        {"artist": "Cached", "title": "Song"},
+        {"artist": "Nobody", "title": "Song", "preview_url": "https://example.com/preview"},
+    ]
+
+    batch = playable_source_service.get_playable_states(items)
+
+    assert batch == [("local", True), ("cached_stream", True), ("resolvable", True)]
+    playable_source_service.invalidate()
+    assert [playable_source_service.get_playable_state(**item) for item in items] == batch
+
+
+def test_batch_prefers_the_wanted_album_like_single_lookups(temp_db):
+    add_download("Artist - Song (A)", "Artist", "Song", "First Album", status="completed")
+    add_download("Artist - Song (B)", "Artist", "Song", "Second Album", status="completed")
+
+    playable_source_service.get_playable_states([{"artist": "Artist", "title": "Song", "album": "first album"}])
+
+    cached = playable_source_service._lookup("Artist", "Song", album="first album")["download"]
+    assert cached["query"] == "Artist - Song (A)"
+    assert cached["query"] == playable_module.find_download_by_track("Artist", "Song", "first album")["query"]
+
+
+def test_hot_cache_skips_queries_until_download_completes(temp_db, monkeypatch):
+    calls = []
+    original = playable_module.find_download_by_track
+    monkeypatch.setattr(playable_module, "find_download_by_track", lambda *a, **k: calls.append(a) or original(*a, **k))
+
+    assert playable_source_service.get_playable_state("Artist", "Song")[0] == "resolvable"
+    assert playable_source_service.get_playable_state("Artist", "Song")[0] == "resolvable"
+    assert len(calls) == 1
+
+    add_download("Artist - Song", "Artist", "Song", "Album", status="completed")
+    event_bus.publish(DOWNLOAD_COMPLETED, {"artist": "Artist", "title": "Song"})
+    assert playable_source_service.get_playable_state("Artist", "Song")[0] == "local"
+
+
+def test_settings_are_cached_and_refreshed_on_write(temp_db):
+    assert get_setting("STREAM_SOURCE_FAILURE_THRESHOLD", "2") == "2"
+    set_setting("STREAM_SOURCE_FAILURE_THRESHOLD", "5")
+    assert get_setting("STREAM_SOURCE_FAILURE_THRESHOLD") == "5"
+
+
+def test_track_lookups_use_lowercase_index(temp_db):
+    with get_connection() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM downloads WHERE lower(artist) = lower(?) AND lower(title) = lower(?) AND status = 'completed'",
+            ("a", "b"),
+        ).fetchall()
+    assert "idx_downloads_track_lower" in " ".join(str(tuple(row)) for row in plan)
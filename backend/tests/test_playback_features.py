@@ -40,6 +40,9 @@ def temp_db(tmp_path, monkeypatch):
     monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
     init_db()
     set_setting("LASTFM_USER", "tester")
+    # Keep background lookahead from resolving real streams during these tests.
+    set_setting("STREAM_PREFETCH_LOOKAHEAD", "0")
+    playable_source_service.invalidate()
     return db_path
 
 
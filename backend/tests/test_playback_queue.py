@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import (
+    QueueVersionConflict,
+    advance_queue,
+    create_playback_session,
+    get_playback_session,
+    init_db,
+    insert_queue_items,
+    list_active_playback_sessions,
+    load_session_queue,
+    reorder_queue_items,
+    set_setting,
+)
+from database.core import get_connection
+from database.repositories.playback import playback_sessions
+from services.radio_service import radio_service
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_playback_queue.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def track(title):
+    return {"artist": "A", "title": title, "track_key": f"a|{title.lower()}"}
+
+
+def titles(session):
+    return [item["title"] for item in load_session_queue(session)]
+
+
+def positions(session_id):
+    with get_connection() as conn:
+        rows = conn.execute(
+            "SELECT position FROM playback_queue_items WHERE session_id = ? ORDER BY position", (session_id,)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def test_insert_writes_only_new_rows_between_neighbours(temp_db):
+    session = create_playback_session(username="tester", mode="manual", queue_payload=[track("One"), track("Two")])
+
+    updated = insert_queue_items(session["id"], 1, [track("New")])
+
+    assert titles(updated) == ["One", "New", "Two"]
+    assert positions(session["id"]) == [1.0, 1.5, 2.0]
+    assert updated["queue_version"] == session["queue_version"] + 1
+
+
+def test_crowded_positions_are_renumbered(temp_db):
+    session = create_playback_session(username="tester", mode="manual", queue_payload=[track("One"), track("Two")])
+    for i in range(40):
+        insert_queue_items(session["id"], 1, [track(f"Squeeze{i}")])
+
+    final = get_playback_session(session["id"])
+    assert titles(final)[0] == "One" and titles(final)[-1] == "Two"
+    assert titles(final)[1] == "Squeeze39"
+    assert len(set(positions(session["id"]))) == 42
+
+
+def test_stale_version_is_rejected(temp_db):
+    session = create_playback_session(username="tester", mode="manual", queue_payload=[track("One"), track("Two"), track("Three")])
+    advance_queue(session["id"], 1)
+
+    with pytest.raises(QueueVersionConflict):
+        reorder_queue_items(session["id"], ["a|three"], expected_version=session["queue_version"])
+    assert titles(get_playback_session(session["id"])) == ["One", "Two", "Three"]
+
+
+def test_json_queues_are_migrated_to_rows(temp_db):
+    with get_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO playback_sessions (username, mode, status, current_index, queue_payload, started_at, updated_at)
+            VALUES ('tester', 'manual', 'active', 0, ?, 'now', 'now')
+            """,
+            (json.dumps([track("Old"), track("Queue")]),),
+        )
+        conn.commit()
+
+    init_db()
+
+    with get_connection() as conn:
+        session_id, raw = conn.execute("SELECT id, queue_payload FROM playback_sessions").fetchone()
+    assert raw is None
+    assert titles(get_playback_session(session_id)) == ["Old", "Queue"]
+
+
+def test_advancing_reads_the_full_queue_only_to_render(temp_db, monkeypatch):
+    session = create_playback_session(
+        username="tester", mode="manual", queue_payload=[track(f"T{i}") for i in range(200)]
+    )
+    full_loads = []
+    load_queue = playback_sessions.load_queue
+    monkeypatch.setattr(playback_sessions, "load_queue", lambda cursor, session_id: full_loads.append(session_id) or load_queue(cursor, session_id))
+    monkeypatch.setattr(
+        "services.radio_service.playable_source_service.resolve",
+        lambda artist, title, album=None, preview_url=None: None if title == "T1" else {"url": title},
+    )
+
+    updated, candidate, _, skipped = radio_service.next_playable_track(session["id"])
+
+    assert candidate["title"] == "T2" and [item["title"] for item in skipped] == ["T1"]
+    assert updated["current_index"] == 2 and updated["queue_length"] == 200
+    assert full_loads == [session["id"]]
+
+    full_loads.clear()
+    active = list_active_playback_sessions()
+    assert active[0]["queue_length"] == 200 and "queue_payload" not in active[0]
+    assert full_loads == []
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.lastfm import LastFMService
+from services.provider_registry import ProviderRegistry, providers
+
+
+def test_registry_shares_clients_per_provider():
+    registry = ProviderRegistry()
+    assert registry.external_client("musicbrainz") is registry.external_client("musicbrainz")
+    assert registry.external_client("musicbrainz").min_interval == 1.1
+    assert registry.lastfm_client().client is registry.external_client("lastfm")
+    assert registry.analytics_service().lastfm is registry.lastfm_service()
+
+
+def test_ad_hoc_lastfm_services_reuse_shared_dependencies():
+    shared = providers.lastfm_service()
+    ad_hoc = LastFMService()
+    assert ad_hoc.cache is shared.cache
+    assert ad_hoc.client is shared.client
+    assert ad_hoc.image_provider is shared.image_provider
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import add_feedback, init_db, list_recommendation_candidates, set_setting, upsert_stream_source
+from services.recommendation_index_service import RecommendationIndexService
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_recommendation_index.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+class FakeLastfm:
+    def __init__(self, top_artists):
+        self.top_artists = top_artists
+        self.similar_calls = []
+
+    def get_top_artists(self, user, period="1month", limit=10):
+        return [{"name": name, "playcount": 5} for name in self.top_artists]
+
+    def get_top_tracks(self, user, period="1month", limit=10):
+        return []
+
+    def get_similar_artists(self, artist, limit=5):
+        self.similar_calls.append(artist)
+        return [{"name": f"Like {artist}"}]
+
+    def get_artist_tags(self, artist):
+        return ["indie"]
+
+    def get_artist_top_tracks(self, artist, limit=3):
+        return [{"title": "Hit", "listeners": 10}, {"title": "Deep Cut", "listeners": 1}]
+
+
+def make_service(top_artists):
+    service = RecommendationIndexService()
+    service.lastfm = FakeLastfm(top_artists)
+    return service
+
+
+def test_requests_are_served_from_the_index(temp_db):
+    service = make_service(["Alpha", "Beta"])
+    service.refresh_index(full=True)
+    calls_after_build = list(service.lastfm.similar_calls)
+    add_feedback("tester", "Like Alpha", "Deep Cut", "not_my_taste")
+
+    recs = service.build_recommendations(limit=10)
+
+    assert service.lastfm.similar_calls == calls_after_build == ["Alpha", "Beta"]
+    assert {(item["artist"], item["title"]) for item in recs} == {
+        ("Like Alpha", "Hit"),
+        ("Like Beta", "Hit"),
+        ("Like Beta", "Deep Cut"),
+    }
+
+
+def test_incremental_refresh_only_fetches_new_seeds(temp_db):
+    service = make_service(["Alpha", "Beta"])
+    service.refresh_index(full=True)
+
+    service.lastfm.top_artists = ["Beta", "Gamma"]
+    result = service.refresh_index()
+
+    assert result["mode"] == "incremental"
+    assert service.lastfm.similar_calls == ["Alpha", "Beta", "Gamma"]
+    artists = {item["artist"] for item in list_recommendation_candidates("tester")}
+    assert artists == {"Like Beta", "Like Gamma"}
+
+
+def test_batch_scoring_applies_failures_and_feedback(temp_db):
+    service = make_service(["Alpha"])
+    service.refresh_index(full=True)
+    upsert_stream_source(
+        artist="Like Alpha", title="Hit", source_name="youtube", playback_type="remote_stream", failure_count=2, cache_key="k1"
+    )
+    add_feedback("tester", "Like Alpha", "Deep Cut", "liked")
+
+    recs = {item["title"]: item["score"] for item in service.build_recommendations(limit=10)}
+
+    # base 45 + one tag 2 + not downloaded 8; -12 for two stream failures, +18 for the like.
+    assert recs == {"Hit": 43.0, "Deep Cut": 73.0}
+    assert set(service.get_stats()["last_build"]) >= {"load_ms", "lookup_ms", "score_ms", "total_ms"}
@@ -0,0 +1,115 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import (
+    add_scrobble,
+    add_scrobbles_batch,
+    get_active_scrobble_days,
+    get_top_artists_from_db,
+    get_top_tracks_from_db,
+    get_daily_scrobble_counts,
+    get_hourly_scrobble_counts,
+    init_db,
+    rebuild_scrobble_rollups,
+    set_setting,
+)
+from database.core import get_connection
+from database.repositories.scrobbles import get_artist_top_tracks_from_db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_rollups.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def _ts(day, hour):
+    return int(datetime.strptime(f"{day} {hour:02d}:30", "%Y-%m-%d %H:%M").timestamp())
+
+
+def _rollup_snapshot():
+    with get_connection() as conn:
+        daily = conn.execute(
+            "SELECT user, artist_key, day, scrobble_count FROM scrobble_daily_counts ORDER BY 1, 2, 3"
+        ).fetchall()
+        hourly = conn.execute(
+            "SELECT user, day, hour, scrobble_count FROM scrobble_hourly_counts ORDER BY 1, 2, 3"
+        ).fetchall()
+    return [tuple(row) for row in daily], [tuple(row) for row in hourly]
+
+
+def test_batch_insert_updates_daily_and_hourly_rollups(temp_db):
+    add_scrobbles_batch([
+        ("tester", "Boards of Canada", "Roygbiv", "", "", _ts("2024-03-01", 9)),
+        ("tester", "boards of canada", "Olson", "", "", _ts("2024-03-01", 9) + 60),
+        ("tester", "Aphex Twin", "Xtal", "", "", _ts("2024-03-02", 22)),
+    ])
+
+    assert get_daily_scrobble_counts("tester", "2024-03-01") == {"2024-03-01": 2, "2024-03-02": 1}
+    assert get_daily_scrobble_counts("tester", "2024-03-01", artist="Boards Of Canada") == {"2024-03-01": 2}
+    assert get_hourly_scrobble_counts("tester") == {9: 2, 22: 1}
+    assert get_active_scrobble_days("tester") == ["2024-03-02", "2024-03-01"]
+
+
+def test_resyncing_existing_scrobbles_does_not_double_count(temp_db):
+    ts = _ts("2024-03-01", 9)
+    add_scrobbles_batch([("tester", "Artist A", "Song", "", "", ts)])
+    add_scrobbles_batch([("tester", "Artist A", "Song", "", "", ts)])
+    add_scrobble("tester", "Artist B", "Song", "", "", ts)
+
+    assert get_daily_scrobble_counts("tester") == {"2024-03-01": 1}
+    assert get_daily_scrobble_counts("tester", artist="Artist A") == {}
+    assert get_daily_scrobble_counts("tester", artist="Artist B") == {"2024-03-01": 1}
+
+
+def test_rebuild_matches_incremental_maintenance(temp_db):
+    add_scrobbles_batch([
+        ("tester", "Artist A", "One", "", "", _ts("2024-01-05", 1)),
+        ("tester", "Artist B", "Two", "", "", _ts("2024-01-05", 23)),
+        ("other", "Artist A", "One", "", "", _ts("2024-01-06", 12)),
+    ])
+    incremental = _rollup_snapshot()
+
+    rebuild_scrobble_rollups()
+
+    assert _rollup_snapshot() == incremental
+
+
+def test_top_artists_and_tracks_read_playcount_aggregates(temp_db):
+    day = 86400
+    base = 1_700_000_000 - (1_700_000_000 % day)
+    add_scrobbles_batch([
+        ("tester", "Artist A", "One", "", "a.jpg", base - 3 * day),
+        ("tester", "Artist A", "One", "", "", base + 10),
+        ("tester", "Artist A", "Two", "", "", base + 20),
+        ("tester", "Artist B", "Three", "", "b.jpg", base + 7200),
+        ("tester", "Artist B", "Three", "", "", base + day + 5),
+    ])
+
+    assert get_top_artists_from_db("tester") == [
+        {"name": "Artist A", "playcount": 3},
+        {"name": "Artist B", "playcount": 2},
+    ]
+    assert get_top_tracks_from_db("tester", limit=1) == [
+        {"artist": "Artist A", "title": "One", "image": "a.jpg", "playcount": 2},
+    ]
+    # Window starting mid-day mixes the raw partial day with full daily buckets
+    windowed = get_top_artists_from_db("tester", start_ts=base + 15)
+    assert windowed == [
+        {"name": "Artist B", "playcount": 2},
+        {"name": "Artist A", "playcount": 1},
+    ]
+    assert get_artist_top_tracks_from_db("tester", "artist a")[0] == {
+        "title": "One", "image": "a.jpg", "playcount": 2,
+    }
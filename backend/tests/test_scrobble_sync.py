@@ -0,0 +1,91 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import get_sync_checkpoint, get_total_scrobbles_count, init_db, set_setting
+from services.lastfm_support.sync import sync_scrobbles_to_db
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_sync.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def _page(page, total_pages, per_page=3):
+    base = 1_700_000_000 - page * 1000
+    return {
+        "recenttracks": {
+            "@attr": {"totalPages": str(total_pages), "page": str(page)},
+            "track": [
+                {
+                    "artist": {"#text": f"Artist {page}"},
+                    "name": f"Song {page}-{i}",
+                    "album": {"#text": ""},
+                    "image": [{"#text": ""}],
+                    "date": {"uts": str(base - i)},
+                }
+                for i in range(per_page)
+            ],
+        }
+    }
+
+
+class FakeClient:
+    def __init__(self, total_pages, failing_pages=()):
+        self.total_pages = total_pages
+        self.failing_pages = set(failing_pages)
+        self.requested = []
+        self.max_in_flight = set()
+
+    def request(self, method, params):
+        self.requested.append(params["page"])
+        return _page(params["page"], self.total_pages)
+
+    def request_many(self, calls, max_in_flight=None):
+        self.max_in_flight.add(max_in_flight)
+        results = []
+        for _method, params in calls:
+            self.requested.append(params["page"])
+            results.append(None if params["page"] in self.failing_pages else _page(params["page"], self.total_pages))
+        return results
+
+
+class FakeService:
+    def __init__(self, client):
+        self.client = client
+
+
+def test_sync_fetches_every_page_past_the_old_cap(temp_db):
+    client = FakeClient(total_pages=250, failing_pages=())
+    added = sync_scrobbles_to_db(FakeService(client), "tester")
+
+    assert added == 750
+    assert get_total_scrobbles_count("tester") == 750
+    assert sorted(client.requested) == list(range(1, 251))
+    assert client.max_in_flight == {4}
+    assert get_sync_checkpoint("tester") is None
+
+
+def test_interrupted_sync_resumes_missing_pages_in_same_window(temp_db):
+    first = FakeClient(total_pages=6, failing_pages={4})
+    assert sync_scrobbles_to_db(FakeService(first), "tester") == 15
+
+    checkpoint = get_sync_checkpoint("tester")
+    assert checkpoint["completed_pages"] == {1, 2, 3, 5, 6}
+    assert checkpoint["from_ts"] == 0
+
+    second = FakeClient(total_pages=6)
+    assert sync_scrobbles_to_db(FakeService(second), "tester") == 3
+    assert second.requested == [1, 4]
+    assert get_total_scrobbles_count("tester") == 18
+    assert get_sync_checkpoint("tester") is None
@@ -0,0 +1,48 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.single_flight import SingleFlight, get_single_flight_stats
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    group = SingleFlight("test-collapse")
+    executions = []
+    results = []
+
+    def slow_lookup(value):
+        executions.append(value)
+        time.sleep(0.1)
+        return {"tags": [value]}
+
+    threads = [
+        threading.Thread(target=lambda: results.append(group.do("artist:x", slow_lookup, "x")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert executions == ["x"]
+    assert results == [{"tags": ["x"]}] * 5
+    stats = get_single_flight_stats()["test-collapse"]
+    assert stats["executed"] == 1
+    assert stats["collapsed"] == 4
+    assert stats["in_flight"] == 0
+
+
+def test_errors_propagate_and_do_not_stick():
+    group = SingleFlight("test-errors")
+
+    def boom():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        group.do("k", boom)
+    assert group.do("k", lambda: "recovered") == "recovered"
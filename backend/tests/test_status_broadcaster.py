@@ -0,0 +1,64 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.status_broadcaster as status_module
+from services.event_bus import CLIENT_CONNECTED, DOWNLOADS_CHANGED, JOB_STATUS, EventBus
+from services.status_broadcaster import StatusBroadcaster
+
+
+def test_event_bus_filters_topics_and_unsubscribes():
+    bus = EventBus()
+    seen = []
+    unsubscribe = bus.subscribe(lambda topic, payload: seen.append((topic, payload)), topics={JOB_STATUS})
+
+    bus.publish(JOB_STATUS, {"job_id": 1})
+    bus.publish(DOWNLOADS_CHANGED)
+    unsubscribe()
+    bus.publish(JOB_STATUS, {"job_id": 2})
+
+    assert seen == [(JOB_STATUS, {"job_id": 1})]
+
+
+def test_broadcaster_sends_only_changed_keys(monkeypatch):
+    summary = {"queued": 1, "running": 0, "failed": 0, "succeeded": 0}
+    calls = []
+
+    def fake_summary():
+        calls.append(1)
+        return dict(summary)
+
+    monkeypatch.setattr(status_module, "get_job_summary", fake_summary)
+    active = [{"query": "a - b", "status": "queued"}]
+    broadcaster = StatusBroadcaster()
+
+    async def scenario():
+        first = await broadcaster._build_message(lambda: list(active))
+        # Nothing stale: no query, no message
+        idle = await broadcaster._build_message(lambda: list(active))
+
+        active[0] = {"query": "a - b", "status": "downloading"}
+        broadcaster._on_event(DOWNLOADS_CHANGED, {})
+        downloads_only = await broadcaster._build_message(lambda: list(active))
+
+        broadcaster._on_event(JOB_STATUS, {"job_id": 1, "status": "running"})
+        unchanged_summary = await broadcaster._build_message(lambda: list(active))
+
+        broadcaster._on_event(CLIENT_CONNECTED, {})
+        snapshot = await broadcaster._build_message(lambda: list(active))
+        return first, idle, downloads_only, unchanged_summary, snapshot
+
+    first, idle, downloads_only, unchanged_summary, snapshot = asyncio.run(scenario())
+
+    assert first == {
+        "type": "job.summary",
+        "summary": summary,
+        "active_downloads": [{"query": "a - b", "status": "queued"}],
+    }
+    assert idle is None
+    assert downloads_only == {"type": "job.summary", "active_downloads": [{"query": "a - b", "status": "downloading"}]}
+    assert unchanged_summary is None
+    assert set(snapshot) == {"type", "summary", "active_downloads"}
+    assert len(calls) == 3
@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+import database.core as database_core
+from database import init_db, set_setting
+from services.playable_source_service import playable_source_service
+from services.stream_prefetcher import StreamPrefetcher
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "test_stream_prefetcher.db"
+    monkeypatch.setattr(database, "DB_NAME", str(db_path))
+    monkeypatch.setattr(database_core, "DB_NAME", str(db_path))
+    init_db()
+    set_setting("LASTFM_USER", "tester")
+    return db_path
+
+
+def make_session(titles, current_index=0, session_id=1):
+    return {
+        "id": session_id,
+        "status": "active",
+        "current_index": current_index,
+        "queue_payload": [{"artist": "A", "title": t, "track_key": f"a|{t.lower()}"} for t in titles],
+    }
+
+
+def drain(prefetcher):
+    prefetcher._executor.shutdown(wait=True)
+    prefetcher._executor = None
+
+
+def test_prefetches_only_cold_items_within_lookahead(temp_db, monkeypatch):
+    resolved = []
+    states = {"Two": "cached_stream", "Three": "resolvable", "Four": "resolvable", "Five": "resolvable"}
+    monkeypatch.setattr(playable_source_service, "get_playable_state", lambda a, t, album=None: (states[t], True))
+    monkeypatch.setattr(playable_source_service, "resolve", lambda a, t, album=None, preview_url=None: resolved.append(t) or {})
+    prefetcher = StreamPrefetcher(lookahead=3, workers=2)
+
+    assert prefetcher.schedule(make_session(["One", "Two", "Three", "Four", "Five"])) == 3
+    drain(prefetcher)
+
+    assert sorted(resolved) == ["Four", "Three"]
+    assert prefetcher.stats["warm"] == 1
+    assert prefetcher.get_stats()["in_flight"] == 0
+
+
+def test_queue_change_cancels_stale_lookahead(temp_db, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    resolved = []
+
+    def slow_resolve(artist, title, album=None, preview_url=None):
+        if title == "Two":
+            started.set()
+            release.wait(5)
+        resolved.append(title)
+        return {}
+
+    monkeypatch.setattr(playable_source_service, "get_playable_state", lambda a, t, album=None: ("resolvable", True))
+    monkeypatch.setattr(playable_source_service, "resolve", slow_resolve)
+    prefetcher = StreamPrefetcher(lookahead=2, workers=1)
+
+    prefetcher.schedule(make_session(["One", "Two", "Three"]))
+    assert started.wait(5)
+    # "Three" is still queued behind the blocked worker when the queue is replaced.
+    prefetcher.schedule(make_session(["One", "Two", "Nine"]))
+    release.set()
+    drain(prefetcher)
+
+    assert resolved == ["Two", "Nine"]
+    assert prefetcher.stats["cancelled"] == 1
+
+
+def test_finished_sessions_are_forgotten_once_idle(temp_db, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(playable_source_service, "get_playable_state", lambda a, t, album=None: ("resolvable", True))
+    monkeypatch.setattr(playable_source_service, "resolve", lambda a, t, album=None, preview_url=None: release.wait(5) and {})
+    prefetcher = StreamPrefetcher(lookahead=2, workers=1)
+
+    prefetcher.schedule(make_session(["One", "Two", "Three"], session_id=1))
+    prefetcher.schedule(make_session(["One", "Two"], session_id=2))
+    prefetcher.cancel(1, finished=True)
+    assert 1 in prefetcher._generations
+
+    release.set()
+    drain(prefetcher)
+
+    assert prefetcher._generations == {2: 1}
+    assert prefetcher.get_stats()["in_flight"] == 0